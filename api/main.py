@@ -1,15 +1,14 @@
 from fastapi import FastAPI, Query
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse, PlainTextResponse, HTMLResponse, FileResponse
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse, PlainTextResponse, HTMLResponse, FileResponse, StreamingResponse
 from pathlib import Path
 import sys
-import csv
-import random
-from typing import Tuple
+import json
+from functools import lru_cache
+from itertools import islice
 import subprocess
 import threading
-from datetime import datetime  # (not used yet but handy)
+from datetime import datetime, date
 
 # ----- Ensure local package import (src/lotto) without editable install -----
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
@@ -17,48 +16,47 @@ SRC = PROJECT_ROOT / "src"
 if str(SRC) not in sys.path:
     sys.path.insert(0, str(SRC))
 
-from lotto.rules import PowerballRules
-
-# ----- History loader & simple generator (local) -----
-DrawTuple = Tuple[int, int, int, int, int, int]
-
-def _load_history_set(csv_path: Path) -> set[DrawTuple]:
-    s: set[DrawTuple] = set()
-    with open(csv_path, newline="", encoding="utf-8") as f:
-        r = csv.reader(f)
-        _ = next(r, None)  # header
-        for row in r:
-            if not row or len(row) < 7:
-                continue
-            try:
-                y1, y2, y3, y4, y5 = (int(row[1]), int(row[2]), int(row[3]), int(row[4]), int(row[5]))
-                rb = int(row[6])
-                s.add(tuple(sorted([y1, y2, y3, y4, y5]) + [rb]))
-            except Exception:
-                continue
-    return s
-
-class APIDraw(BaseModel):
-    white: list[int]
-    red: int
-
-def generate_unique_draws(csv_path: Path, count: int, seed: int | None, rules: PowerballRules) -> list[APIDraw]:
-    if seed is not None:
-        random.seed(seed)
-    history = _load_history_set(csv_path)
-    out: list[APIDraw] = []
-    attempts = 0
-    max_attempts = count * 10000
-    while len(out) < count and attempts < max_attempts:
-        attempts += 1
-        whites = sorted(random.sample(range(1, 70), 5))  # 1..69 inclusive
-        red = random.randint(1, 26)                      # 1..26 inclusive
-        key = tuple(whites + [red])
-        if key in history:
-            continue
-        history.add(key)
-        out.append(APIDraw(white=whites, red=red))
-    return out
+from lotto.rules import PowerballRules, Draw
+from lotto.generate import DrawGenerator, iter_unique
+from lotto.overlap import OverlapIndex
+from lotto.store import HistoryStore, HistorySnapshot
+
+# ----- Shared history store -----
+# Each data file is parsed once per process; handlers read the current
+# snapshot without file I/O, and the store re-checks the file at most every
+# STORE_CHECK_SEC seconds (or immediately after /refresh).
+STORE_CHECK_SEC = 5.0
+_stores: dict[Path, HistoryStore] = {}
+_stores_lock = threading.Lock()
+
+def _history_store(csv_path: Path) -> HistoryStore:
+    with _stores_lock:
+        store = _stores.get(csv_path)
+        if store is None:
+            store = _stores[csv_path] = HistoryStore(csv_path, PowerballRules(), check_interval=STORE_CHECK_SEC)
+        return store
+
+# Overlap requests that are satisfiable only in rare corners of the draw
+# space give up after this many rejected candidates (a fraction of a second)
+API_OVERLAP_TRIES = 20_000
+
+@lru_cache(maxsize=8)
+def _overlap_index(snapshot: HistorySnapshot, k: int, with_red: bool) -> OverlapIndex:
+    return OverlapIndex(snapshot, k, ignore_red=not with_red)
+
+# ----- Generator -----
+def _draw_json(draw: Draw) -> dict:
+    return {"white": list(draw.whites), "red": draw.red}
+
+def generate_unique_draws(csv_path: Path, count: int, seed: int | None, rules: PowerballRules,
+                          overlap_k: int | None = None, overlap_with_red: bool = False) -> list[Draw]:
+    # A per-request DrawGenerator keeps seeded requests reproducible while
+    # FastAPI runs them concurrently on its thread pool.
+    history = _history_store(csv_path).snapshot()
+    overlap = None
+    if overlap_k is not None:
+        overlap = _overlap_index(history, overlap_k, overlap_with_red)
+    return DrawGenerator(rules, seed=seed).unique(history, count, overlap, max_tries_per_pick=API_OVERLAP_TRIES)
 
 # ----- FastAPI app -----
 app = FastAPI(title="Powerball Unique API")
@@ -83,8 +81,13 @@ else:
 # ----- Data file resolver -----
 SORTED_CSV = PROJECT_ROOT / "data" / "powerball_history_sorted.csv"
 FULL_CSV = PROJECT_ROOT / "data" / "powerball_history_full.csv"
+# Optional SQLite history (created with `scrape_powerball_official.py ... --db`);
+# preferred when present since readers and the refresh job can share it.
+HISTORY_DB = PROJECT_ROOT / "data" / "powerball_history.db"
 
 def _resolve_data_file() -> Path | None:
+    if HISTORY_DB.exists():
+        return HISTORY_DB
     if SORTED_CSV.exists():
         return SORTED_CSV
     if FULL_CSV.exists():
@@ -95,26 +98,11 @@ def _resolve_data_file() -> Path | None:
 _refresh_lock = threading.Lock()
 
 def _read_latest(csv_path: Path) -> dict | None:
-    try:
-        with open(csv_path, newline="", encoding="utf-8") as f:
-            r = csv.reader(f)
-            header = next(r, None)
-            rows = list(r)
-            if not rows:
-                return None
-            try:
-                latest = max(rows, key=lambda row: row[0])  # YYYY-MM-DD sorts lexicographically
-            except Exception:
-                latest = rows[-1]
-            return {
-                "date": latest[0],
-                "white": [int(latest[1]), int(latest[2]), int(latest[3]), int(latest[4]), int(latest[5])],
-                "red": int(latest[6]) if len(latest) > 6 and latest[6] else None,
-            }
-    except FileNotFoundError:
-        return None
-    except Exception:
+    latest = _history_store(csv_path).snapshot().latest()
+    if latest is None:
         return None
+    day, draw = latest
+    return {"date": day.isoformat(), **_draw_json(draw)}
 
 @app.post("/refresh")
 def refresh():
@@ -126,17 +114,16 @@ def refresh():
         return JSONResponse(status_code=500, content={"error": "scraper not found", "path": str(scraper)})
 
     with _refresh_lock:
-        before = 0
-        try:
-            if data_path.exists():
-                with open(data_path, newline="", encoding="utf-8") as f:
-                    before = sum(1 for _ in f) - 1
-        except Exception:
-            before = 0
+        store = _history_store(data_path)
+        store.refresh()
+        before = store.snapshot().rows
 
         try:
+            cmd = [sys.executable, str(scraper), str(data_path)]
+            if data_path == HISTORY_DB:
+                cmd = [sys.executable, str(scraper), str(FULL_CSV), "--db", str(HISTORY_DB)]
             proc = subprocess.run(
-                [sys.executable, str(scraper), str(data_path)],
+                cmd,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 cwd=str(PROJECT_ROOT),
@@ -153,13 +140,8 @@ def refresh():
                 "stderr": proc.stderr,
             })
 
-        after = before
-        try:
-            if data_path.exists():
-                with open(data_path, newline="", encoding="utf-8") as f:
-                    after = sum(1 for _ in f) - 1
-        except Exception:
-            pass
+        store.refresh()
+        after = store.snapshot().rows
 
         latest_info = _read_latest(data_path)
         return {
@@ -181,9 +163,37 @@ def latest():
         return JSONResponse(status_code=404, content={"error": "No rows in data file"})
     return info
 
+@app.get("/history")
+def history(start: date | None = None, end: date | None = None):
+    """Draws with start <= date <= end (ISO dates, both optional), oldest first."""
+    data_path = _resolve_data_file()
+    if data_path is None:
+        return JSONResponse(status_code=404, content={"error": "Data file not found"})
+    rows = _history_store(data_path).range(start, end)
+    return [{"date": day.isoformat(), **_draw_json(draw)} for day, draw in rows]
+
+@app.get("/drawn")
+def drawn(white: list[int] = Query(...), red: int = Query(...)):
+    """Whether this exact combination has come up before."""
+    data_path = _resolve_data_file()
+    if data_path is None:
+        return JSONResponse(status_code=404, content={"error": "Data file not found"})
+    rules = PowerballRules()
+    whites = tuple(sorted(white))
+    try:
+        rules.validate(whites, red)
+    except ValueError as e:
+        return JSONResponse(status_code=422, content={"error": str(e)})
+    return {"white": list(whites), "red": red, "drawn": _history_store(data_path).contains((whites, red))}
+
 # ----- API endpoint -----
 @app.get("/generate")
-def generate(count: int = Query(5, ge=1, le=50), seed: int | None = None):
+def generate(
+    count: int = Query(5, ge=1, le=50),
+    seed: int | None = None,
+    overlap_k: int | None = Query(None, ge=1, le=5, description="Reject picks sharing this many whites with a past draw"),
+    overlap_with_red: bool = False,
+):
     data_path = _resolve_data_file()
     if data_path is None:
         return JSONResponse(
@@ -195,5 +205,24 @@ def generate(count: int = Query(5, ge=1, le=50), seed: int | None = None):
             },
         )
     rules = PowerballRules()
-    draws = generate_unique_draws(data_path, count=count, seed=seed, rules=rules)
-    return [{"white": d.white, "red": d.red} for d in draws]
\ No newline at end of file
+    try:
+        draws = generate_unique_draws(data_path, count=count, seed=seed, rules=rules,
+                                      overlap_k=overlap_k, overlap_with_red=overlap_with_red)
+    except RuntimeError as e:
+        return JSONResponse(status_code=422, content={"error": str(e)})
+    return [_draw_json(d) for d in draws]
+
+@app.get("/generate/stream")
+def generate_stream(count: int = Query(1000, ge=1, le=1_000_000), seed: int | None = None):
+    """Stream picks as NDJSON, one {"white": [...], "red": n} object per line."""
+    data_path = _resolve_data_file()
+    if data_path is None:
+        return JSONResponse(status_code=503, content={"error": "Data file not found"})
+    rules = PowerballRules()
+    history = _history_store(data_path).snapshot()
+
+    def lines():
+        for draw in islice(iter_unique(history, rules, seed=seed), count):
+            yield json.dumps(_draw_json(draw)) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
\ No newline at end of file
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""Compare generate_unique (scalar) with generate_unique_bulk (NumPy) throughput."""
+from __future__ import annotations
+import argparse
+import time
+# allow running directly without editable install
+import sys, pathlib
+ROOT = pathlib.Path(__file__).resolve().parents[1]  # project root
+sys.path.insert(0, str(ROOT / "src"))
+from lotto.rules import PowerballRules
+from lotto.history import load_history_csv
+from lotto.generate import generate_unique, generate_unique_bulk
+
+def _timed(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--file", default=str(ROOT / "data" / "powerball_history_full.csv"),
+                    help="CSV file with past Powerball results")
+    ap.add_argument("--sizes", type=float, nargs="+", default=[1e3, 1e4, 1e5, 1e6, 1e7],
+                    help="Pick counts to benchmark (1e8 needs several GB of RAM)")
+    ap.add_argument("--scalar-max", type=float, default=1e5,
+                    help="Skip the scalar path above this many picks")
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    rules = PowerballRules()
+    history = load_history_csv(args.file, rules)
+    generate_unique_bulk(history, rules, count=10, seed=args.seed)  # warm up NumPy
+    print(f"{'picks':>12}  {'scalar/s':>12}  {'bulk/s':>12}  {'speedup':>8}")
+    for size in args.sizes:
+        n = int(size)
+        scalar = None
+        if n <= args.scalar_max:
+            scalar = n / _timed(lambda: generate_unique(history, rules, count=n, seed=args.seed))
+        bulk = n / _timed(lambda: generate_unique_bulk(history, rules, count=n, seed=args.seed))
+        s_txt = f"{scalar:12,.0f}" if scalar else f"{'-':>12}"
+        ratio = f"{bulk / scalar:7.1f}x" if scalar else f"{'-':>8}"
+        print(f"{n:12,d}  {s_txt}  {bulk:12,.0f}  {ratio}")
+
+if __name__ == "__main__":
+    main()
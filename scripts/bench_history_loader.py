@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""Benchmark load_history_csv: header-detected fast path vs the heuristic row parser."""
+from __future__ import annotations
+import argparse
+import csv
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+# allow running directly without editable install
+import sys, pathlib
+ROOT = pathlib.Path(__file__).resolve().parents[1]  # project root
+sys.path.insert(0, str(ROOT / "src"))
+from lotto.rules import PowerballRules
+from lotto.history import load_history_csv, SCRAPER_HEADER
+
+def write_synthetic(path: pathlib.Path, rows: int, seed: int = 1) -> None:
+    """Write `rows` scraper-format rows with random valid draws."""
+    rng = random.Random(seed)
+    day = date(1900, 1, 1)
+    with path.open("w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(SCRAPER_HEADER)
+        for _ in range(rows):
+            whites = sorted(rng.sample(range(1, 70), 5))
+            iso = day.isoformat()
+            w.writerow([iso, *whites, rng.randint(1, 26), rng.choice(("", "2", "3")),
+                        f"https://www.powerball.com/draw-result?gc=powerball&date={iso}"])
+            day += timedelta(days=1)
+
+def _rate(path: pathlib.Path, rows: int, strict: bool | None) -> float:
+    rules = PowerballRules()
+    t0 = time.perf_counter()
+    load_history_csv(path, rules, strict=strict)
+    return rows / (time.perf_counter() - t0)
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--sizes", type=float, nargs="+", default=[1e3, 1e4, 1e5, 1e6],
+                    help="Synthetic file sizes in rows (1e7 writes a ~1 GB file)")
+    args = ap.parse_args()
+
+    print(f"{'rows':>12}  {'heuristic rows/s':>18}  {'fast rows/s':>14}  {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            rows = int(size)
+            path = pathlib.Path(tmp) / f"synthetic_{rows}.csv"
+            write_synthetic(path, rows)
+            slow = _rate(path, rows, strict=False)
+            fast = _rate(path, rows, strict=None)
+            print(f"{rows:12,d}  {slow:18,.0f}  {fast:14,.0f}  {fast / slow:7.1f}x")
+            path.unlink()
+
+if __name__ == "__main__":
+    main()
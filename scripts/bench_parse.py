@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Benchmark result-page parsing: BeautifulSoup get_text + regex vs lotto.parse (lxml XPath)."""
+from __future__ import annotations
+import argparse
+import random
+import resource
+import subprocess
+import tempfile
+import time
+from datetime import date, timedelta
+# allow running directly without editable install
+import sys, pathlib
+ROOT = pathlib.Path(__file__).resolve().parents[1]  # project root
+sys.path.insert(0, str(ROOT / "src"))
+from lotto.parse import parse_results_page, parse_results_text
+
+METHODS = ("soup", "lxml")
+# ru_maxrss is in bytes on macOS, KiB on Linux; peak RSS (not tracemalloc) so libxml2's own allocations count
+_MAXRSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+def _peak_rss() -> int:
+    """Peak resident set size of this process so far, in bytes."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _MAXRSS_UNIT
+
+def fixture_page(day: date, cards: int, rng: random.Random) -> str:
+    """A Previous Results page shaped like powerball.com's: chrome, scripts, then `cards` result cards."""
+    parts = ["<!DOCTYPE html><html><head><meta charset='utf-8'><title>Previous Results | Powerball</title>",
+             "<script>" + "var cfg = {};" * 2000 + "</script>",
+             "<style>" + ".x{color:red}" * 1000 + "</style></head><body>",
+             "<nav>" + "".join(f"<a href='/x{i}'>Link {i}</a>" for i in range(150)) + "</nav>",
+             "<main><div class='results'>"]
+    for _ in range(cards):
+        whites = sorted(rng.sample(range(1, 70), 5))
+        parts.append(
+            f"<a class='card' href='/draw-result?gc=powerball&date={day.isoformat()}'><div class='card-body'>"
+            f"<h5 class='card-title'>{day.strftime('%a, %b')} {day.day}, {day.year}</h5><div class='game-ball-group'>"
+            + "".join(f"<div class='form-control col white-balls item-powerball'>{w}</div>" for w in whites)
+            + f"<div class='form-control col powerball item-powerball'>{rng.randint(1, 26)}</div></div>"
+            f"<div class='power-play'><span>Power Play</span> <span class='multiplier'>{rng.choice((2, 3, 4))}x</span>"
+            "</div></div></a>"
+        )
+        day -= timedelta(days=rng.choice((2, 3)))
+    parts.append("</div></main><footer>" + "<p>Must be 18 or older to play.</p>" * 50 + "</footer></body></html>")
+    return "".join(parts)
+
+def write_fixtures(out: pathlib.Path, pages: int, cards: int, seed: int = 1) -> None:
+    rng = random.Random(seed)
+    day = date(2025, 8, 27)
+    for i in range(pages):
+        (out / f"page_{i:04d}.html").write_text(fixture_page(day, cards, rng), encoding="utf-8")
+        day -= timedelta(days=cards * 3)
+
+def parse_soup(page: bytes):
+    """The scraper's previous path: full soup, flattened text, regex."""
+    from bs4 import BeautifulSoup
+    return list(parse_results_text(BeautifulSoup(page, "lxml").get_text(separator=" ", strip=True)))
+
+def _child(method: str, paths) -> None:
+    pages = [p.read_bytes() for p in paths]
+    parse = parse_soup if method == "soup" else parse_results_page
+    if method == "soup":
+        import bs4  # noqa: F401  (imported before measuring, so its import is not in the peak)
+    base = _peak_rss()
+    t0 = time.perf_counter()
+    cards = sum(len(parse(p)) for p in pages)
+    elapsed = time.perf_counter() - t0
+    peak = _peak_rss() - base
+    print(f"{len(pages) / elapsed} {cards} {peak}")
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--pages", help="Directory of saved .html pages (or an HTTP cache from the scraper); "
+                                    "default: generate fixture pages")
+    ap.add_argument("--fixtures", type=int, default=40, help="Fixture pages to generate")
+    ap.add_argument("--cards", type=int, default=50, help="Result cards per fixture page")
+    ap.add_argument("--child", choices=METHODS, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        _child(args.child, sorted(pathlib.Path(args.pages).iterdir()))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pages = pathlib.Path(tmp)
+        if args.pages:
+            src = pathlib.Path(args.pages)
+            for i, p in enumerate(sorted(src.glob("*.html")) + sorted(src.glob("*.body"))):
+                (pages / f"page_{i:04d}.html").write_bytes(p.read_bytes())
+        else:
+            write_fixtures(pages, args.fixtures, args.cards)
+        files = sorted(pages.iterdir())
+        if not files:
+            sys.exit(f"No pages found in {args.pages}")
+        size = sum(p.stat().st_size for p in files) / len(files)
+        print(f"{len(files)} pages, {size / 1024:,.0f} KiB each")
+        print(f"{'parser':>8}  {'pages/s':>10}  {'cards':>8}  {'peak MiB':>9}")
+        rates = {}
+        for method in METHODS:
+            # a fresh process per parser, so each peak RSS is its own
+            out = subprocess.run([sys.executable, __file__, "--child", method, "--pages", tmp],
+                                 check=True, capture_output=True, text=True).stdout.split()
+            rate, cards, peak = float(out[0]), int(out[1]), int(out[2])
+            rates[method] = rate
+            print(f"{method:>8}  {rate:10,.1f}  {cards:8,d}  {peak / 2**20:9.1f}")
+        print(f"speedup: {rates['lxml'] / rates['soup']:.1f}x")
+
+if __name__ == "__main__":
+    main()
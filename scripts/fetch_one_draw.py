@@ -1,39 +1,23 @@
 #!/usr/bin/env python3
 from __future__ import annotations
-import csv, sys, re
+import csv, sys
 from pathlib import Path
 from datetime import datetime, date
 import requests
-from bs4 import BeautifulSoup
+# allow running directly without editable install
+import pathlib
+ROOT = pathlib.Path(__file__).resolve().parents[1]  # project root
+sys.path.insert(0, str(ROOT / "src"))
+from lotto.history import history_tail
+from lotto.parse import parse_results_page
 
 PREV_RESULTS_URL = "https://www.powerball.com/previous-results"
 
-DATE_NUMS_RE = re.compile(
-    r'(?P<dow>Mon|Tue|Wed|Thu|Fri|Sat|Sun),\s+'
-    r'(?P<mon>[A-Za-z]{3})\s+(?P<day>\d{1,2}),\s+(?P<year>\d{4})\s+'
-    r'(?P<n1>\d{1,2})\s+(?P<n2>\d{1,2})\s+(?P<n3>\d{1,2})\s+(?P<n4>\d{1,2})\s+(?P<n5>\d{1,2})\s+'
-    r'(?P<pb>\d{1,2})(?:\s+Power\s+Play\s+(?P<pp>\d+)x)?'
-)
-MONTHS = {m: i for i, m in enumerate(
-    ["Jan","Feb","Mar","Apr","May","Jun","Jul","Aug","Sep","Oct","Nov","Dec"], start=1
-)}
-
-def parse_prev_results(text: str):
-    for m in DATE_NUMS_RE.finditer(text):
-        datestr = f"{m.group('dow')}, {m.group('mon')} {m.group('day')}, {m.group('year')}"
-        d = datetime.strptime(datestr, "%a, %b %d, %Y").date()
-        whites = sorted([int(m.group(f"n{i}")) for i in range(1,6)])
-        pb = int(m.group("pb"))
-        pp = m.group("pp") or ""
-        yield d, whites, pb, pp
-
 def fetch_one(dt: date):
     params = {"gc": "powerball", "sd": dt.isoformat(), "ed": dt.isoformat()}
     r = requests.get(PREV_RESULTS_URL, params=params, timeout=30)
     r.raise_for_status()
-    soup = BeautifulSoup(r.text, "lxml")
-    text = soup.get_text(separator=" ", strip=True)
-    for d, whites, pb, pp in parse_prev_results(text):
+    for d, whites, pb, pp in parse_results_page(r.content):
         if d == dt and all(1 <= w <= 69 for w in whites) and 1 <= pb <= 26:
             url = f"{PREV_RESULTS_URL}?gc=powerball&sd={dt.isoformat()}&ed={dt.isoformat()}"
             return [d.isoformat(), *map(str, whites), str(pb), pp, url]
@@ -47,15 +31,8 @@ def append_row(csv_path: Path, row: list[str]):
             w.writerow(["date","w1","w2","w3","w4","w5","powerball","power_play","source_url"])
             w.writerow(row)
     else:
-        # avoid duplicate date
-        have = set()
-        with csv_path.open("r", encoding="utf-8", newline="") as f:
-            r = csv.reader(f)
-            next(r, None)
-            for rr in r:
-                if rr and rr[0]:
-                    have.add(rr[0])
-        if row[0] in have:
+        # avoid duplicate date (only rows appended since the last check are parsed)
+        if row[0] in history_tail(csv_path).dates:
             print(f"Date {row[0]} already in CSV; not appending.")
             return
         with csv_path.open("a", encoding="utf-8", newline="") as f:
@@ -2,27 +2,22 @@
 from __future__ import annotations
 import csv, sys
 from pathlib import Path
-from datetime import date, timedelta
+from datetime import date
+# allow running directly without editable install
+import pathlib
+ROOT = pathlib.Path(__file__).resolve().parents[1]  # project root
+sys.path.insert(0, str(ROOT / "src"))
+from lotto.history import iso_ordinal
+from lotto.schedule import FIRST_DRAW as START, count_scheduled, missing_dates
 
-START = date(2015, 10, 7)
-MON_START = date(2021, 8, 23)  # Mondays added
-
-def is_scheduled_draw(d: date) -> bool:
-    if d < START:
-        return False
-    if d >= MON_START:
-        return d.weekday() in (0, 2, 5)  # Mon(0), Wed(2), Sat(5)
-    else:
-        return d.weekday() in (2, 5)
-
-def read_dates(csv_path: Path) -> set[str]:
+def read_dates(csv_path: Path) -> set[date]:
     got = set()
     with csv_path.open("r", encoding="utf-8", newline="") as f:
         r = csv.reader(f)
         next(r, None)
         for row in r:
-            if row and row[0]:
-                got.add(row[0])
+            if row and iso_ordinal(row[0]):
+                got.add(date.fromordinal(iso_ordinal(row[0])))
     return got
 
 def main():
@@ -34,16 +29,10 @@ def main():
         print("CSV not found:", p)
         sys.exit(2)
 
-    have = read_dates(p)
     today = date.today()
-    missing = []
-    d = START
-    while d <= today:
-        if is_scheduled_draw(d) and d.isoformat() not in have:
-            missing.append(d.isoformat())
-        d += timedelta(days=1)
+    missing = [d.isoformat() for d in missing_dates(read_dates(p), START, today)]
 
-    print(f"Total scheduled draws since {START}: {len(missing) + len(have)}")
+    print(f"Total scheduled draws since {START}: {count_scheduled(START, today)}")
     print(f"Missing: {len(missing)}")
     for m in missing[:200]:
         print(m)
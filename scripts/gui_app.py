@@ -406,26 +406,16 @@ def _acquire_single_instance_lock():
 # CSVs live in the writable user folder
 BASE_CSV   = APP_DATA / "powerball_history_full.csv"
 SORTED_CSV = APP_DATA / "powerball_history_full_sorted.csv"
-DATA_PATH  = SORTED_CSV  # GUI reads the sorted file
+DATA_PATH  = BASE_CSV    # GUI reads the append-only file; SORTED_CSV is written only when opened
 
-# --- Helper: Save generated picks to CSV in app data dir ---
+# Picks saved by earlier versions (timestamp,latest_draw,w1..w5,powerball); they are
+# imported into the pick ledger once, then the file is set aside under PICKS_CSV_IMPORTED.
 PICKS_CSV = APP_DATA / "generated_picks.csv"
+PICKS_CSV_IMPORTED = APP_DATA / "generated_picks.imported.csv"
 
 def format_pick(whites, red) -> str:
     return f"{' '.join(f'{n:02d}' for n in whites)}  |  PB {red:02d}"
 
-def append_picks_to_csv(picks, latest_date: str):
-    """Append generated picks to PICKS_CSV with a timestamp and latest draw reference."""
-    PICKS_CSV.parent.mkdir(parents=True, exist_ok=True)
-    new_file = not PICKS_CSV.exists()
-    with PICKS_CSV.open("a", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        if new_file:
-            w.writerow(["timestamp", "latest_draw", "w1","w2","w3","w4","w5","powerball"])  # header
-        ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        for whites, red in picks:
-            w.writerow([ts, latest_date, *whites, red])
-
 # Scraper script still comes from bundled resources
 SCRAPER = ROOT / "scripts" / "scrape_powerball_official.py"
 
@@ -433,61 +423,72 @@ SCRAPER = ROOT / "scripts" / "scrape_powerball_official.py"
 # ensure we can import from src/ even if editable install isn't present
 sys.path.insert(0, str(ROOT / "src"))
 from lotto.rules import PowerballRules
-from lotto.history import load_history_csv
-from lotto.generate import generate_unique
+from lotto.generate import DrawGenerator
+from lotto.store import HistoryStore, HistorySnapshot
+from lotto.history import history_tail, update_sorted_view
+from lotto.ledger import PickLedger
+
+# Every pick shown is recorded here and never offered again.
+PICKS_LEDGER = APP_DATA / "generated_picks.ledger"
+_pick_ledger: PickLedger | None = None
+
+def _import_picks_csv(ledger: PickLedger) -> None:
+    """Move the picks in PICKS_CSV into the ledger, then set the CSV aside so this runs once."""
+    picks = []
+    with PICKS_CSV.open("r", encoding="utf-8", newline="") as f:
+        r = csv.reader(f)
+        next(r, None)  # header
+        for row in r:
+            try:
+                whites, red = tuple(sorted(int(x) for x in row[2:7])), int(row[7])
+                ledger.rules.validate(whites, red)
+            except (ValueError, IndexError):
+                continue
+            picks.append((whites, red))
+    ledger.add(picks)
+    # only after the picks are in the ledger: an interrupted import is redone (add() skips duplicates)
+    os.replace(PICKS_CSV, PICKS_CSV_IMPORTED)
+
+def pick_ledger() -> PickLedger:
+    global _pick_ledger
+    if _pick_ledger is None:
+        PICKS_LEDGER.parent.mkdir(parents=True, exist_ok=True)
+        _pick_ledger = PickLedger(PICKS_LEDGER, PowerballRules())
+        if PICKS_CSV.exists():
+            _import_picks_csv(_pick_ledger)
+    return _pick_ledger
+
+# Parsed once per session; each call only re-checks the file's stat.
+_history_stores: dict[Path, HistoryStore] = {}
+
+def _history_store(path: Path) -> HistoryStore:
+    store = _history_stores.get(path)
+    if store is None:
+        store = _history_stores[path] = HistoryStore(path, PowerballRules())
+    else:
+        store.refresh()
+    return store
+
+def history_snapshot() -> HistorySnapshot:
+    return _history_store(DATA_PATH).snapshot()
 
 
 def latest_date_in_csv(path: Path) -> str | None:
     if not path.exists():
         return None
-    last = None
-    with path.open("r", encoding="utf-8", newline="") as f:
-        r = csv.reader(f)
-        next(r, None)  # header
-        for row in r:
-            if row and row[0]:
-                last = row[0]
-    return last
+    latest = _history_store(path).snapshot().dates.latest()
+    return latest[0].isoformat() if latest else None
 
 
 def count_rows(path: Path) -> int:
     if not path.exists():
         return 0
-    rows = 0
-    with path.open("r", encoding="utf-8", newline="") as f:
-        r = csv.reader(f)
-        next(r, None)  # header
-        for _ in r:
-            rows += 1
-    return rows
+    return history_tail(path).rows
 
 
 def sort_csv_desc(in_path: Path, out_path: Path) -> None:
-    if not in_path.exists():
-        return
-    with in_path.open("r", encoding="utf-8", newline="") as f:
-        r = list(csv.reader(f))
-    if not r:
-        return
-    header, rows = r[0], r[1:]
-    rows.sort(key=lambda row: row[0], reverse=True)  # ISO dates sort lexicographically
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    with out_path.open("w", encoding="utf-8", newline="") as f:
-        w = csv.writer(f)
-        w.writerow(header)
-        w.writerows(rows)
-
-
-def latest_date_in_sorted(path: Path) -> str | None:
-    if not path.exists():
-        return None
-    with path.open("r", encoding="utf-8", newline="") as f:
-        r = csv.reader(f)
-        header = next(r, None)
-        first = next(r, None)
-        if first and first[0]:
-            return first[0]
-    return None
+    # a stat when nothing changed; new rows are merged in at the head, the full sort only runs on first build
+    update_sorted_view(in_path, out_path)
 
 
 # Ensure scraper dependencies are available in the current interpreter
@@ -531,7 +532,7 @@ def run_scraper():
     import runpy
 
     # Compute incremental start date = (latest in sorted) + 1 day
-    latest = latest_date_in_sorted(SORTED_CSV)
+    latest = latest_date_in_csv(DATA_PATH)
     since_arg = None
     if latest:
         try:
@@ -847,7 +848,7 @@ class App(tk.Tk):
 
     def ensure_csv_ready(self):
         (BASE_CSV.parent).mkdir(parents=True, exist_ok=True)
-        # If we don't have a base CSV or it's empty, scrape to build it, then sort
+        # If we don't have a base CSV or it's empty, scrape to build it
         needs_build = (not BASE_CSV.exists()) or count_rows(BASE_CSV) == 0
         if needs_build:
             self.status.set("Building data file… (first run)")
@@ -856,14 +857,12 @@ class App(tk.Tk):
                 run_scraper()  # writes BASE_CSV
             except Exception as e:
                 self._msg("error", "Scrape error", str(e))
-        # Always (re)generate the sorted view
-        sort_csv_desc(BASE_CSV, SORTED_CSV)
         self.update_idletasks()
 
     def update_status(self):
-        latest = latest_date_in_sorted(SORTED_CSV) or "N/A"
-        rows = count_rows(BASE_CSV)
-        self.status.set(f"Data file: {SORTED_CSV.name} — {rows} draws. Latest draw: {latest}")
+        latest = latest_date_in_csv(DATA_PATH) or "N/A"
+        rows = count_rows(DATA_PATH)
+        self.status.set(f"Data file: {DATA_PATH.name} — {rows} draws. Latest draw: {latest}")
 
     def _on_canvas_resize(self, event):
         # keep inner frame same width as canvas for nicer layout
@@ -877,19 +876,20 @@ class App(tk.Tk):
         try:
             run_scraper()          # updates BASE_CSV
             _log_window_event("on_refresh_data: scraper returned")
-            sort_csv_desc(BASE_CSV, SORTED_CSV)
             self.update_status()
             # Remove any accidental extra top-levels before showing the dialog
             self._cleanup_ghost_windows()
-            self._msg("info", "Done", "Data refreshed and sorted (newest first).")
+            self._msg("info", "Done", "Data refreshed.")
         except Exception as e:
             self._msg("error", "Scrape error", str(e))
 
     def on_open_csv(self):
         try:
-            if not SORTED_CSV.exists():
-                self._msg("error", "Error", f"CSV not found at {SORTED_CSV}")
+            if not DATA_PATH.exists():
+                self._msg("error", "Error", f"CSV not found at {DATA_PATH}")
                 return
+            # the newest-first copy is only needed here, so it is brought up to date on demand
+            sort_csv_desc(DATA_PATH, SORTED_CSV)
             # Open with the OS default application for .csv
             if sys.platform == "darwin":
                 subprocess.run(["open", str(SORTED_CSV)], check=False)
@@ -918,29 +918,24 @@ class App(tk.Tk):
 
     def on_generate(self):
         try:
-            if not SORTED_CSV.exists():
-                self._msg("error", "Error", f"CSV not found at {SORTED_CSV}")
+            if not DATA_PATH.exists():
+                self._msg("error", "Error", f"CSV not found at {DATA_PATH}")
                 return
 
             rules = PowerballRules()
-            history = load_history_csv(SORTED_CSV, rules)
+            history = history_snapshot()
 
             seed_txt = self.seed_var.get().strip()
-            seed = int(seed_txt) if seed_txt else None
-            if seed is not None:
-                random.seed(seed)
-            else:
-                random.seed()  # fresh randomness
+            seed = int(seed_txt) if seed_txt else None  # None -> fresh randomness
 
             count = max(1, int(self.count_var.get()))
-            picks = generate_unique(history, rules, count=count, seed=None)
+            ledger = pick_ledger()
+            picks = DrawGenerator(rules, seed=seed).unique(history, count, exclude=ledger)
+            ledger.add(picks)
 
-            latest = latest_date_in_sorted(SORTED_CSV) or 'N/A'
+            latest = latest_date_in_csv(DATA_PATH) or 'N/A'
             self.out_summary.configure(text=f"Latest draw in file: {latest}   •   Generated {len(picks)} unique picks:")
 
-            # persist picks to CSV in Application Support
-            append_picks_to_csv(picks, latest)
-
             # clear previous drawings
             for child in self.inner.winfo_children():
                 child.destroy()
@@ -1,49 +1,190 @@
 #!/usr/bin/env python3
 from __future__ import annotations
-import random
 import argparse
+import csv
+import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
 # allow running directly without editable install
 import sys, pathlib
 ROOT = pathlib.Path(__file__).resolve().parents[1]  # project root
 sys.path.insert(0, str(ROOT / "src"))
 from lotto.rules import PowerballRules
-from lotto.history import load_history_csv
-from lotto.generate import generate_unique, total_space
-
-def _latest_date_in_history(path: str) -> str | None:
-    import csv
-    from pathlib import Path
-    p = Path(path)
-    if not p.exists():
-        return None
-    last_date = None
-    with p.open("r", encoding="utf-8", newline="") as f:
-        r = csv.reader(f)
-        next(r, None)  # header
-        for row in r:
-            if row and row[0]:
-                last_date = row[0]
-    return last_date
+from lotto.store import HistoryStore
+from lotto.ledger import PickLedger
+from lotto.constraints import DrawConstraints
+from lotto.overlap import OverlapIndex
+from lotto.generate import (
+    DrawGenerator, generate_unique, generate_unique_parallel, iter_unique, total_space,
+)
+
+# --- batch mode ---
+# One JSON object per input line, e.g.
+#   {"id": "a", "seed": 1, "count": 5}
+#   {"seed": 2, "count": 3, "constraints": {"min_sum": 100, "odd_counts": [2, 3]}}
+#   {"count": 5, "max_overlap": 3, "overlap_with_red": false}
+SPEC_KEYS = {"id", "seed", "count", "constraints", "max_overlap", "overlap_with_red"}
+CSV_HEADER = ["line", "id", "seed", "w1", "w2", "w3", "w4", "w5", "powerball", "error"]
+
+def _read_specs(f):
+    """Yield (line number, spec dict or error message) for each non-blank line."""
+    for n, line in enumerate(f, 1):
+        if not line.strip():
+            continue
+        try:
+            spec = json.loads(line)
+            if not isinstance(spec, dict):
+                raise ValueError("spec must be a JSON object")
+            unknown = set(spec) - SPEC_KEYS
+            if unknown:
+                raise ValueError(f"unknown keys: {', '.join(sorted(unknown))}")
+        except ValueError as e:
+            yield n, str(e)
+            continue
+        yield n, spec
+
+def _run_spec(spec: dict, history, rules: PowerballRules, overlap_index):
+    count = int(spec.get("count", 5))
+    if count < 1:
+        raise ValueError("count must be at least 1")
+    gen = DrawGenerator(rules, seed=spec.get("seed"))
+    if spec.get("constraints"):
+        if spec.get("max_overlap") is not None:
+            raise ValueError("constraints cannot be combined with max_overlap")
+        return gen.constrained(history, count, DrawConstraints(**spec["constraints"]))
+    overlap = None
+    if spec.get("max_overlap") is not None:
+        k = int(spec["max_overlap"])
+        if not 1 <= k <= rules.white_count:
+            raise ValueError(f"max_overlap must be between 1 and {rules.white_count}")
+        with_red = spec.get("overlap_with_red", False)
+        if not isinstance(with_red, bool):
+            raise ValueError("overlap_with_red must be true or false")
+        overlap = overlap_index(k, with_red)
+    return gen.unique(history, count, overlap)
+
+def run_batch(specs_in, out, history, rules: PowerballRules, fmt: str = "jsonl", threads: int = 1) -> int:
+    """
+    Run every spec against one loaded history and write results in input
+    order as they complete; returns the number of failed specs. A bad spec
+    produces an error record instead of stopping the batch.
+    """
+    overlap_index = lru_cache(maxsize=None)(lambda k, with_red: OverlapIndex(history, k, ignore_red=not with_red))
+
+    def job(item):
+        n, spec = item
+        if isinstance(spec, str):
+            return n, {}, None, spec
+        try:
+            return n, spec, _run_spec(spec, history, rules, overlap_index), None
+        except Exception as e:  # any failure is this spec's error record, e.g. OverflowError from count 1e400
+            return n, spec, None, str(e) or type(e).__name__
+
+    writer = csv.writer(out) if fmt == "csv" else None
+    if writer is not None:
+        writer.writerow(CSV_HEADER)
+    failed = 0
+
+    def emit(result):
+        nonlocal failed
+        n, spec, picks, error = result
+        failed += error is not None
+        if writer is None:
+            rec = {"line": n, "id": spec.get("id"), "seed": spec.get("seed")}
+            if error is None:
+                rec["picks"] = [{"white": list(whites), "red": red} for whites, red in picks]
+            else:
+                rec["error"] = error
+            out.write(json.dumps(rec) + "\n")
+        elif error is not None:
+            writer.writerow([n, spec.get("id", ""), spec.get("seed", ""), "", "", "", "", "", "", error])
+        else:
+            for whites, red in picks:
+                writer.writerow([n, spec.get("id", ""), spec.get("seed", ""), *whites, red, ""])
+        out.flush()
+
+    items = _read_specs(specs_in)
+    if threads <= 1:
+        for item in items:
+            emit(job(item))
+        return failed
+    # bounded window of in-flight specs, drained from the left to keep input order
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        pending = deque()
+        for item in items:
+            pending.append(pool.submit(job, item))
+            if len(pending) >= 4 * threads:
+                emit(pending.popleft().result())
+        while pending:
+            emit(pending.popleft().result())
+    return failed
 
 def main():
     ap = argparse.ArgumentParser(description="Generate Powerball draws never seen in history.")
     ap.add_argument("--file", required=True, help="CSV file with past Powerball results")
     ap.add_argument("--count", type=int, default=5, help="How many new draws to produce")
     ap.add_argument("--seed", type=int, default=None, help="Optional RNG seed for reproducibility")
+    ap.add_argument("--stream", action="store_true",
+                    help="Print picks as they are generated instead of collecting them first "
+                         "(uses the seekable stream, so seeded output differs from the default mode)")
+    ap.add_argument("--jobs", type=int, default=None,
+                    help="Generate across this many worker processes; output depends only on "
+                         "--seed, not on the number of jobs")
+    ap.add_argument("--max-overlap", type=int, default=None, metavar="K",
+                    help="Reject picks sharing K or more white balls with any past draw")
+    ap.add_argument("--overlap-with-red", action="store_true",
+                    help="With --max-overlap, only count overlaps that also share the red ball")
+    ap.add_argument("--ledger", default=None, metavar="PATH",
+                    help="Never repeat a pick recorded in this ledger, and record the new ones")
+    ap.add_argument("--batch", default=None, metavar="SPECS",
+                    help="Read JSONL generation specs (seed, count, constraints, max_overlap) "
+                         "from this file, or - for stdin, and write one result per spec")
+    ap.add_argument("--format", choices=("jsonl", "csv"), default="jsonl",
+                    help="Output format for --batch")
+    ap.add_argument("--threads", type=int, default=1,
+                    help="With --batch, run this many specs concurrently (output stays in input order)")
     args = ap.parse_args()
-    if args.seed is not None:
-        random.seed(args.seed)
+    if args.batch is not None and (args.stream or args.jobs is not None or args.ledger is not None):
+        ap.error("--batch cannot be combined with --stream, --jobs or --ledger")
+    if args.max_overlap is not None and (args.stream or args.jobs is not None):
+        ap.error("--max-overlap cannot be combined with --stream or --jobs")
+    if args.max_overlap is not None and not 1 <= args.max_overlap <= PowerballRules().white_count:
+        ap.error(f"--max-overlap must be between 1 and {PowerballRules().white_count}")
+    if args.ledger is not None and (args.stream or args.jobs is not None):
+        ap.error("--ledger cannot be combined with --stream or --jobs")
 
     rules = PowerballRules()
-    history = load_history_csv(args.file, rules)
-    latest = _latest_date_in_history(args.file)
+    history = HistoryStore(args.file, rules).snapshot()
+    # in batch mode stdout carries only results
+    info = sys.stderr if args.batch is not None else sys.stdout
+    latest = history.dates.latest()
     if latest:
-        print(f"Latest draw in file: {latest}")
+        print(f"Latest draw in file: {latest[0].isoformat()}", file=info)
     universe = total_space(rules)
     print(f"Loaded {len(history)} historical draws. Total space: {universe:,}. "
-          f"Coverage: {len(history)/universe:.6%}")
+          f"Coverage: {len(history)/universe:.6%}", file=info)
+
+    if args.batch is not None:
+        specs_in = sys.stdin if args.batch == "-" else open(args.batch, "r", encoding="utf-8")
+        with specs_in:
+            failed = run_batch(specs_in, sys.stdout, history, rules, args.format, args.threads)
+        sys.exit(1 if failed else 0)
 
-    new_picks = generate_unique(history, rules, count=args.count, seed=args.seed)
+    if args.stream:
+        new_picks = islice(iter_unique(history, rules, seed=args.seed), args.count)
+    elif args.jobs is not None:
+        new_picks = generate_unique_parallel(history, rules, count=args.count,
+                                             seed=args.seed, jobs=args.jobs)
+    else:
+        ledger = PickLedger(args.ledger, rules) if args.ledger is not None else None
+        new_picks = generate_unique(history, rules, count=args.count, seed=args.seed,
+                                    overlap_k=args.max_overlap,
+                                    overlap_ignore_red=not args.overlap_with_red,
+                                    exclude=ledger)
+        if ledger is not None:
+            ledger.add(new_picks)
     print("\nNew unique draws (whites | PB):")
     for whites, red in new_picks:
         print(f"{' '.join(f'{w:02d}' for w in whites)} | {red:02d}")
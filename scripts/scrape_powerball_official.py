@@ -4,105 +4,219 @@ from __future__ import annotations
 import argparse
 from datetime import date, datetime, timedelta
 import csv
-import re
 import sys
+import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import Optional, Tuple, List
+from urllib.parse import parse_qs, urlsplit
+from typing import Dict, Optional, Set, Tuple, List
 
 import requests
-from bs4 import BeautifulSoup
 from tqdm import tqdm
+# allow running directly without editable install
+import pathlib
+ROOT = pathlib.Path(__file__).resolve().parents[1]  # project root
+sys.path.insert(0, str(ROOT / "src"))
+from lotto.history import history_tail, iso_ordinal
+from lotto.schedule import FIRST_DRAW, is_scheduled, missing_dates, scheduled_dates
+from lotto.sqlstore import HistoryDB
+from lotto.parse import parse_draw_page, parse_results_page
+from lotto.webcache import DEFAULT_FRESH_FOR, HTTPCache, cache_of, install_cache
 
 BASE = "https://www.powerball.com/draw-result"
-START = date(2015, 10, 7)      # first draw under current 5/69 + 1/26 rules
-MON_START = date(2021, 8, 23)  # Monday drawings added (Mon/Wed/Sat)
+START = FIRST_DRAW             # first draw under current 5/69 + 1/26 rules
 SLEEP_SEC = 0.25 #was 0.25
 TIMEOUT_SEC = 15
+RATE_PER_SEC = 1 / SLEEP_SEC   # default request rate, same average pace as the old serial loop
+MAX_IN_FLIGHT = 4
+WINDOW_DAYS = 120              # span of one sd..ed Previous Results request (~50 draws)
+OFFLINE_RATE = 1e6             # --offline replays from disk, no rate limit needed
+SETTLED_DAYS = 2               # a page fetched this many days after its last draw no longer changes
 
-# Stable Previous Results page and regex for server-rendered cards
+# Stable Previous Results page (server-rendered cards, read by lotto.parse)
 PREV_RESULTS_URL = "https://www.powerball.com/previous-results"
 
-# Regex to parse server-rendered "Previous Results" cards
-DATE_NUMS_RE = re.compile(
-    r'(?P<dow>Mon|Tue|Wed|Thu|Fri|Sat|Sun),\s+'
-    r'(?P<mon>[A-Za-z]{3})\s+(?P<day>\d{1,2}),\s+(?P<year>\d{4})\s+'
-    r'(?P<n1>\d{1,2})\s+(?P<n2>\d{1,2})\s+(?P<n3>\d{1,2})\s+(?P<n4>\d{1,2})\s+(?P<n5>\d{1,2})\s+'
-    r'(?P<pb>\d{1,2})(?:\s+Power\s+Play\s+(?P<pp>\d+)x)?'
-)
-
-# Parse the page's displayed header like: "Wed, Oct 07, 2015"
-PAGE_DATE_RE = re.compile(
-    r'\b(Mon|Tue|Wed|Thu|Fri|Sat|Sun),\s+([A-Za-z]{3})\s+(\d{1,2}),\s+(\d{4})\b'
-)
-
-MONTHS = {m: i for i, m in enumerate(
-    ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"], start=1
-)}
-
-# Find all integers on the page (we'll validate via ranges)
-RE_INT = re.compile(r"\b(\d{1,2})\b")
-
-def is_scheduled_draw(d: date) -> bool:
-    """Powerball draw schedule since Oct 2015:
-       - Wed/Sat until 2021-08-21
-       - Mon/Wed/Sat starting 2021-08-23
+# the draw calendar (weekday eras plus irregular dates) lives in lotto.schedule
+is_scheduled_draw = is_scheduled
+
+def fetch_previous_results_range(sd: date, ed: date, session: requests.Session | None = None) -> Dict[date, tuple]:
+    """Fetch the Previous Results page for sd..ed and parse every result card on it in one pass.
+    Returns {date: (iso_date, whites, red, power_play, source_url)} for the valid cards in the range
+    (empty on a network error); the page may hold fewer cards than the range has draws.
     """
-    if d < START:
-        return False
-    if d >= MON_START:
-        return d.weekday() in (0, 2, 5)  # Mon(0), Wed(2), Sat(5)
-    else:
-        return d.weekday() in (2, 5)     # Wed(2), Sat(5)
-
-def parse_page_date(soup: BeautifulSoup) -> Optional[date]:
-    """Extract the displayed draw date from the page, if present."""
-    text = soup.get_text(separator=" ", strip=True)
-    m = PAGE_DATE_RE.search(text)
-    if not m:
-        return None
-    mon_short = m.group(2)
-    day = int(m.group(3))
-    year = int(m.group(4))
-    mon = MONTHS.get(mon_short)
-    if not mon:
-        return None
+    params = {"gc": "powerball", "sd": sd.isoformat(), "ed": ed.isoformat()}
     try:
-        return date(year, mon, day)
+        r = (session or requests).get(PREV_RESULTS_URL, params=params, timeout=TIMEOUT_SEC)
+    except requests.RequestException:
+        return {}
+    if r.status_code != 200:
+        return {}
+    found = {}
+    # result cards via XPath on the lxml tree, regex over the page text if none are found
+    for d, whites, pb, pp in parse_results_page(r.content):
+        if sd <= d <= ed and d not in found and all(1 <= w <= 69 for w in whites) and 1 <= pb <= 26:
+            # per-draw URL, as single-date fetches record it
+            url = f"{PREV_RESULTS_URL}?gc=powerball&sd={d.isoformat()}&ed={d.isoformat()}"
+            found[d] = (d.isoformat(), whites, pb, pp, url)
+    # a page cut short only lacks draws past its last card; a draw missing with
+    # no card at all, or between cards, may just not have been posted yet
+    lo, hi = (min(found), max(found)) if found else (None, None)
+    if any(d not in found and (lo is None or lo <= d <= hi) for d in scheduled_dates(sd, ed)):
+        _unpin(session, r)
+    return found
+
+def fetch_from_previous_results(dt: date, session: requests.Session | None = None):
+    """Return (iso_date, whites, red, power_play, source_url) for that date using the server-rendered
+    Previous Results page. Returns None if that exact date is not present.
+    """
+    return fetch_previous_results_range(dt, dt, session).get(dt)
+
+def date_windows(dates: List[date], days: int = WINDOW_DAYS) -> List[List[date]]:
+    """Split sorted dates into runs that each span at most `days` days."""
+    windows: List[List[date]] = []
+    for d in dates:
+        if windows and (d - windows[-1][0]).days < days:
+            windows[-1].append(d)
+        else:
+            windows.append([d])
+    return windows
+
+def fetch_window(dates: List[date], session: requests.Session, bucket: "TokenBucket") -> List[Tuple[date, Optional[tuple]]]:
+    """
+    Fetch the draws for a run of dates with as few range requests as possible.
+
+    The first request covers dates[0]..dates[-1]. Dates still missing past
+    either end of the cards returned mean the page was cut short there, so
+    that side is requested again, narrowed to its missing dates; this pages
+    through a long window without relying on the site's "load more" script.
+    Dates missing between the cards of one page are gaps in the listing and
+    are fetched one by one, as are those of a range that came back empty
+    (a single date that came back empty is not asked for again, e.g. today's
+    draw before it is posted). The caller has taken the token for the first
+    request.
+    """
+    want = set(dates)
+    found: Dict[date, tuple] = {}
+    asked: Set[date] = set()  # dates already requested on their own
+    spans = [(dates[0], dates[-1])]
+    first = True
+    while spans:
+        lo, hi = spans.pop()
+        if not first:
+            bucket.acquire()
+        first = False
+        new = {d: v for d, v in fetch_previous_results_range(lo, hi, session).items()
+               if d in want and d not in found}
+        if lo == hi:
+            asked.add(lo)
+        if not new:
+            continue
+        found.update(new)
+        older = [d for d in dates if lo <= d < min(new) and d not in found]
+        newer = [d for d in dates if max(new) < d <= hi and d not in found]
+        spans.extend((side[0], side[-1]) for side in (older, newer) if side)
+    for d in dates:
+        if d not in found and d not in asked:
+            bucket.acquire()
+            info = fetch_from_previous_results(d, session)
+            if info:
+                found[d] = info
+    return [(d, found.get(d)) for d in dates]
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` requests per second on average, bursts of up to `burst`."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a token is available, then take it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+                self._stamp = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_for = (1 - self._tokens) / self.rate
+            time.sleep(wait_for)
+
+def is_settled_page(url: str, stored_at: float) -> bool:
+    """Whether a results page stored at `stored_at` (epoch seconds) was fetched at least
+    SETTLED_DAYS after the last draw it covers, so its content can no longer change."""
+    qs = parse_qs(urlsplit(url).query)
+    last = (qs.get("ed") or qs.get("date") or [""])[0]
+    try:
+        return date.fromisoformat(last) <= date.fromtimestamp(stored_at) - timedelta(days=SETTLED_DAYS)
     except ValueError:
-        return None
+        return False
 
+def _unpin(session, resp: requests.Response) -> None:
+    """Keep a cached page that lacks an expected draw from being served forever."""
+    cache = cache_of(session, resp.request.url) if session is not None else None
+    if cache is not None:
+        cache.mark_incomplete(resp.request.url)
 
-# Helpers for stable Previous Results page parsing
-def _parse_prev_results_block(text: str):
-    """Yield tuples (date, whites_sorted[5], red, power_play_or_blank) from the Previous Results page text."""
-    for m in DATE_NUMS_RE.finditer(text):
-        datestr = f"{m.group('dow')}, {m.group('mon')} {m.group('day')}, {m.group('year')}"
-        d = datetime.strptime(datestr, "%a, %b %d, %Y").date()
-        whites = sorted([int(m.group(f"n{i}")) for i in range(1, 6)])
-        pb = int(m.group("pb"))
-        pp = m.group("pp") or ""
-        yield d, whites, pb, pp
+def open_cache(path: Path, offline: bool = False, fresh_for: float = DEFAULT_FRESH_FOR) -> HTTPCache:
+    """The scraper's response cache: settled pages are never refetched, newer ones revalidated."""
+    return HTTPCache(path, fresh_for=fresh_for, immutable=is_settled_page, offline=offline)
 
+def make_session(pool_size: int = MAX_IN_FLIGHT, cache: HTTPCache | None = None) -> requests.Session:
+    """A browser-like session whose connection pool fits `pool_size` concurrent requests,
+    answering from `cache` when one is given."""
+    session = requests.Session()
+    session.headers.update({
+        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X) AppleWebKit/537.36 "
+                      "(KHTML, like Gecko) Chrome/125.0 Safari/537.36"
+    })
+    if cache is not None:
+        return install_cache(session, cache, pool_connections=1, pool_maxsize=pool_size)
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def fetch_in_order(items: list, fetch, workers: int = MAX_IN_FLIGHT, rate: float = RATE_PER_SEC,
+                   bucket: TokenBucket | None = None):
+    """
+    Yield (item, fetch(item)) in the order of `items` while up to `workers`
+    fetches run concurrently, each started through one shared token bucket
+    (a fetch that makes further requests takes further tokens itself).
 
-def fetch_from_previous_results(dt: date):
-    """Return (iso_date, whites, red, power_play, source_url) for that date using the server-rendered
-    Previous Results page. Returns None if that exact date is not present.
+    Results that finish early wait in a reorder buffer until every earlier
+    item is done; the buffer plus the requests in flight never exceed
+    2 * workers, so a slow request stalls submission instead of growing memory.
     """
-    params = {"gc": "powerball", "sd": dt.isoformat(), "ed": dt.isoformat()}
-    try:
-        r = requests.get(PREV_RESULTS_URL, params=params, timeout=TIMEOUT_SEC)
-    except requests.RequestException:
-        return None
-    if r.status_code != 200:
-        return None
-    soup = BeautifulSoup(r.text, "lxml")  # lxml is faster/robust; falls back to built-in if unavailable
-    text = soup.get_text(separator=" ", strip=True)
-    for d, whites, pb, pp in _parse_prev_results_block(text):
-        if d == dt and all(1 <= w <= 69 for w in whites) and 1 <= pb <= 26:
-            url = f"{PREV_RESULTS_URL}?gc=powerball&sd={dt.isoformat()}&ed={dt.isoformat()}"
-            return (dt.isoformat(), whites, pb, pp, url)
-    return None
+    if bucket is None:
+        bucket = TokenBucket(rate, burst=workers)
+
+    def job(item):
+        bucket.acquire()
+        return fetch(item)
+
+    window = 2 * workers
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = {}   # future -> position in dates
+        ready = {}     # position -> result, finished ahead of its turn
+        submitted = emitted = 0
+        while emitted < len(items):
+            while submitted < len(items) and len(pending) + len(ready) < window:
+                pending[pool.submit(job, items[submitted])] = submitted
+                submitted += 1
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                ready[pending.pop(fut)] = fut.result()
+            while emitted in ready:
+                yield items[emitted], ready.pop(emitted)
+                emitted += 1
 
 def fetch_draw(session: requests.Session, dt: date) -> Optional[Tuple[str, List[int], int, str]]:
     """Return (iso_date, whites_sorted[5], red, source_url) if the page truly
@@ -121,52 +235,34 @@ def fetch_draw(session: requests.Session, dt: date) -> Optional[Tuple[str, List[
     if resp.status_code != 200:
         return None
 
-    soup = BeautifulSoup(resp.text, "html.parser")
-
-    # 1) Verify the page's displayed date matches the date we asked for.
-    page_dt = parse_page_date(soup)
-    if page_dt != dt:
-        # This happens when you ask for a non-draw date and the site shows the latest draw instead.
+    # the page must show the requested date: for non-draw dates the site shows the latest draw
+    parsed = parse_draw_page(resp.content, dt)
+    if parsed is None:
+        _unpin(session, resp)
         return None
-
-    # 2) Pull all small integers from the page and look for a valid 5-whites + 1-red window.
-    nums = [int(x) for x in RE_INT.findall(soup.get_text(separator=" "))]
-    if len(nums) < 6:
-        return None
-
-    whites = None
-    red = None
-    for i in range(len(nums) - 5):
-        w = nums[i:i+5]
-        r = nums[i+5]
-        if len(set(w)) == 5 and all(1 <= n <= 69 for n in w) and (1 <= r <= 26):
-            whites = sorted(w)
-            red = r
-            break
-
-    if whites is None or red is None:
-        return None
-
+    whites, red = parsed
     return (iso, whites, red, url)
 
-def scrape(out_csv: Path, resume: bool = True, since: str | None = None) -> None:
+def scrape(out_csv: Path, resume: bool = True, since: str | None = None, db_path: Path | None = None,
+           workers: int = MAX_IN_FLIGHT, rate: float = RATE_PER_SEC, window_days: int = WINDOW_DAYS,
+           cache_dir: Path | None = None, use_cache: bool = True, offline: bool = False,
+           fresh_for: float = DEFAULT_FRESH_FOR) -> None:
+    """Append the scheduled draws missing from out_csv. Responses are cached under
+    cache_dir (default: http_cache next to the CSV); offline=True replays that cache only."""
     out_csv.parent.mkdir(parents=True, exist_ok=True)
 
     out_exists = out_csv.exists()
     seen_dates = set()
     if out_exists and resume:
-        with out_csv.open("r", newline="", encoding="utf-8") as f:
-            r = csv.reader(f)
-            _ = next(r, None)
-            for row in r:
-                if row:
-                    seen_dates.add(row[0])
+        # kept per process: a repeat scrape only parses rows appended since
+        seen_dates = history_tail(out_csv).dates
 
-    session = requests.Session()
-    session.headers.update({
-        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X) AppleWebKit/537.36 "
-                      "(KHTML, like Gecko) Chrome/125.0 Safari/537.36"
-    })
+    cache = None
+    if use_cache or offline:
+        cache = open_cache(cache_dir or out_csv.parent / "http_cache", offline=offline, fresh_for=fresh_for)
+        if offline:
+            rate = OFFLINE_RATE  # nothing to be polite to
+    session = make_session(workers, cache)
 
     # Build just the scheduled draw dates from START..today
     # If --since is given, start there; else start from the rules start date
@@ -179,13 +275,15 @@ def scrape(out_csv: Path, resume: bool = True, since: str | None = None) -> None
         except ValueError:
             pass  # bad --since format, just ignore and fall back to START
 
-    today = date.today()
-    dates: List[date] = []
-    d = start
-    while d <= today:
-        if is_scheduled_draw(d) and d.isoformat() not in seen_dates:
-            dates.append(d)
-        d += timedelta(days=1)
+    have = [date.fromordinal(o) for o in map(iso_ordinal, seen_dates) if o]
+    dates = missing_dates(have, start, date.today())
+
+    # Optional SQLite mirror: seeded from the CSV once, then upserted per draw
+    db = None
+    if db_path is not None:
+        db = HistoryDB(db_path)
+        if len(db) == 0 and out_exists:
+            db.import_csv(out_csv)
 
     added = 0
     mode = "a" if out_exists else "w"
@@ -195,16 +293,27 @@ def scrape(out_csv: Path, resume: bool = True, since: str | None = None) -> None
         if not out_exists:
             w.writerow(["date","w1","w2","w3","w4","w5","powerball","power_play","source_url"])
 
-        for dt in dates:
-            info = fetch_from_previous_results(dt)
-            if info:
-                iso, whites, red, pp, url = info
+        # date windows fetched concurrently under the rate limit, written in date order;
+        # window_days <= 0 requests every date on its own
+        bucket = TokenBucket(rate, burst=workers)
+        if window_days > 0:
+            fetch = lambda run: fetch_window(run, session, bucket)
+        else:
+            fetch = lambda run: [(run[0], fetch_from_previous_results(run[0], session))]
+        windows = date_windows(dates, window_days) if window_days > 0 else [[d] for d in dates]
+        for run, results in fetch_in_order(windows, fetch, workers=workers, bucket=bucket):
+            rows = [info for _, info in results if info]
+            for iso, whites, red, pp, url in rows:
                 w.writerow([iso, *whites, red, pp, url])
-                added += 1
-            pbar.update(1)
-            pbar.set_postfix({"added": added, "last_date": dt.isoformat()})
-            time.sleep(SLEEP_SEC)
-
+            if db is not None and rows:
+                f.flush()
+                db.upsert(rows)
+            added += len(rows)
+            pbar.update(len(run))
+            pbar.set_postfix({"added": added, "last_date": run[-1].isoformat()})
+
+    if db is not None:
+        db.close()
     print(f"\nDone. Added {added} rows to {out_csv}")
 
 if __name__ == "__main__":
@@ -212,7 +321,29 @@ if __name__ == "__main__":
     parser.add_argument("out_csv", help="Output CSV path")
     parser.add_argument("--since", help="Only fetch draws on/after this date (YYYY-MM-DD)")
     parser.add_argument("--no-resume", action="store_true", help="Do not resume; rebuild only the requested range")
+    parser.add_argument("--db", help="Also upsert rows into this SQLite history database")
+    parser.add_argument("--workers", type=int, default=MAX_IN_FLIGHT,
+                        help=f"Maximum requests in flight (default {MAX_IN_FLIGHT})")
+    parser.add_argument("--rate", type=float, default=RATE_PER_SEC,
+                        help=f"Maximum requests per second (default {RATE_PER_SEC:g})")
+    parser.add_argument("--window-days", type=int, default=WINDOW_DAYS,
+                        help=f"Days covered by one Previous Results request (default {WINDOW_DAYS}; "
+                             "0 fetches each date separately)")
+    parser.add_argument("--cache-dir", help="HTTP response cache directory (default: http_cache next to the CSV)")
+    parser.add_argument("--no-cache", action="store_true", help="Always fetch from the network")
+    parser.add_argument("--offline", action="store_true",
+                        help="Replay cached responses only; dates not in the cache are skipped")
+    parser.add_argument("--fresh-for", type=float, default=DEFAULT_FRESH_FOR,
+                        help=f"Seconds a cached page for recent draws is used before revalidating "
+                             f"(default {DEFAULT_FRESH_FOR:g})")
     args = parser.parse_args()
+    if args.offline and args.no_cache:
+        parser.error("--offline needs the cache")
+    if args.workers < 1 or args.rate <= 0:
+        parser.error("--workers must be at least 1 and --rate positive")
 
     out_path = Path(args.out_csv)
-    scrape(out_path, resume=not args.no_resume, since=args.since)
\ No newline at end of file
+    scrape(out_path, resume=not args.no_resume, since=args.since,
+           db_path=Path(args.db) if args.db else None, workers=args.workers, rate=args.rate,
+           window_days=args.window_days, cache_dir=Path(args.cache_dir) if args.cache_dir else None,
+           use_cache=not args.no_cache, offline=args.offline, fresh_for=args.fresh_for)
\ No newline at end of file
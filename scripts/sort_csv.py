@@ -3,8 +3,19 @@ import csv
 from pathlib import Path
 import sys
 from datetime import datetime
+# allow running directly without editable install
+ROOT = Path(__file__).resolve().parents[1]  # project root
+sys.path.insert(0, str(ROOT / "src"))
+from lotto.history import update_sorted_view
 
 def sort_csv(path: Path, descending: bool = True):
+    out_path = path.with_name(path.stem + "_sorted.csv")
+    if descending:
+        # incremental: new rows are merged in at the head of an existing sorted file
+        added = update_sorted_view(path, out_path)
+        print(f"Sorted file {out_path} up to date (rows added={added})")
+        return
+
     with path.open("r", encoding="utf-8", newline="") as f:
         r = list(csv.reader(f))
     header, rows = r[0], r[1:]
@@ -12,7 +23,6 @@ def sort_csv(path: Path, descending: bool = True):
     # sort rows by first column (date), descending by default
     rows.sort(key=lambda row: datetime.fromisoformat(row[0]), reverse=descending)
 
-    out_path = path.with_name(path.stem + "_sorted.csv")
     with out_path.open("w", encoding="utf-8", newline="") as f:
         w = csv.writer(f)
         w.writerow(header)
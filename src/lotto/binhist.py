@@ -0,0 +1,176 @@
+from __future__ import annotations
+import csv
+import mmap
+import os
+import struct
+import sys
+from array import array
+from datetime import date
+from pathlib import Path
+from typing import List, Optional
+from .rules import PowerballRules, WhiteCombo, PowerballDraw, Draw, DrawSet
+from .history import parse_row, looks_like_iso_date, iso_ordinal
+
+# Binary history layout (all integers little-endian), columns back to back:
+#   header
+#   ordinals     uint32 x n   date.toordinal(), 0 if the row had no ISO date
+#   url_index    uint32 x n   index into the string table, NO_URL if blank
+#   whites       uint8 x 5n   sorted, row-major
+#   red          uint8 x n
+#   power_play   uint8 x n    0 if blank
+#   (padding to 4 bytes)
+#   str_offsets  uint32 x (m + 1)
+#   str_blob     utf-8
+_MAGIC = b"PBHB"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHBBBxIIQq")  # magic, version, white_count, white_pool, red_pool, rows, strings, src_size, src_mtime_ns
+NO_URL = 0xFFFFFFFF
+
+def _native(a: array) -> array:
+    if sys.byteorder == "big":
+        a = array(a.typecode, a)
+        a.byteswap()
+    return a
+
+class BinaryHistory:
+    """
+    Read-only, memory-mapped view of a binary history file.
+
+    Columns are exposed as zero-copy memoryviews (`ordinals`, `reds`, ...);
+    opening the file only maps it and reads the header.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        with self.path.open("rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        mv = memoryview(self._mm)
+        try:
+            magic, version, wc, wp, rp, n, m, self.src_size, self.src_mtime_ns = _HEADER.unpack_from(mv)
+            if magic != _MAGIC or version != _VERSION:
+                raise ValueError(f"{path} is not a binary history file")
+            columns = _HEADER.size + (10 + wc) * n
+            if len(mv) < columns + -columns % 4 + 4 * (m + 1):
+                raise ValueError(f"{path} is truncated")
+        except (ValueError, struct.error):
+            mv.release()
+            self._mm.close()
+            raise
+        self.rules = PowerballRules(white_count=wc, white_pool=wp, red_pool=rp)
+        self._n = n
+        off = _HEADER.size
+        self.ordinals = self._column(mv, off, n, "I"); off += 4 * n
+        self.url_index = self._column(mv, off, n, "I"); off += 4 * n
+        self.whites = mv[off:off + wc * n]; off += wc * n
+        self.reds = mv[off:off + n]; off += n
+        self.power_plays = mv[off:off + n]; off += n
+        off += -off % 4
+        self._str_offsets = self._column(mv, off, m + 1, "I"); off += 4 * (m + 1)
+        self._blob = mv[off:]
+
+    @staticmethod
+    def _column(mv: memoryview, off: int, n: int, code: str):
+        col = mv[off:off + 4 * n]
+        if sys.byteorder == "little":
+            return col.cast(code)
+        return _native(array(code, col.tobytes()))  # big-endian hosts pay one copy
+
+    def __len__(self) -> int:
+        return self._n
+
+    def row_whites(self, i: int) -> WhiteCombo:
+        wc = self.rules.white_count
+        return tuple(self.whites[i * wc:(i + 1) * wc])
+
+    def draw(self, i: int) -> PowerballDraw:
+        return Draw(self.row_whites(i), self.reds[i])
+
+    def date(self, i: int) -> Optional[date]:
+        return date.fromordinal(self.ordinals[i]) if self.ordinals[i] else None
+
+    def url(self, i: int) -> str:
+        j = self.url_index[i]
+        if j == NO_URL:
+            return ""
+        return bytes(self._blob[self._str_offsets[j]:self._str_offsets[j + 1]]).decode("utf-8")
+
+    def draws(self) -> DrawSet:
+        """The same set load_history_csv returns for the source CSV."""
+        return DrawSet(self.draw(i) for i in range(self._n))
+
+    def close(self) -> None:
+        for name in ("ordinals", "url_index", "whites", "reds", "power_plays", "_str_offsets", "_blob"):
+            col = getattr(self, name)
+            if isinstance(col, memoryview):
+                col.release()
+        self._mm.close()
+
+def build_history_bin(csv_path: str | Path, bin_path: str | Path, rules: PowerballRules = PowerballRules()) -> int:
+    """Convert a history CSV to the binary format; returns the number of rows written."""
+    src = Path(csv_path)
+    st = src.stat()
+    ordinals, url_index = array("I"), array("I")
+    whites, reds, pps = bytearray(), bytearray(), bytearray()
+    strings: List[bytes] = []
+    with src.open("r", encoding="utf-8", newline="") as f:
+        for row in csv.reader(f):
+            draw = parse_row(row, rules)
+            if draw is None:
+                continue
+            ordinals.append(iso_ordinal(row[0]))
+            whites.extend(draw[0])
+            reds.append(draw[1])
+            pp = row[7].strip() if len(row) > 7 and looks_like_iso_date(row[0]) else ""
+            pps.append(int(pp) if pp.isdigit() and int(pp) < 256 else 0)
+            url = row[8].strip() if len(row) > 8 and looks_like_iso_date(row[0]) else ""
+            if url:
+                url_index.append(len(strings))
+                strings.append(url.encode("utf-8"))
+            else:
+                url_index.append(NO_URL)
+
+    offsets = array("I", [0])
+    for s in strings:
+        offsets.append(offsets[-1] + len(s))
+    n = len(ordinals)
+    head = _HEADER.pack(_MAGIC, _VERSION, rules.white_count, rules.white_pool, rules.red_pool,
+                        n, len(strings), st.st_size, st.st_mtime_ns)
+    out = Path(bin_path)
+    tmp = out.with_name(out.name + ".tmp")
+    with tmp.open("wb") as f:
+        f.write(head)
+        f.write(_native(ordinals).tobytes())
+        f.write(_native(url_index).tobytes())
+        f.write(whites)
+        f.write(reds)
+        f.write(pps)
+        f.write(b"\0" * (-(len(head) + 8 * n + len(whites) + 2 * n) % 4))
+        f.write(_native(offsets).tobytes())
+        f.write(b"".join(strings))
+    os.replace(tmp, out)
+    return n
+
+def bin_path_for(csv_path: str | Path) -> Path:
+    p = Path(csv_path)
+    return p.with_suffix(".pbh")
+
+def load_history_fast(csv_path: str | Path, rules: PowerballRules = PowerballRules(),
+                      bin_path: str | Path | None = None) -> BinaryHistory:
+    """
+    Open the binary twin of a history CSV, rebuilding it first if it is
+    missing or stale (the CSV's size or mtime differ from those recorded
+    when it was built). The CSV remains the source of truth.
+    """
+    bin_path = Path(bin_path) if bin_path is not None else bin_path_for(csv_path)
+    st = Path(csv_path).stat()
+    if bin_path.exists():
+        try:
+            hist = BinaryHistory(bin_path)
+        except (ValueError, struct.error):  # truncated or not a twin: rebuild it
+            hist = None
+        if hist is not None:
+            if (hist.src_size, hist.src_mtime_ns) == (st.st_size, st.st_mtime_ns) and hist.rules == rules:
+                return hist
+            hist.close()
+    build_history_bin(csv_path, bin_path, rules)
+    return BinaryHistory(bin_path)
@@ -0,0 +1,196 @@
+from __future__ import annotations
+import mmap as _mmap
+import struct
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+from typing import Iterable, Iterator
+from .rules import PowerballRules, PowerballDraw
+from .generate import total_space, rank_draw, unrank_draw
+
+# On-disk layout: header, then the raw bits (bit i of byte i // 8 is rank i).
+_MAGIC = b"PBBM"
+_HEADER = struct.Struct("<4sHHHH")  # magic, version, white_count, white_pool, red_pool
+_VERSION = 1
+
+_CHUNK = 1 << 20        # bytes per slice for popcount / union
+_SELECT_BLOCK = 512     # bytes per entry in the select index
+
+_BYTE_ZEROS = bytes(8 - bin(b).count("1") for b in range(256))
+
+try:
+    _popcount = int.bit_count
+except AttributeError:  # Python < 3.10
+    def _popcount(x: int) -> int:
+        return bin(x).count("1")
+
+class DrawBitmap:
+    """
+    Membership bitmap over the whole draw universe, indexed by rank_draw.
+
+    For the standard rules this is ~36 MB no matter how many draws are
+    marked, and it can be saved to disk and memory-mapped back in.
+    """
+
+    def __init__(self, rules: PowerballRules = PowerballRules(), _buf=None):
+        self.rules = rules
+        self.size = total_space(rules)
+        nbytes = (self.size + 7) // 8
+        self._bits = bytearray(nbytes) if _buf is None else _buf
+        if len(self._bits) != nbytes:
+            raise ValueError("Bitmap size does not match rules")
+        self._count: int | None = 0 if _buf is None else None
+        self._select: array | None = None
+
+    @classmethod
+    def from_draws(cls, draws: Iterable[PowerballDraw], rules: PowerballRules) -> "DrawBitmap":
+        bm = cls(rules)
+        for d in draws:
+            bm.add(d)
+        return bm
+
+    # --- membership ---
+    def contains_rank(self, rank: int) -> bool:
+        return bool(self._bits[rank >> 3] >> (rank & 7) & 1)
+
+    def __contains__(self, draw: PowerballDraw) -> bool:
+        return self.contains_rank(rank_draw(draw, self.rules))
+
+    def add_rank(self, rank: int) -> None:
+        if not 0 <= rank < self.size:
+            raise ValueError("Draw index out of range")
+        i, bit = rank >> 3, 1 << (rank & 7)
+        b = self._bits[i]
+        if not b & bit:
+            self._bits[i] = b | bit
+            if self._count is not None:
+                self._count += 1
+            self._select = None
+
+    def add(self, draw: PowerballDraw) -> None:
+        self.add_rank(rank_draw(draw, self.rules))
+
+    def buffer(self) -> memoryview:
+        """Read-only view of the raw bits (bit i of byte i // 8 is rank i), e.g. for numpy.frombuffer."""
+        return memoryview(self._bits).toreadonly()
+
+    def ranks(self) -> Iterator[int]:
+        """Yield the marked ranks in ascending order."""
+        bits = self._bits
+        for start in range(0, len(bits), _CHUNK):
+            x = int.from_bytes(bits[start:start + _CHUNK], "little")
+            base = start * 8
+            while x:
+                low = x & -x
+                yield base + low.bit_length() - 1
+                x ^= low
+
+    def __iter__(self) -> Iterator[PowerballDraw]:
+        for rank in self.ranks():
+            yield unrank_draw(rank, self.rules)
+
+    # --- stats ---
+    def __len__(self) -> int:
+        if self._count is None:
+            bits = self._bits
+            self._count = sum(
+                _popcount(int.from_bytes(bits[i:i + _CHUNK], "little"))
+                for i in range(0, len(bits), _CHUNK)
+            )
+        return self._count
+
+    def free_count(self) -> int:
+        return self.size - len(self)
+
+    def coverage(self) -> float:
+        return len(self) / self.size
+
+    # --- combining ---
+    def __ior__(self, other: "DrawBitmap | Iterable[PowerballDraw]") -> "DrawBitmap":
+        if not isinstance(other, DrawBitmap):
+            for d in other:
+                self.add(d)
+            return self
+        if other.rules != self.rules:
+            raise ValueError("Cannot combine bitmaps built for different rules")
+        a, b = self._bits, other._bits
+        for i in range(0, len(a), _CHUNK):
+            n = min(_CHUNK, len(a) - i)
+            x = int.from_bytes(a[i:i + n], "little") | int.from_bytes(b[i:i + n], "little")
+            a[i:i + n] = x.to_bytes(n, "little")
+        self._count = None
+        self._select = None
+        return self
+
+    def copy(self) -> "DrawBitmap":
+        bm = DrawBitmap(self.rules, bytearray(self._bits))
+        bm._count = self._count
+        return bm
+
+    def __or__(self, other: "DrawBitmap | Iterable[PowerballDraw]") -> "DrawBitmap":
+        bm = self.copy()
+        bm |= other
+        return bm
+
+    # --- select ---
+    def _select_index(self) -> array:
+        """Free (unmarked) rank counts before each _SELECT_BLOCK-byte block."""
+        if self._select is None:
+            bits = self._bits
+            idx = array("q", [0])
+            free = 0
+            for i in range(0, len(bits), _SELECT_BLOCK):
+                block = bits[i:i + _SELECT_BLOCK]
+                free += len(block) * 8 - _popcount(int.from_bytes(block, "little"))
+                idx.append(free)
+            self._select = idx
+        return self._select
+
+    def select_free(self, u: int) -> int:
+        """Return the u-th (0-based) unmarked rank."""
+        if not 0 <= u < self.free_count():
+            raise IndexError("No such free draw")
+        idx = self._select_index()
+        blk = bisect_right(idx, u) - 1
+        u -= idx[blk]
+        i = blk * _SELECT_BLOCK
+        bits = self._bits
+        while True:
+            b = bits[i]
+            z = _BYTE_ZEROS[b]
+            if u < z:
+                for bit in range(8):
+                    if not b >> bit & 1:
+                        if u == 0:
+                            return i * 8 + bit
+                        u -= 1
+            u -= z
+            i += 1
+
+    # --- persistence ---
+    def save(self, path: str | Path) -> None:
+        r = self.rules
+        with Path(path).open("wb") as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, r.white_count, r.white_pool, r.red_pool))
+            f.write(self._bits)
+
+    @classmethod
+    def load(cls, path: str | Path, mmap: bool = True) -> "DrawBitmap":
+        """
+        Load a saved bitmap. With mmap=True the file is mapped copy-on-write:
+        pages are read lazily and add() never writes back to the file.
+        """
+        with Path(path).open("rb") as f:
+            head = f.read(_HEADER.size)
+            if len(head) != _HEADER.size:
+                raise ValueError(f"{path} is not a draw bitmap")
+            magic, version, wc, wp, rp = _HEADER.unpack(head)
+            if magic != _MAGIC or version != _VERSION:
+                raise ValueError(f"{path} is not a draw bitmap")
+            rules = PowerballRules(white_count=wc, white_pool=wp, red_pool=rp)
+            if mmap:
+                mm = _mmap.mmap(f.fileno(), 0, access=_mmap.ACCESS_COPY)
+                buf = memoryview(mm)[_HEADER.size:]
+            else:
+                buf = bytearray(f.read())
+        return cls(rules, buf)
@@ -0,0 +1,165 @@
+from __future__ import annotations
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import FrozenSet, List, Optional, Tuple
+from .rules import PowerballRules, PowerballDraw, Draw
+
+@dataclass(frozen=True)
+class DrawConstraints:
+    """
+    Restrictions on generated draws. Unset fields do not constrain.
+
+    min_sum / max_sum   inclusive bounds on the sum of the white balls
+    odd_counts          allowed numbers of odd white balls, e.g. {2, 3}
+    low_counts          allowed numbers of "low" white balls (<= low_max)
+    low_max             upper bound of the low half; defaults to white_pool // 2
+    exclude / include   white numbers that must not / must appear
+    reds                allowed red balls; defaults to all of them
+    """
+    min_sum: Optional[int] = None
+    max_sum: Optional[int] = None
+    odd_counts: Optional[FrozenSet[int]] = None
+    low_counts: Optional[FrozenSet[int]] = None
+    low_max: Optional[int] = None
+    exclude: FrozenSet[int] = frozenset()
+    include: FrozenSet[int] = frozenset()
+    reds: Optional[FrozenSet[int]] = None
+
+    def __post_init__(self):
+        # accept any iterable for the set-valued fields but keep the instance hashable
+        for name in ("odd_counts", "low_counts", "exclude", "include", "reds"):
+            value = getattr(self, name)
+            if value is not None and not isinstance(value, frozenset):
+                object.__setattr__(self, name, frozenset(value))
+
+class ConstrainedSpace:
+    """
+    Exact count, ranking and unranking of the draws satisfying constraints.
+
+    A counting DP over (next ball, chosen count, running sum, odd count, low
+    count) gives, for every prefix decision, how many valid completions
+    remain. Walking that table maps an index in [0, size) to a draw and back
+    in O(white_pool) steps, however selective the constraints are. Only the
+    dimensions a constraint actually uses are tracked.
+    """
+
+    def __init__(self, rules: PowerballRules, constraints: DrawConstraints):
+        c = constraints
+        n, k = rules.white_pool, rules.white_count
+        for ball in c.include | c.exclude:
+            if not 1 <= ball <= n:
+                raise ValueError(f"White ball out of range (1-{n}): {ball}")
+        if c.include & c.exclude:
+            raise ValueError("A number cannot be both included and excluded")
+        if len(c.include) > k:
+            raise ValueError(f"Cannot include more than {k} white balls")
+        reds = c.reds if c.reds is not None else frozenset(range(1, rules.red_pool + 1))
+        if not all(1 <= red <= rules.red_pool for red in reds):
+            raise ValueError(f"Powerball out of range (1-{rules.red_pool})")
+
+        self.rules = rules
+        self.constraints = c
+        self.reds: Tuple[int, ...] = tuple(sorted(reds))
+        self._red_pos = {red: i for i, red in enumerate(self.reds)}
+        self._low_max = c.low_max if c.low_max is not None else n // 2
+        self._track_sum = c.min_sum is not None or c.max_sum is not None
+        self._min_sum = c.min_sum if c.min_sum is not None else 0
+        self._max_sum = c.max_sum if c.max_sum is not None else sys.maxsize
+        # _include_from[i]: whether some must-include ball is >= i
+        self._include_from = [any(b >= i for b in c.include) for i in range(n + 2)]
+        self._completions = lru_cache(maxsize=None)(self._count)
+        self.white_size = self._completions(1, 0, 0, 0, 0)
+        self.size = self.white_size * len(self.reds)
+
+    # --- DP ---
+    def _step(self, ball: int, s: int, odd: int, low: int) -> Tuple[int, int, int]:
+        """State after taking `ball`; untracked dimensions stay at 0."""
+        c = self.constraints
+        if self._track_sum:
+            s += ball
+        if c.odd_counts is not None:
+            odd += ball & 1
+        if c.low_counts is not None:
+            low += ball <= self._low_max
+        return s, odd, low
+
+    def _final_ok(self, s: int, odd: int, low: int) -> bool:
+        c = self.constraints
+        return (
+            self._min_sum <= s <= self._max_sum
+            and (c.odd_counts is None or odd in c.odd_counts)
+            and (c.low_counts is None or low in c.low_counts)
+        )
+
+    def _count(self, ball: int, chosen: int, s: int, odd: int, low: int) -> int:
+        """Number of valid ways to finish from `ball` on with `chosen` whites taken."""
+        n, k = self.rules.white_pool, self.rules.white_count
+        if s > self._max_sum:
+            return 0
+        if chosen == k:
+            return int(not self._include_from[ball] and self._final_ok(s, odd, low))
+        if n - ball + 1 < k - chosen:
+            return 0
+        ways = 0
+        if ball not in self.constraints.include:
+            ways += self._completions(ball + 1, chosen, s, odd, low)
+        if ball not in self.constraints.exclude:
+            ways += self._completions(ball + 1, chosen + 1, *self._step(ball, s, odd, low))
+        return ways
+
+    # --- membership / ranking ---
+    def __len__(self) -> int:
+        return self.size
+
+    def __contains__(self, draw: PowerballDraw) -> bool:
+        whites, red = draw
+        if red not in self._red_pos:
+            return False
+        picked = set(whites)
+        if not self.constraints.include <= picked or self.constraints.exclude & picked:
+            return False
+        s = odd = low = 0
+        for w in whites:
+            s, odd, low = self._step(w, s, odd, low)
+        return self._final_ok(s, odd, low)
+
+    def rank(self, draw: PowerballDraw) -> int:
+        """Index of a draw in [0, size); the draw must satisfy the constraints."""
+        whites, red = draw
+        taken = set(whites)
+        index = 0
+        chosen = s = odd = low = 0
+        for ball in range(1, self.rules.white_pool + 1):
+            if chosen == self.rules.white_count:
+                break
+            if ball in taken:
+                if ball not in self.constraints.include:
+                    index += self._completions(ball + 1, chosen, s, odd, low)
+                chosen += 1
+                s, odd, low = self._step(ball, s, odd, low)
+        return index * len(self.reds) + self._red_pos[red]
+
+    def unrank(self, index: int) -> PowerballDraw:
+        """Inverse of rank."""
+        if not 0 <= index < self.size:
+            raise ValueError("Constrained draw index out of range")
+        index, red_pos = divmod(index, len(self.reds))
+        picks: List[int] = []
+        chosen = s = odd = low = 0
+        for ball in range(1, self.rules.white_pool + 1):
+            if chosen == self.rules.white_count:
+                break
+            skip = 0 if ball in self.constraints.include else self._completions(ball + 1, chosen, s, odd, low)
+            if index < skip:
+                continue
+            index -= skip
+            picks.append(ball)
+            chosen += 1
+            s, odd, low = self._step(ball, s, odd, low)
+        return Draw(picks, self.reds[red_pos])
+
+@lru_cache(maxsize=32)
+def constrained_space_for(rules: PowerballRules, constraints: DrawConstraints) -> ConstrainedSpace:
+    """Cached ConstrainedSpace, so repeated calls reuse the DP table."""
+    return ConstrainedSpace(rules, constraints)
@@ -1,50 +1,596 @@
 from __future__ import annotations
+import hashlib
+import os
 import random
+import secrets
+from bisect import bisect_left, bisect_right, insort
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from math import comb
-from typing import List, Set
-from .rules import PowerballRules, WhiteCombo, PowerballDraw
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+from .rules import PowerballRules, WhiteCombo, PowerballDraw, Draw, DrawSet
+from .constraints import DrawConstraints, constrained_space_for
+from .overlap import OverlapIndex
+
+if TYPE_CHECKING:  # bitmap and ledger import this module
+    from .bitmap import DrawBitmap
+    from .ledger import PickLedger
 
 def total_space(r: PowerballRules) -> int:
     """Total number of possible Powerball draws."""
     return comb(r.white_pool, r.white_count) * r.red_pool
 
-def _random_whites(r: PowerballRules) -> WhiteCombo:
-    picks = random.sample(range(1, r.white_pool + 1), k=r.white_count)
-    picks.sort()
+def constrained_space(r: PowerballRules, constraints: DrawConstraints) -> int:
+    """Number of possible Powerball draws satisfying `constraints`."""
+    return constrained_space_for(r, constraints).size
+
+# --- ranking / unranking ---
+# Every draw maps to an integer in [0, total_space(rules)):
+#   rank = colex_rank(whites) * red_pool + (red - 1)
+# where colex_rank(whites) = sum(C(w_i - 1, i + 1)) over the sorted whites.
+
+@lru_cache(maxsize=None)
+def _binom_table(r: PowerballRules) -> Tuple[Tuple[int, ...], ...]:
+    """table[k][n] == C(n, k) for k <= white_count and n <= white_pool."""
+    return tuple(
+        tuple(comb(n, k) for n in range(r.white_pool + 1))
+        for k in range(r.white_count + 1)
+    )
+
+def rank_whites(whites: WhiteCombo, r: PowerballRules) -> int:
+    """Colex rank of a sorted white combination in [0, C(white_pool, white_count))."""
+    table = _binom_table(r)
+    return sum(table[i + 1][w - 1] for i, w in enumerate(whites))
+
+def unrank_whites(index: int, r: PowerballRules) -> WhiteCombo:
+    """Inverse of rank_whites."""
+    table = _binom_table(r)
+    picks: List[int] = []
+    hi = r.white_pool
+    for k in range(r.white_count, 0, -1):
+        # largest n < hi with C(n, k) <= index
+        n = bisect_right(table[k], index, 0, hi) - 1
+        picks.append(n + 1)
+        index -= table[k][n]
+        hi = n
+    picks.reverse()
     return tuple(picks)
 
-def _random_draw(r: PowerballRules) -> PowerballDraw:
-    whites = _random_whites(r)
-    red = random.randint(1, r.red_pool)
-    return (whites, red)
+def rank_draw(draw: PowerballDraw, r: PowerballRules) -> int:
+    """Map a (whites, red) draw to its index in [0, total_space(r))."""
+    whites, red = draw
+    return rank_whites(whites, r) * r.red_pool + (red - 1)
+
+def unrank_draw(index: int, r: PowerballRules) -> PowerballDraw:
+    """Map an index in [0, total_space(r)) back to its (whites, red) draw."""
+    if not 0 <= index < total_space(r):
+        raise ValueError("Draw index out of range")
+    combo, red = divmod(index, r.red_pool)
+    return Draw(unrank_whites(combo, r), red + 1)
+
+def _sorted_ranks(history: Iterable[PowerballDraw], r: PowerballRules) -> List[int]:
+    return sorted({rank_draw(d, r) for d in history})
+
+def _nth_free(u: int, excluded: Sequence[int]) -> int:
+    """Return the u-th (0-based) non-negative integer not in the sorted `excluded`."""
+    # excluded[i] - i counts the free integers below excluded[i] and never decreases,
+    # so the number of exclusions at or before the answer is found by bisection.
+    lo, hi = 0, len(excluded)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if excluded[mid] - mid <= u:
+            lo = mid + 1
+        else:
+            hi = mid
+    return u + lo
+
+def _free_space(history, r: PowerballRules, exclude=None) -> Tuple[Callable[[int], int], int]:
+    """Return (select, free): select(u) is the u-th rank not in history (or exclude), of `free` in total."""
+    if exclude is not None:
+        return _union_free_space(history, r, exclude)
+    # DrawBitmap and store.HistorySnapshot answer the skip themselves
+    if hasattr(history, "select_free"):
+        if history.rules != r:
+            raise ValueError("History was built for different rules")
+        return history.select_free, history.free_count()
+    excluded = _sorted_ranks(history, r)
+    return (lambda u: _nth_free(u, excluded)), total_space(r) - len(excluded)
+
+def _union_free_space(history, r: PowerballRules, exclude) -> Tuple[Callable[[int], int], int]:
+    """_free_space over history plus `exclude` (draws, or a ledger.PickLedger), without merging them."""
+    if hasattr(exclude, "sorted_parts"):
+        if exclude.rules != r:
+            raise ValueError("Exclusions were built for different rules")
+        parts = list(exclude.sorted_parts())
+    else:
+        parts = [_sorted_ranks(exclude, r)]
+    if hasattr(history, "sorted_ranks"):
+        hist = history.sorted_ranks
+    elif hasattr(history, "select_free"):  # DrawBitmap: mark the exclusions in a copy
+        bm = history.copy()
+        for part in parts:
+            for rank in part:
+                bm.add_rank(rank)
+        return bm.select_free, bm.free_count()
+    else:
+        hist = _sorted_ranks(history, r)
+
+    def in_parts(x: int) -> bool:
+        for part in parts:
+            i = bisect_left(part, x)
+            if i < len(part) and part[i] == x:
+                return True
+        return False
+
+    # the parts are disjoint; ranks both in history and excluded must only count once
+    dups = [x for x in hist if in_parts(x)]
+    parts.append(hist)
+    excluded = sum(len(p) for p in parts) - len(dups)
+
+    def excluded_le(x: int) -> int:
+        return sum(bisect_right(p, x) for p in parts) - bisect_right(dups, x)
+
+    def select(u: int) -> int:
+        # the answer x satisfies x == u + excluded_le(x); iterating from u
+        # climbs to it without overshooting
+        x = u
+        while True:
+            nxt = u + excluded_le(x)
+            if nxt == x:
+                return x
+            x = nxt
+
+    return select, total_space(r) - excluded
+
+_REJECT_MAX_COVERAGE = 0.5  # above this share of the space excluded, unique() switches to the free-space select
+
+def _draw_test(draws, r: PowerballRules) -> Optional[Callable[[int, Draw], bool]]:
+    """A (rank, draw) -> bool membership test for `draws` that needs no setup pass, or None."""
+    if getattr(draws, "rules", r) != r:
+        return None  # the free-space path reports the mismatch
+    if hasattr(draws, "contains_rank"):  # DrawBitmap, ledger.PickLedger
+        contains_rank = draws.contains_rank
+        return lambda rank, draw: contains_rank(rank)
+    if hasattr(draws, "sorted_ranks"):  # store.HistorySnapshot
+        ranks = draws.sorted_ranks
+        n = len(ranks)
+
+        def in_ranks(rank: int, draw: Draw) -> bool:
+            i = bisect_left(ranks, rank)
+            return i < n and ranks[i] == rank
+        return in_ranks
+    if isinstance(draws, DrawSet):
+        return lambda rank, draw: draw in draws
+    if isinstance(draws, (set, frozenset)):
+        # a hand-built set may hold the (whites, red) tuple form
+        return lambda rank, draw: draw in draws or (draw.whites, draw.red) in draws
+    return None
+
+def _rejection_test(history, r: PowerballRules, exclude, count: int) -> Optional[Callable[[int, Draw], bool]]:
+    """
+    The seen-test for drawing `count` picks by rejection, or None when the
+    history and exclusions cover too much of the space (or cannot answer
+    membership cheaply) and the free-space select should be used instead.
+    """
+    seen = _draw_test(history, r)
+    if seen is None:
+        return None
+    covered = len(history)
+    if exclude is not None:
+        also = _draw_test(exclude, r)
+        if also is None:
+            return None
+        covered += len(exclude)
+        in_history = seen
+        seen = lambda rank, draw: in_history(rank, draw) or also(rank, draw)
+    if covered + count > total_space(r) * _REJECT_MAX_COVERAGE:
+        return None
+    return seen
+
+class DrawGenerator:
+    """
+    Draw generator that owns its RNG state instead of reseeding the global
+    `random` module, so separate instances can run concurrently (one per
+    thread or request) and stay reproducible.
+
+    `rng` plugs in any random.Random-compatible backend (it must provide
+    randrange and getrandbits), e.g. random.SystemRandom() or a faster
+    generator; by default a fresh random.Random(seed) is used. A seed of
+    None seeds from OS entropy.
+    """
+
+    def __init__(self, rules: PowerballRules = PowerballRules(), seed: int | None = None, rng: random.Random | None = None):
+        self.rules = rules
+        if rng is None:
+            rng = random.Random(seed)
+        elif seed is not None:
+            rng.seed(seed)
+        self.rng = rng
+
+    def unique(
+        self,
+        history: "Set[PowerballDraw] | DrawBitmap",
+        count: int = 5,
+        overlap: OverlapIndex | None = None,
+        max_tries_per_pick: int = 500_000,
+        exclude: "Iterable[PowerballDraw] | PickLedger | None" = None,
+    ) -> List[PowerballDraw]:
+        """
+        Draw `count` picks uniformly from the draws not in `history` (and not
+        already picked). While history, exclusions and picks cover at most
+        half the space, uniform candidates are rejected if already seen
+        (under two tries per pick on average). Past that, picks are made
+        without rejection: a uniform index into the free space is mapped to
+        a rank by skipping over the sorted excluded ranks.
+
+        `history` may also be a lotto.bitmap.DrawBitmap, which is used in place
+        (no copy) and answers the skip through its select index.
+
+        `exclude` removes more draws from the free space, e.g. a
+        lotto.ledger.PickLedger of picks handed out before.
+
+        With an `overlap` index, candidates that conflict with it are discarded
+        (and never offered again); `max_tries_per_pick` bounds that search, and
+        requests the index shows to be unsatisfiable fail at once.
+        """
+        rules = self.rules
+        seen = _rejection_test(history, rules, exclude, count)
+        if seen is None:
+            select, free = _free_space(history, rules, exclude)
+            if free <= 0:
+                raise RuntimeError("History already covers the full sample space")
+            if count > free:
+                raise RuntimeError(f"Only {free} unseen draws remain; cannot generate {count}")
+
+        if overlap is not None and not 1 <= overlap.k <= rules.white_count:
+            raise ValueError(f"Overlap size k must be between 1 and {rules.white_count}")
+        if overlap is not None and overlap.admits(rules) is False:
+            raise RuntimeError(f"No draw avoids sharing {overlap.k} white balls with history")
+        if seen is not None:
+            return self._unique_by_rejection(seen, count, overlap, max_tries_per_pick)
+
+        # picks are tracked as sorted positions within the history-free space, so
+        # they are never drawn again; rejected candidates only need a membership test
+        randrange = self.rng.randrange
+        results: List[PowerballDraw] = []
+        picked: List[int] = []
+        rejected: Set[int] = set()
+        tries = 0
+        while len(results) < count:
+            left = free - len(picked)
+            if len(rejected) >= left or tries > max_tries_per_pick:
+                raise RuntimeError("Too many tries to find a new draw without overlap")
+            pos = _nth_free(randrange(left), picked)
+            if pos in rejected:
+                tries += 1
+                continue
+            cand = unrank_draw(select(pos), rules)
+            if overlap is not None and overlap.conflicts(cand):
+                rejected.add(pos)
+                tries += 1
+                continue
+            insort(picked, pos)
+            results.append(cand)
+            tries = 0
+        return results
+
+    def _unique_by_rejection(
+        self,
+        seen: Callable[[int, Draw], bool],
+        count: int,
+        overlap: OverlapIndex | None,
+        max_tries_per_pick: int,
+    ) -> List[PowerballDraw]:
+        """unique() for a sparsely covered space: uniform ranks, retried while `seen` or taken."""
+        rules = self.rules
+        randrange = self.rng.randrange
+        size = total_space(rules)
+        results: List[PowerballDraw] = []
+        taken: Set[int] = set()  # picked or conflicting with overlap
+        tries = 0
+        while len(results) < count:
+            if tries > max_tries_per_pick:
+                raise RuntimeError("Too many tries to find a new draw without overlap")
+            rank = randrange(size)
+            if rank in taken:
+                tries += 1
+                continue
+            cand = unrank_draw(rank, rules)
+            if seen(rank, cand):
+                continue
+            taken.add(rank)
+            if overlap is not None and overlap.conflicts(cand):
+                tries += 1
+                continue
+            results.append(cand)
+            tries = 0
+        return results
+
+    def constrained(
+        self,
+        history: Iterable[PowerballDraw],
+        count: int,
+        constraints: DrawConstraints,
+    ) -> List[PowerballDraw]:
+        """
+        Like unique(), but uniform over the draws satisfying `constraints`.
+        Picks are unranked by walking the constraint DP table, so each one
+        costs the same however selective the constraints are.
+        """
+        space = constrained_space_for(self.rules, constraints)
+        excluded = sorted({space.rank(d) for d in history if d in space})
+        free = space.size - len(excluded)
+        if space.size == 0:
+            raise RuntimeError("No draws satisfy the constraints")
+        if count > free:
+            raise RuntimeError(f"Only {free} unseen draws satisfy the constraints; cannot generate {count}")
+
+        randrange = self.rng.randrange
+        results: List[PowerballDraw] = []
+        picked: List[int] = []
+        while len(results) < count:
+            pos = _nth_free(randrange(free - len(picked)), picked)
+            insort(picked, pos)
+            results.append(space.unrank(_nth_free(pos, excluded)))
+        return results
+
+    def iter_unique(self, history: "Set[PowerballDraw] | DrawBitmap") -> Iterator[PowerballDraw]:
+        """Lazy unique stream (see iter_unique) keyed from this generator's RNG."""
+        return PickSequence(history, self.rules, self.rng.getrandbits(64)).iter_from()
 
 def generate_unique(
-    history: Set[PowerballDraw],
+    history: "Set[PowerballDraw] | DrawBitmap",
     rules: PowerballRules,
     count: int = 5,
     seed: int | None = None,
     max_tries_per_pick: int = 500_000,
+    overlap_k: int | None = None,
+    overlap_ignore_red: bool = True,
+    exclude: "Iterable[PowerballDraw] | PickLedger | None" = None,
 ) -> List[PowerballDraw]:
-    if seed is not None:
-        random.seed(seed)
-    else:
-        random.seed()  # reseed from system time / OS entropy
+    """
+    Convenience wrapper for DrawGenerator(rules, seed).unique(history, count).
+
+    With `overlap_k`, no pick shares `overlap_k` or more white balls with
+    any draw in history (with its red too, unless `overlap_ignore_red`).
+    `max_tries_per_pick` only applies in that mode. `exclude` is passed
+    through (e.g. a lotto.ledger.PickLedger of earlier picks).
+    """
+    overlap = None
+    if overlap_k is not None:
+        overlap = OverlapIndex(history, overlap_k, ignore_red=overlap_ignore_red)
+    return DrawGenerator(rules, seed=seed).unique(history, count, overlap, max_tries_per_pick, exclude)
+
+def generate_constrained(
+    history: Iterable[PowerballDraw],
+    rules: PowerballRules,
+    constraints: DrawConstraints,
+    count: int = 5,
+    seed: int | None = None,
+) -> List[PowerballDraw]:
+    """Convenience wrapper for DrawGenerator(rules, seed).constrained(...)."""
+    return DrawGenerator(rules, seed=seed).constrained(history, count, constraints)
+
+# --- seekable permutation of the draw space ---
+
+_M64 = (1 << 64) - 1
+
+def _mix64(x: int) -> int:
+    """splitmix64 finalizer, used as the Feistel round function."""
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _M64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _M64
+    return x ^ (x >> 31)
+
+class DrawPermutation:
+    """
+    Keyed bijection on [0, size): a balanced Feistel network over the
+    smallest even bit width covering `size`, with cycle walking to stay in
+    range. perm[k] costs a handful of round-function calls for any k.
+    """
+
+    ROUNDS = 6
+
+    def __init__(self, size: int, seed: int | str):
+        if size <= 0:
+            raise ValueError("Permutation size must be positive")
+        self.size = size
+        bits = max(2, (size - 1).bit_length())
+        bits += bits & 1
+        self._half = bits // 2
+        self._mask = (1 << self._half) - 1
+        digest = hashlib.blake2b(str(seed).encode(), digest_size=8 * self.ROUNDS,
+                                 person=b"lotto.perm").digest()
+        self._keys = [int.from_bytes(digest[i:i + 8], "little") for i in range(0, len(digest), 8)]
+
+    def _encrypt(self, x: int) -> int:
+        half, mask = self._half, self._mask
+        left, right = x >> half, x & mask
+        for key in self._keys:
+            left, right = right, left ^ (_mix64(right ^ key) & mask)
+        return (left << half) | right
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, k: int) -> int:
+        if not 0 <= k < self.size:
+            raise IndexError("Permutation index out of range")
+        x = self._encrypt(k)
+        while x >= self.size:
+            x = self._encrypt(x)
+        return x
+
+class PickSequence:
+    """
+    The unique pick stream for (history, rules, seed), addressable by index.
+
+    Pick k is the permutation of position k mapped into the history-free
+    space, so picks never repeat and never hit history. Any pick can be
+    computed without generating the ones before it, which makes cursors
+    resumable and lets jobs be split by index range. Adding draws to history
+    changes the free space and therefore the stream.
+    """
+
+    def __init__(self, history: "Set[PowerballDraw] | DrawBitmap", rules: PowerballRules, seed: int | str):
+        self.rules = rules
+        self.seed = seed
+        self._select, free = _free_space(history, rules)
+        if free <= 0:
+            raise RuntimeError("History already covers the full sample space")
+        self._perm = DrawPermutation(free, seed)
+
+    def __len__(self) -> int:
+        return len(self._perm)
+
+    def rank(self, k: int) -> int:
+        return self._select(self._perm[k])
+
+    def __getitem__(self, k: int) -> PowerballDraw:
+        return unrank_draw(self.rank(k), self.rules)
+
+    def iter_from(self, start: int = 0, stop: int | None = None) -> Iterator[PowerballDraw]:
+        """Yield picks start, start+1, ... up to stop (default: the end of the space)."""
+        stop = len(self) if stop is None else min(stop, len(self))
+        for k in range(start, stop):
+            yield self[k]
+
+
+def iter_unique(
+    history: "Set[PowerballDraw] | DrawBitmap",
+    rules: PowerballRules,
+    seed: int | str | None = None,
+    start: int = 0,
+) -> Iterator[PowerballDraw]:
+    """
+    Lazily yield unique picks not in history, for use with itertools.islice
+    or early exit. Memory stays bounded however many picks are consumed: the
+    stream is a PickSequence, so no record of earlier picks is kept.
+    Without a seed a random one is drawn from the OS.
+    """
+    if seed is None:
+        seed = secrets.randbits(64)
+    return PickSequence(history, rules, seed).iter_from(start)
+
 
+# --- process-pool generation ---
+
+_PARALLEL_CHUNK = 50_000
+_worker_picks: PickSequence | None = None
+
+def _init_pick_worker(history, rules: PowerballRules, seed: int | str) -> None:
+    global _worker_picks
+    _worker_picks = PickSequence(history, rules, seed)
+
+def _pick_range(bounds: Tuple[int, int]) -> List[PowerballDraw]:
+    start, stop = bounds
+    return list(_worker_picks.iter_from(start, stop))
+
+def generate_unique_parallel(
+    history: "Set[PowerballDraw] | DrawBitmap",
+    rules: PowerballRules,
+    count: int,
+    seed: int | str | None = None,
+    jobs: int | None = None,
+    chunk_size: int = _PARALLEL_CHUNK,
+) -> List[PowerballDraw]:
+    """
+    Generate `count` unique picks across a process pool.
+
+    Workers each rebuild the PickSequence for `seed` and compute fixed index
+    ranges of it, so the merged output is the first `count` picks of that
+    stream: unique, and identical for any number of jobs (including 1).
+    """
+    if seed is None:
+        seed = secrets.randbits(64)
+    seq = PickSequence(history, rules, seed)
+    if count > len(seq):
+        raise RuntimeError(f"Only {len(seq)} unseen draws remain; cannot generate {count}")
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or count <= chunk_size:
+        return list(seq.iter_from(0, count))
+
+    from .bitmap import DrawBitmap
+    if isinstance(history, DrawBitmap):
+        history = history.copy()  # a memory-mapped bitmap cannot be pickled to workers
+    bounds = [(start, min(start + chunk_size, count)) for start in range(0, count, chunk_size)]
+    results: List[PowerballDraw] = []
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_pick_worker,
+                             initargs=(history, rules, seed)) as ex:
+        for part in ex.map(_pick_range, bounds):
+            results.extend(part)
+    return results
+
+
+# --- bulk (NumPy) generation ---
+_BULK_MAX_BATCH = 1 << 22  # candidates per round (32 MB of int64); a nearly full history takes more rounds
+
+def _bulk_excluded(history, r: PowerballRules, np):
+    """Return a vectorized `is_excluded(ranks) -> bool array` for history."""
+    from .bitmap import DrawBitmap
+    if isinstance(history, DrawBitmap):
+        if history.rules != r:
+            raise ValueError("History bitmap was built for different rules")
+        bits = np.frombuffer(history.buffer(), dtype=np.uint8)
+        return lambda ranks: ((bits[ranks >> 3] >> (ranks & 7).astype(np.uint8)) & 1).astype(bool)
+    hist = np.array(_sorted_ranks(history, r), dtype=np.int64)
+    return lambda ranks: np.isin(ranks, hist, assume_unique=False)
+
+def unrank_draws_array(ranks, r: PowerballRules):
+    """Vectorized unrank_draw: int64 ranks of shape (N,) -> uint8 array (N, white_count + 1)."""
+    import numpy as np
+    ranks = np.asarray(ranks, dtype=np.int64)
+    combos, reds = np.divmod(ranks, r.red_pool)
+    out = np.empty((len(ranks), r.white_count + 1), dtype=np.uint8)
+    table = _binom_table(r)
+    for k in range(r.white_count, 0, -1):
+        col = np.array(table[k], dtype=np.int64)
+        n = np.searchsorted(col, combos, side="right") - 1
+        out[:, k - 1] = n + 1
+        combos = combos - col[n]
+    out[:, r.white_count] = reds + 1
+    return out
+
+def generate_unique_bulk(
+    history: "Set[PowerballDraw] | DrawBitmap",
+    rules: PowerballRules,
+    count: int,
+    seed: int | None = None,
+):
+    """
+    NumPy counterpart of generate_unique for large batches.
+
+    Returns a (count, white_count + 1) uint8 array: sorted whites, then the
+    red. Ranks are sampled in batches, filtered against history and deduped
+    with array operations, and decoded with vectorized unranking (which
+    already yields the whites in sorted order).
+    """
+    try:
+        import numpy as np
+    except ImportError as e:
+        raise RuntimeError(
+            "generate_unique_bulk requires numpy; install it with: pip install numpy"
+        ) from e
+
+    rng = np.random.default_rng(seed)
     universe = total_space(rules)
-    if len(history) >= universe:
+    _, free = _free_space(history, rules)
+    if free <= 0:
         raise RuntimeError("History already covers the full sample space")
+    if count > free:
+        raise RuntimeError(f"Only {free} unseen draws remain; cannot generate {count}")
 
-    results: List[PowerballDraw] = []
-    seen = set(history)
-    tries = 0
-
-    while len(results) < count:
-        if tries > max_tries_per_pick:
-            raise RuntimeError("Too many tries to find a new unique draw")
-        cand = _random_draw(rules)
-        tries += 1
-        if cand not in seen:
-            results.append(cand)
-            seen.add(cand)
-            tries = 0
-    return results
\ No newline at end of file
+    is_excluded = _bulk_excluded(history, rules, np)
+    out = np.empty(0, dtype=np.int64)
+    while len(out) < count:
+        need = count - len(out)
+        # oversample by the expected rejection rate so most rounds finish in one pass
+        remaining = free - len(out)
+        batch = min(int(need * universe / remaining * 1.1) + 64, _BULK_MAX_BATCH)
+        cand = rng.integers(0, universe, size=batch, dtype=np.int64)
+        cand = cand[~is_excluded(cand)]
+        _, first = np.unique(cand, return_index=True)
+        cand = cand[np.sort(first)]
+        if len(out):
+            cand = cand[~np.isin(cand, out)]
+        out = np.concatenate([out, cand[:need]])
+    return unrank_draws_array(out, rules)
@@ -1,9 +1,20 @@
 from __future__ import annotations
 import csv
+import hashlib
+import io
+import json
+import os
 import re
+import shutil
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from itertools import chain
+from datetime import date
 from pathlib import Path
-from typing import List, Set
-from .rules import PowerballRules, WhiteCombo, PowerballDraw
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Set, Tuple
+from .rules import PowerballRules, WhiteCombo, PowerballDraw, Draw, DrawSet
 
 # --- helpers (add these near the top) ---
 DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
@@ -11,65 +22,446 @@ DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
 def _ints_in(s: str) -> List[int]:
     return [int(x) for x in re.findall(r"\d+", s)]
 
-def _looks_like_iso_date(s: str) -> bool:
+def looks_like_iso_date(s: str) -> bool:
     return bool(DATE_RE.match(s.strip()))
 
+def iso_ordinal(s: str) -> int:
+    """date.toordinal() of an ISO date cell, or 0 if it is not one."""
+    if not looks_like_iso_date(s):
+        return 0
+    try:
+        return date.fromisoformat(s.strip()).toordinal()
+    except ValueError:
+        return 0
+
 def _normalize_whites(nums: List[int]) -> WhiteCombo:
     arr = sorted(set(nums))
     if len(arr) != 5:
         raise ValueError("Need exactly 5 distinct white numbers")
     return tuple(arr)
 
+# Header written by the scraper; files starting with it are parsed positionally.
+SCRAPER_HEADER = ["date", "w1", "w2", "w3", "w4", "w5", "powerball", "power_play", "source_url"]
+# w1..w5 and powerball of one scraper-format line
+_STRICT_ROW_RE = re.compile(r"^[^,\n]*,(\d+),(\d+),(\d+),(\d+),(\d+),(\d+)(?=,|\r?$)", re.M)
+_STRICT_CHUNK = 1 << 22  # characters per bulk parse
+
 # --- replace your load_history_csv with this ---
-def load_history_csv(path: str | Path, rules: PowerballRules) -> Set[PowerballDraw]:
+def load_history_csv(path: str | Path, rules: PowerballRules, strict: bool | None = None) -> DrawSet:
     """
     Reads past draws from CSV/TXT.
 
+    Fast path: if the file starts with the scraper header
+        date,w1,w2,w3,w4,w5,powerball,power_play,source_url
+    the columns are read positionally, a few MB at a time, and validated
+    per batch. `strict=True` requires that header, `strict=False` skips the
+    fast path.
+
+    Otherwise, per row:
     Priority 1: If the row looks like our scraper format:
         date,w1,w2,w3,w4,w5,powerball,[power_play],[source_url]
     read those columns directly.
 
     Fallback: collect integers across the row (skipping ISO date tokens) and
     take the first 6 as (5 whites + 1 red).
+
+    Returns a DrawSet: its Draw values do not equal (whites, red) tuples,
+    but `(whites, red) in draws` still finds them.
     """
-    draws: Set[PowerballDraw] = set()
+    draws = DrawSet()
     p = Path(path)
 
     with p.open("r", encoding="utf-8", newline="") as f:
-        r = csv.reader(f)
-        for row in r:
-            if not row:
-                continue
+        first = f.readline()
+        header = next(csv.reader([first]), [])
+        known = [c.strip().lower() for c in header] == SCRAPER_HEADER and rules.white_count == 5
+        if strict and not known:
+            raise ValueError(f"{p} does not start with the header: {','.join(SCRAPER_HEADER)}")
+        if known and strict is not False:
+            _load_strict(f, rules, draws)
+            return draws
+
+        for row in csv.reader(chain([first], f)):
+            draw = parse_row(row, rules)
+            if draw is not None:
+                draws.add(draw)
+
+    return draws
 
-            # Prefer exact-column parsing when row[0] is ISO date
-            if _looks_like_iso_date(row[0]):
+def _load_strict(f, rules: PowerballRules, draws: Set[PowerballDraw]) -> None:
+    """Bulk positional parse of scraper-format lines, validated per chunk."""
+    while True:
+        chunk = f.read(_STRICT_CHUNK)
+        if not chunk:
+            return
+        if not chunk.endswith("\n"):
+            chunk += f.readline()  # finish the last line
+
+        rows = _STRICT_ROW_RE.findall(chunk)
+        if len(rows) != chunk.count("\n") + (not chunk.endswith("\n")):
+            # blank or irregular lines: let the row parser handle this chunk
+            for row in csv.reader(io.StringIO(chunk)):
+                draw = parse_row(row, rules)
+                if draw is not None:
+                    draws.add(draw)
+            continue
+
+        parsed: List[PowerballDraw] = []
+        for w1, w2, w3, w4, w5, red in rows:
+            whites = [int(w1), int(w2), int(w3), int(w4), int(w5)]
+            whites.sort()
+            parsed.append((tuple(whites), int(red)))
+
+        # one range check for the whole chunk; only a failing chunk is re-checked row by row
+        if parsed and not (
+            min(d[0][0] for d in parsed) >= 1
+            and max(d[0][4] for d in parsed) <= rules.white_pool
+            and min(d[1] for d in parsed) >= 1
+            and max(d[1] for d in parsed) <= rules.red_pool
+            and all(a < b < c < d < e for (a, b, c, d, e), _ in parsed)
+        ):
+            good = []
+            for whites, red in parsed:
                 try:
-                    whites = _normalize_whites([int(row[i]) for i in range(1, 6)])
-                    red = int(row[6])
                     rules.validate(whites, red)
-                    draws.add((whites, red))
-                    continue
-                except (ValueError, IndexError):
-                    # fall back to generic parsing if row is malformed
+                    good.append((whites, red))
+                except ValueError:
                     pass
+            parsed = good
+        draws.update(Draw(whites, red) for whites, red in parsed)
+
+def parse_row(row: List[str], rules: PowerballRules) -> Optional[PowerballDraw]:
+    """Parse one CSV row as load_history_csv does; None if it holds no valid draw."""
+    if not row:
+        return None
+
+    # Prefer exact-column parsing when row[0] is ISO date
+    if looks_like_iso_date(row[0]):
+        try:
+            whites = _normalize_whites([int(row[i]) for i in range(1, 6)])
+            red = int(row[6])
+            rules.validate(whites, red)
+            return Draw(whites, red)
+        except (ValueError, IndexError):
+            # fall back to generic parsing if row is malformed
+            pass
 
-            # Generic parsing: pull ints from all cells, but ignore any ISO-date
-            ints: List[int] = []
-            for cell in row:
-                if _looks_like_iso_date(cell):
+    # Generic parsing: pull ints from all cells, but ignore any ISO-date
+    ints: List[int] = []
+    for cell in row:
+        if looks_like_iso_date(cell):
+            continue
+        ints.extend(_ints_in(cell))
+
+    if len(ints) < 6:
+        return None
+
+    try:
+        whites = _normalize_whites(ints[:5])
+        red = ints[5]
+        rules.validate(whites, red)
+        return Draw(whites, red)
+    except ValueError:
+        # Skip rows that don't match Powerball ranges/format
+        return None
+
+# --- incremental tail reader ---
+_TAIL_CHECK = 4096  # bytes before the parsed offset covered by the checksum
+
+class HistoryTail:
+    """
+    Incremental reader of an append-only history CSV.
+
+    Remembers how many bytes it has parsed and a checksum of the last
+    _TAIL_CHECK of them. read() parses only what was appended since the
+    previous call; if the file was replaced, shrank, or those bytes changed,
+    it starts over from byte 0. Only complete lines are consumed. A final
+    line without a newline is returned as well when it has as many fields
+    as the row before it (a file need not end in a newline), but it is
+    not consumed: it is not returned again once its newline arrives, and
+    if it changes instead, read() starts over. A shorter final line is a
+    row still being written and is picked up by a later read().
+
+    Also keeps the summaries the scripts ask for: `rows` (data rows, header
+    excluded), `dates` (the set of date cells) and `last_date` (date cell of
+    the last row in file order).
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self) -> None:
+        self.offset = 0
+        self._check = b""
+        self._partial = b""               # unterminated final row already returned by read()
+        self._width: Optional[int] = None  # fields in the last row read
+        self._file_id: Optional[Tuple[int, int]] = None
+        self.header: Optional[List[str]] = None
+        self.rows = 0
+        self.dates: Set[str] = set()
+        self.last_date: Optional[str] = None
+
+    @staticmethod
+    def _checksum(f, end: int) -> bytes:
+        start = max(0, end - _TAIL_CHECK)
+        f.seek(start)
+        return hashlib.blake2b(f.read(end - start), digest_size=16).digest()
+
+    def read(self) -> Tuple[List[List[str]], bool]:
+        """
+        Parse newly appended rows. Returns (rows, reset): with reset=True
+        the file was rewritten or removed, `rows` is its whole content and
+        anything built from earlier reads must be dropped.
+        """
+        with self._lock:
+            reset = False
+            try:
+                f = self.path.open("rb")
+            except FileNotFoundError:
+                reset = self.offset > 0 or bool(self._partial)
+                self._clear()
+                return [], reset
+            with f:
+                st = os.fstat(f.fileno())
+                file_id = (st.st_dev, st.st_ino)
+                if (self.offset or self._partial) and (
+                    file_id != self._file_id
+                    or st.st_size < self.offset + len(self._partial)
+                    or self._checksum(f, self.offset) != self._check
+                    or self._read_at(f, self.offset, len(self._partial)) != self._partial
+                    or self._partial_grew(f, st.st_size)
+                ):
+                    self._clear()
+                    reset = True
+                self._file_id = file_id
+                delivered = self._partial
+                if st.st_size == self.offset + len(delivered):
+                    return [], reset
+                first = self.offset == 0 and not delivered
+                data = self._read_at(f, self.offset, st.st_size - self.offset)
+                end = data.rfind(b"\n") + 1
+                if delivered and not end:
+                    return [], reset  # the final row handed out last time is still unterminated
+                # a final row handed out last time is complete now: consume it, don't repeat it
+                start = data.index(b"\n") + 1 if delivered else 0
+                self.offset += end
+                self._check = self._checksum(f, self.offset)
+                self._partial = b""
+
+            rows = list(csv.reader(io.StringIO(data[start:end].decode("utf-8"))))
+            last = data[end:]
+            if last.strip():
+                row = next(csv.reader([last.decode("utf-8", errors="replace")]), [])
+                # a file need not end in a newline; but a row cut short is still being written
+                if self._width is None or len(row) >= self._width:
+                    rows.append(row)
+                    self._partial = last
+            body = rows
+            if first and rows and rows[0] and not looks_like_iso_date(rows[0][0]):
+                self.header, body = rows[0], rows[1:]
+            for row in body:
+                if not row:
                     continue
-                ints.extend(_ints_in(cell))
+                self.rows += 1
+                if row[0]:
+                    self.dates.add(row[0])
+                    self.last_date = row[0]
+            if rows and rows[-1]:
+                self._width = len(rows[-1])
+            return rows, reset
 
-            if len(ints) < 6:
-                continue
+    def _partial_grew(self, f, size: int) -> bool:
+        """Whether the unterminated row handed out went on past where it was read (it was cut short)."""
+        end = self.offset + len(self._partial)
+        return bool(self._partial) and size > end and self._read_at(f, end, 1) not in (b"\n", b"\r")
 
+    @staticmethod
+    def _read_at(f, offset: int, n: int) -> bytes:
+        f.seek(offset)
+        return f.read(n)
+
+    def skip(self, size: int) -> bool:
+        """
+        Treat the first `size` bytes as read without parsing them, e.g. when
+        their rows were loaded from a binary twin. Only whole lines can be
+        skipped; returns False (and changes nothing) otherwise. The row
+        summaries then only cover rows read afterwards.
+        """
+        with self._lock:
             try:
-                whites = _normalize_whites(ints[:5])
-                red = ints[5]
-                rules.validate(whites, red)
-                draws.add((whites, red))
-            except ValueError:
-                # Skip rows that don't match Powerball ranges/format
+                f = self.path.open("rb")
+            except FileNotFoundError:
+                return False
+            with f:
+                st = os.fstat(f.fileno())
+                if st.st_size < size:
+                    return False
+                if size:
+                    f.seek(size - 1)
+                    if f.read(1) != b"\n":
+                        return False
+                self._clear()
+                self.offset = size
+                self._file_id = (st.st_dev, st.st_ino)
+                self._check = self._checksum(f, size)
+                prev = self._read_at(f, max(0, size - _TAIL_CHECK), min(size, _TAIL_CHECK))
+                lines = prev.rstrip(b"\r\n").rsplit(b"\n", 1)
+                if lines[-1].strip():  # width of the last skipped row, for the unterminated-row check
+                    self._width = len(next(csv.reader([lines[-1].decode("utf-8", errors="replace")])))
+            return True
+
+@lru_cache(maxsize=16)
+def _tail_for(path: str) -> HistoryTail:
+    return HistoryTail(path)
+
+def history_tail(path: str | Path) -> HistoryTail:
+    """Process-wide HistoryTail for a path, brought up to date."""
+    tail = _tail_for(str(Path(path).resolve()))
+    tail.read()
+    return tail
+
+# --- date index ---
+class DateIndex:
+    """
+    History rows keyed by draw date: date ordinals kept sorted next to a
+    parallel list of values, so latest() is O(1) and get() / range() are
+    binary searches. Rows without a date (ordinal 0) are left out.
+
+    Values are stored as given (draws, or compact ranks with `decode`
+    turning them back into draws on the way out). Instances are not
+    modified after construction; extended() returns a new index.
+    """
+
+    def __init__(self, ordinals: Sequence[int] = (), values: Sequence[Any] = (),
+                 decode: Callable[[Any], PowerballDraw] | None = None):
+        order = sorted((i for i in range(len(ordinals)) if ordinals[i]), key=ordinals.__getitem__)
+        self._ordinals = array("l", (ordinals[i] for i in order))
+        self._values = [values[i] for i in order]
+        self._decode = decode
+
+    def extended(self, ordinals: Sequence[int], values: Sequence[Any]) -> "DateIndex":
+        """A new index with more rows; appending later dates costs no re-sort."""
+        new = DateIndex.__new__(DateIndex)
+        new._decode = self._decode
+        new._ordinals, new._values = array("l", self._ordinals), list(self._values)
+        for o, v in zip(ordinals, values):
+            if not o:
                 continue
+            if not new._ordinals or o >= new._ordinals[-1]:
+                new._ordinals.append(o)
+                new._values.append(v)
+            else:
+                i = bisect_right(new._ordinals, o)
+                new._ordinals.insert(i, o)
+                new._values.insert(i, v)
+        return new
+
+    def _item(self, i: int) -> Tuple[date, PowerballDraw]:
+        v = self._values[i]
+        return date.fromordinal(self._ordinals[i]), (self._decode(v) if self._decode else v)
+
+    def __len__(self) -> int:
+        return len(self._ordinals)
+
+    def latest(self) -> Optional[Tuple[date, PowerballDraw]]:
+        """(date, draw) of the most recent dated row, or None."""
+        return self._item(len(self._ordinals) - 1) if self._ordinals else None
+
+    def get(self, day: date) -> Optional[PowerballDraw]:
+        """Draw on `day`, or None."""
+        i = bisect_left(self._ordinals, day.toordinal())
+        if i < len(self._ordinals) and self._ordinals[i] == day.toordinal():
+            return self._item(i)[1]
+        return None
+
+    def range(self, start: date | None = None, end: date | None = None) -> List[Tuple[date, PowerballDraw]]:
+        """(date, draw) rows with start <= date <= end, oldest first; open ends are unbounded."""
+        lo = bisect_left(self._ordinals, start.toordinal()) if start else 0
+        hi = bisect_right(self._ordinals, end.toordinal()) if end else len(self._ordinals)
+        return [self._item(i) for i in range(lo, hi)]
+
+    def dates(self) -> Iterable[date]:
+        return (date.fromordinal(o) for o in self._ordinals)
+
+    def ordinals(self) -> Sequence[int]:
+        """The sorted date ordinals (read-only), e.g. for lotto.schedule.missing_dates."""
+        return self._ordinals
+
+# --- newest-first view ---
+# A sidecar `<out>.state` records the part of `src` the view was built from:
+#   {"size": bytes of src, "check": hex blake2 of its last _TAIL_CHECK bytes, "head": newest date}
+def _view_state_path(out: Path) -> Path:
+    return out.with_name(out.name + ".state")
+
+def _read_view_state(out: Path) -> Optional[dict]:
+    try:
+        state = json.loads(_view_state_path(out).read_text(encoding="utf-8"))
+        return state if out.exists() and {"size", "check", "head"} <= set(state) else None
+    except (FileNotFoundError, ValueError):
+        return None
+
+def update_sorted_view(src: str | Path, out: str | Path) -> int:
+    """
+    Keep `out` as a newest-first copy of the history CSV `src`.
+
+    An unchanged `src` costs a stat and one checksum of its last 4 KiB.
+    If rows were only appended, just those bytes are parsed; when none is
+    older than the head of `out`, they are sorted and written at the head
+    and the existing body of `out` is copied through as bytes, never parsed
+    or re-sorted. Anything else (no sidecar state, a rewritten `src`, a
+    back-filled older row) rebuilds `out` from scratch. Returns the number
+    of rows added.
+    """
+    src, out = Path(src), Path(out)
+    if not src.exists():
+        return 0
+    state = _read_view_state(out)
+    new: Optional[List[List[str]]] = None
+    with src.open("rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if (state is not None and state["size"] <= size
+                and HistoryTail._checksum(f, state["size"]).hex() == state["check"]):
+            if state["size"] == size:
+                return 0
+            f.seek(state["size"])
+            rows = [r for r in csv.reader(io.StringIO(f.read(size - state["size"]).decode("utf-8"))) if r]
+            if all(looks_like_iso_date(r[0]) and r[0].strip() >= state["head"] for r in rows):
+                new = rows
+        check = HistoryTail._checksum(f, size).hex()
+
+    if new is None:
+        with src.open("r", encoding="utf-8", newline="") as f:
+            rows = list(csv.reader(f))
+        if not rows:
+            return 0
+        header, body = rows[0], [r for r in rows[1:] if r]
+        body.sort(key=lambda row: row[0], reverse=True)  # ISO dates sort lexicographically
+        old_body = None
+    else:
+        header, body, old_body = None, sorted(new, key=lambda row: row[0], reverse=True), out
 
-    return draws
\ No newline at end of file
+    if body or old_body is None:  # else only blank lines were appended
+        buf = io.StringIO()
+        w = csv.writer(buf)
+        if old_body is None:
+            w.writerow(header)
+        w.writerows(body)
+        tmp = out.with_name(out.name + ".tmp")
+        out.parent.mkdir(parents=True, exist_ok=True)
+        with tmp.open("wb") as f:
+            if old_body is None:
+                f.write(buf.getvalue().encode("utf-8"))
+            else:
+                with old_body.open("rb") as old:
+                    f.write(old.readline())  # header
+                    f.write(buf.getvalue().encode("utf-8"))
+                    shutil.copyfileobj(old, f, 1 << 20)
+        os.replace(tmp, out)
+    head = body[0][0].strip() if body else (state["head"] if old_body is not None else "")
+    state_path = _view_state_path(out)
+    state_tmp = state_path.with_name(state_path.name + ".tmp")
+    state_tmp.write_text(json.dumps({"size": size, "check": check, "head": head}), encoding="utf-8")
+    os.replace(state_tmp, state_path)
+    return len(body)
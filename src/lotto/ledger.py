@@ -0,0 +1,169 @@
+from __future__ import annotations
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left, insort
+from pathlib import Path
+from typing import Iterable, List, Sequence
+from .rules import PowerballRules, PowerballDraw
+from .generate import total_space, rank_draw
+
+# Ledger files (little-endian), both named after the ledger path:
+#   <path>       index: header, then `count` distinct uint32 ranks, sorted
+#   <path>.log   log:   header, then uint32 ranks in the order they were added
+_INDEX_MAGIC = b"PBLX"
+_LOG_MAGIC = b"PBLL"
+_VERSION = 1
+_INDEX_HEADER = struct.Struct("<4sHBBBxQ")  # magic, version, white_count, white_pool, red_pool, count
+_LOG_HEADER = struct.Struct("<4sHBBBx")     # magic, version, white_count, white_pool, red_pool
+
+class PickLedger:
+    """
+    Persistent record of every pick handed out, so picks are never repeated
+    across sessions.
+
+    Ranks go to an append-only log (4 bytes per pick). Opening the ledger
+    maps the sorted index file instead of reading it, and only the log,
+    at most `compact_at` records, is loaded; compact() folds the log into
+    the index. Membership is a bisection in the index plus a lookup in
+    the small sorted tail.
+
+    Pass a ledger as `exclude` to DrawGenerator.unique / generate_unique.
+    """
+
+    COMPACT_AT = 1 << 16
+
+    def __init__(self, path: str | Path, rules: PowerballRules = PowerballRules(), compact_at: int | None = None):
+        if total_space(rules) > 1 << 32:
+            raise ValueError("Draw space too large for a 32-bit ledger")
+        self.path = Path(path)
+        self.log_path = self.path.with_name(self.path.name + ".log")
+        self.rules = rules
+        self.compact_at = compact_at if compact_at is not None else self.COMPACT_AT
+        self._mm = None
+        self._index: Sequence[int] = array("I")
+        self._tail: List[int] = []
+        self._open_index()
+        self._open_log()
+
+    def _rules_key(self):
+        r = self.rules
+        return (r.white_count, r.white_pool, r.red_pool)
+
+    def _open_index(self) -> None:
+        if not self.path.exists():
+            return
+        with self.path.open("rb") as f:
+            head = f.read(_INDEX_HEADER.size)
+            if len(head) != _INDEX_HEADER.size:
+                raise ValueError(f"{self.path} is not a pick ledger")
+            magic, version, wc, wp, rp, count = _INDEX_HEADER.unpack(head)
+            if magic != _INDEX_MAGIC or version != _VERSION:
+                raise ValueError(f"{self.path} is not a pick ledger")
+            if (wc, wp, rp) != self._rules_key():
+                raise ValueError(f"{self.path} was built for different rules")
+            if not count:
+                return
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        col = memoryview(self._mm)[_INDEX_HEADER.size:_INDEX_HEADER.size + 4 * count]
+        if sys.byteorder == "little":
+            self._index = col.cast("I")
+        else:  # big-endian hosts pay one copy
+            a = array("I", col.tobytes())
+            a.byteswap()
+            self._index = a
+            col.release()
+
+    def _open_log(self) -> None:
+        if not self.log_path.exists():
+            self._reset_log()
+            return
+        data = self.log_path.read_bytes()
+        if len(data) < _LOG_HEADER.size or _LOG_HEADER.unpack_from(data)[0] != _LOG_MAGIC:
+            raise ValueError(f"{self.log_path} is not a pick ledger log")
+        if _LOG_HEADER.unpack_from(data)[2:] != self._rules_key():
+            raise ValueError(f"{self.log_path} was built for different rules")
+        body = data[_LOG_HEADER.size:]
+        recs = array("I", body[:len(body) - len(body) % 4])  # a torn last record is dropped
+        if sys.byteorder == "big":
+            recs.byteswap()
+        in_index = self._in_index
+        self._tail = sorted({x for x in recs if not in_index(x)})
+
+    def _reset_log(self) -> None:
+        tmp = self.log_path.with_name(self.log_path.name + ".tmp")
+        tmp.write_bytes(_LOG_HEADER.pack(_LOG_MAGIC, _VERSION, *self._rules_key()))
+        os.replace(tmp, self.log_path)
+
+    # --- membership ---
+    def _in_index(self, rank: int) -> bool:
+        i = bisect_left(self._index, rank)
+        return i < len(self._index) and self._index[i] == rank
+
+    def contains_rank(self, rank: int) -> bool:
+        if self._in_index(rank):
+            return True
+        i = bisect_left(self._tail, rank)
+        return i < len(self._tail) and self._tail[i] == rank
+
+    def __contains__(self, draw: PowerballDraw) -> bool:
+        return self.contains_rank(rank_draw(draw, self.rules))
+
+    def __len__(self) -> int:
+        return len(self._index) + len(self._tail)
+
+    def sorted_parts(self) -> List[Sequence[int]]:
+        """The recorded ranks as disjoint sorted sequences (index, tail)."""
+        return [self._index, self._tail]
+
+    # --- recording ---
+    def add(self, draws: Iterable[PowerballDraw]) -> int:
+        """Record picks; returns how many were new. May trigger compact()."""
+        new = array("I", sorted({r for r in (rank_draw(d, self.rules) for d in draws) if not self.contains_rank(r)}))
+        if new:
+            if len(new) == 1:
+                insort(self._tail, new[0])
+            else:
+                self._tail = sorted(self._tail + new.tolist())
+            if sys.byteorder == "big":
+                new.byteswap()
+            with self.log_path.open("ab") as f:
+                f.write(new.tobytes())
+            if len(self._tail) >= self.compact_at:
+                self.compact()
+        return len(new)
+
+    def compact(self) -> None:
+        """Merge the log into the index and truncate the log."""
+        if not self._tail:
+            return
+        index, merged = self._index, array("I")
+        prev = 0
+        for rank in self._tail:
+            pos = bisect_left(index, rank, prev)
+            merged.frombytes(memoryview(index)[prev:pos].tobytes())
+            merged.append(rank)
+            prev = pos
+        merged.frombytes(memoryview(index)[prev:].tobytes())
+        if sys.byteorder == "big":
+            merged.byteswap()
+        self.close()  # the old index must be unmapped before it is replaced
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with tmp.open("wb") as f:
+            f.write(_INDEX_HEADER.pack(_INDEX_MAGIC, _VERSION, *self._rules_key(), len(merged)))
+            f.write(merged.tobytes())
+        os.replace(tmp, self.path)
+        # a crash here leaves log records that are already indexed; _open_log skips them
+        self._reset_log()
+        self._tail = []
+        self._open_index()
+
+    def close(self) -> None:
+        if isinstance(self._index, memoryview):
+            self._index.release()
+        self._index = array("I")
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
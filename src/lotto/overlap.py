@@ -0,0 +1,79 @@
+from __future__ import annotations
+from itertools import combinations
+from typing import Iterable, List, Optional, Set, Tuple
+from .rules import PowerballRules, PowerballDraw
+
+class _OutOfBudget(Exception):
+    pass
+
+class OverlapIndex:
+    """
+    Hash index of the k-subsets of white balls seen in past draws.
+
+    conflicts(draw) is True when the draw shares k or more whites with some
+    past draw (and, unless ignore_red, also its red ball). It costs
+    C(white_count, k) set lookups, independent of the history size.
+    """
+
+    def __init__(self, history: Iterable[PowerballDraw], k: int, ignore_red: bool = True):
+        if k < 1:
+            raise ValueError("Overlap size k must be at least 1")
+        self.k = k
+        self.ignore_red = ignore_red
+        self._keys: Set[Tuple[int, ...]] = set()
+        for draw in history:
+            self._keys.update(self._subsets(draw))
+
+    def _subsets(self, draw: PowerballDraw):
+        whites, red = draw
+        if self.ignore_red:
+            return combinations(whites, self.k)
+        return (sub + (red,) for sub in combinations(whites, self.k))
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def conflicts(self, draw: PowerballDraw) -> bool:
+        keys = self._keys
+        return any(sub in keys for sub in self._subsets(draw))
+
+    def admits(self, rules: PowerballRules, budget: int = 200_000) -> Optional[bool]:
+        """
+        Whether any draw under `rules` avoids every conflict, found by a
+        backtracking search over sorted white combinations that prunes on
+        the first conflicting k-subset. Returns None if the search visits
+        `budget` nodes without an answer.
+
+        For small k against a real history the answer is usually no
+        (nearly every pair of whites has been drawn), and this says so
+        before a sampler spends its whole try budget finding out.
+        """
+        keys, k, n, size = self._keys, self.k, rules.white_pool, rules.white_count
+        if k > size:
+            return True
+        nodes = 0
+        chosen: List[int] = []
+
+        def extend(start: int, suffix: Tuple[int, ...]) -> bool:
+            nonlocal nodes
+            if len(chosen) == size:
+                return True
+            for w in range(start, n - (size - len(chosen)) + 2):
+                nodes += 1
+                if nodes > budget:
+                    raise _OutOfBudget
+                # subsets not containing w were checked when they were chosen
+                if len(chosen) >= k - 1 and any(sub + (w,) + suffix in keys
+                                                 for sub in combinations(chosen, k - 1)):
+                    continue
+                chosen.append(w)
+                if extend(w + 1, suffix):
+                    return True
+                chosen.pop()
+            return False
+
+        suffixes = [()] if self.ignore_red else [(red,) for red in range(1, rules.red_pool + 1)]
+        try:
+            return any(extend(1, suffix) for suffix in suffixes)
+        except _OutOfBudget:
+            return None
@@ -0,0 +1,135 @@
+from __future__ import annotations
+import re
+from datetime import date
+from typing import List, Optional, Tuple
+
+from lxml import etree, html as lxml_html
+
+# Result pages of powerball.com. A Previous Results page lists one card per draw:
+#   <a class="card" ...>
+#     <h5 class="card-title">Wed, Oct 7, 2015</h5>
+#     <div class="form-control col white-balls item-powerball">12</div>  x5
+#     <div class="form-control col powerball item-powerball">5</div>
+#     ... <span class="multiplier">2x</span>
+# The cards are located with compiled XPath on the lxml tree. If none can
+# be read (the markup changed), the page text is scanned with the regexes
+# the scraper has always used.
+
+# (date, sorted whites, red, power play multiplier or "")
+ResultCard = Tuple[date, List[int], int, str]
+
+DATE_NUMS_RE = re.compile(
+    r'(?P<dow>Mon|Tue|Wed|Thu|Fri|Sat|Sun),\s+'
+    r'(?P<mon>[A-Za-z]{3})\s+(?P<day>\d{1,2}),\s+(?P<year>\d{4})\s+'
+    r'(?P<n1>\d{1,2})\s+(?P<n2>\d{1,2})\s+(?P<n3>\d{1,2})\s+(?P<n4>\d{1,2})\s+(?P<n5>\d{1,2})\s+'
+    r'(?P<pb>\d{1,2})(?:\s+Power\s+Play\s+(?P<pp>\d+)x)?'
+)
+PAGE_DATE_RE = re.compile(
+    r'\b(Mon|Tue|Wed|Thu|Fri|Sat|Sun),\s+([A-Za-z]{3})\s+(\d{1,2}),\s+(\d{4})\b'
+)
+RE_INT = re.compile(r"\b(\d{1,2})\b")
+MONTHS = {m: i for i, m in enumerate(
+    ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"], start=1
+)}
+
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+_CARDS = etree.XPath(f"//*[{_has_class('card')}]")
+_TITLE = etree.XPath(f"string(.//*[{_has_class('card-title')}])")
+_WHITES = etree.XPath(f".//*[{_has_class('white-balls')}]")
+_RED = etree.XPath(f".//*[{_has_class('powerball')} and not({_has_class('white-balls')})]")
+_MULTIPLIER = etree.XPath(f"string(.//*[{_has_class('multiplier')}])")
+
+_UTF8 = lxml_html.HTMLParser(encoding="utf-8")
+
+def _empty():
+    return lxml_html.fromstring("<html></html>")
+
+def _tree(page: str | bytes):
+    """Parsed page; bytes let lxml honour the page's own charset. Pages without content parse as empty."""
+    if not page.strip():
+        return _empty()
+    try:
+        if isinstance(page, str):
+            return lxml_html.fromstring(page.encode("utf-8"), parser=_UTF8)
+        return lxml_html.fromstring(page)
+    except etree.ParserError:  # "Document is empty": only comments, a doctype, ...
+        return _empty()
+
+def _date_in(text: str) -> Optional[date]:
+    m = PAGE_DATE_RE.search(text)
+    if not m:
+        return None
+    mon = MONTHS.get(m.group(2))
+    if not mon:
+        return None
+    try:
+        return date(int(m.group(4)), mon, int(m.group(3)))
+    except ValueError:
+        return None
+
+def _ball(el) -> Optional[int]:
+    text = el.text_content().strip()
+    return int(text) if text.isdigit() else None
+
+def page_text(tree) -> str:
+    """Visible text of a parsed page, whitespace-separated (as soup.get_text(" ", strip=True))."""
+    etree.strip_elements(tree, "script", "style", with_tail=False)
+    return " ".join(t.strip() for t in tree.itertext() if t.strip())
+
+def parse_results_text(text: str):
+    """Regex fallback: yield ResultCards found in a page's flattened text."""
+    for m in DATE_NUMS_RE.finditer(text):
+        mon = MONTHS.get(m.group("mon"))
+        if not mon:
+            continue
+        try:
+            d = date(int(m.group("year")), mon, int(m.group("day")))
+        except ValueError:
+            continue
+        whites = sorted(int(m.group(f"n{i}")) for i in range(1, 6))
+        yield d, whites, int(m.group("pb")), m.group("pp") or ""
+
+def _read_cards(tree) -> List[ResultCard]:
+    cards = []
+    for card in _CARDS(tree):
+        d = _date_in(_TITLE(card))
+        whites = [_ball(el) for el in _WHITES(card)]
+        reds = [_ball(el) for el in _RED(card)]
+        if d is None or len(whites) != 5 or len(reds) != 1 or None in whites or reds[0] is None:
+            continue
+        pp = _MULTIPLIER(card).strip().lower().rstrip("x")
+        cards.append((d, sorted(whites), reds[0], pp if pp.isdigit() else ""))
+    return cards
+
+def parse_results_page(page: str | bytes) -> List[ResultCard]:
+    """
+    Every result card on a Previous Results page, in page order. Values are
+    not range-checked; callers validate them against the rules.
+    """
+    tree = _tree(page)
+    cards = _read_cards(tree)
+    if cards:
+        return cards
+    return list(parse_results_text(page_text(tree)))
+
+def parse_draw_page(page: str | bytes, day: date) -> Optional[Tuple[List[int], int]]:
+    """
+    (sorted whites, red) from a single draw-result page, or None unless the
+    page shows the draw of `day` (the site shows the latest draw for
+    dates without one).
+    """
+    tree = _tree(page)
+    cards = [c for c in _read_cards(tree) if c[0] == day]
+    if cards:
+        return cards[0][1], cards[0][2]
+    text = page_text(tree)
+    if _date_in(text) != day:
+        return None
+    nums = [int(x) for x in RE_INT.findall(text)]
+    for i in range(len(nums) - 5):
+        w, r = nums[i:i + 5], nums[i + 5]
+        if len(set(w)) == 5 and all(1 <= n <= 69 for n in w) and 1 <= r <= 26:
+            return sorted(w), r
+    return None
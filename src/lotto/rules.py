@@ -1,9 +1,118 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Tuple
+from typing import Iterable, Iterator, Tuple, Union
 
 WhiteCombo = Tuple[int, ...]            # a sorted 5-tuple of white numbers
-PowerballDraw = Tuple[WhiteCombo, int]  # (whites, red)
+
+_BALL_BITS = 7
+_BALL_MASK = (1 << _BALL_BITS) - 1
+
+class Draw(int):
+    """
+    A draw packed into one int, 7 bits per ball: the sorted whites from the
+    high groups down, then the red in the low 7 bits. The encoding does not
+    depend on the rules, and draws with the same number of whites order
+    like (whites, red) tuples.
+
+    A Draw is the int itself (no per-instance dict or tuple), so it hashes
+    and compares as an int and a set of draws costs what a set of ints
+    does. It still unpacks like the old tuple form: `whites, red = draw`.
+
+    NOT a tuple for equality or hashing: `Draw(w, r) == (w, r)` is False,
+    so `(w, r) in {Draw(w, r)}` is False too. (A hash cannot match both the
+    int and the tuple, and a Python-level __eq__ would slow every set
+    lookup.) Wrap the key first, `Draw(whites, red) in draws`, or keep draws
+    in a DrawSet, as load_history_csv returns, which packs tuple keys itself.
+    Rank-based lookups (rank_draw, HistorySnapshot, DrawBitmap, PickLedger)
+    accept either form.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, whites: Iterable[int], red: int) -> "Draw":
+        code = 0
+        for w in sorted(whites):
+            if not 1 <= w <= _BALL_MASK:
+                raise ValueError(f"Ball out of range for packing: {w}")
+            code = code << _BALL_BITS | w
+        if not 0 <= red <= _BALL_MASK:
+            raise ValueError(f"Ball out of range for packing: {red}")
+        return int.__new__(cls, code << _BALL_BITS | red)
+
+    @classmethod
+    def from_code(cls, code: int) -> "Draw":
+        return int.__new__(cls, code)
+
+    @property
+    def code(self) -> int:
+        return int(self)
+
+    @property
+    def whites(self) -> WhiteCombo:
+        n = (self.bit_length() + _BALL_BITS - 1) // _BALL_BITS - 1
+        return tuple((self >> (_BALL_BITS * i)) & _BALL_MASK for i in range(n, 0, -1))
+
+    @property
+    def red(self) -> int:
+        return self & _BALL_MASK
+
+    def __iter__(self) -> Iterator:
+        yield self.whites
+        yield self.red
+
+    def __getitem__(self, i: int):
+        return (self.whites, self.red)[i]
+
+    def __repr__(self) -> str:
+        return f"Draw({self.whites}, {self.red})"
+
+    def __reduce__(self):
+        return (Draw.from_code, (int(self),))
+
+# (whites, red); generators and loaders return Draw, which never equals the tuple form
+PowerballDraw = Union[Draw, Tuple[WhiteCombo, int]]
+
+class DrawSet(set):
+    """
+    Set of Draws whose membership test also takes the (whites, red) tuple
+    form, so `(whites, red) in draws` finds the draw instead of silently
+    answering False. Other set operations compare Draws as ints.
+    """
+
+    __slots__ = ()
+
+    def __contains__(self, draw) -> bool:
+        if type(draw) is tuple:
+            try:
+                draw = Draw(*draw)
+            except (TypeError, ValueError):
+                return False
+        return set.__contains__(self, draw)
+
+def pack_draws_array(rows):
+    """Vectorized Draw packing: (N, white_count + 1) array of sorted whites then red -> int64 codes."""
+    try:
+        import numpy as np
+    except ImportError as e:
+        raise RuntimeError("pack_draws_array requires numpy; install it with: pip install numpy") from e
+    rows = np.asarray(rows, dtype=np.int64)
+    codes = np.zeros(len(rows), dtype=np.int64)
+    for j in range(rows.shape[1]):
+        codes = (codes << _BALL_BITS) | rows[:, j]
+    return codes
+
+def unpack_draws_array(codes, white_count: int = 5):
+    """Inverse of pack_draws_array: int64 codes -> uint8 array (N, white_count + 1)."""
+    try:
+        import numpy as np
+    except ImportError as e:
+        raise RuntimeError("unpack_draws_array requires numpy; install it with: pip install numpy") from e
+    codes = np.asarray(codes, dtype=np.int64)
+    out = np.empty((len(codes), white_count + 1), dtype=np.uint8)
+    for j in range(white_count, -1, -1):
+        out[:, j] = codes & _BALL_MASK
+        codes = codes >> _BALL_BITS
+    return out
 
 @dataclass(frozen=True)
 class PowerballRules:
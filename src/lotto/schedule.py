@@ -0,0 +1,131 @@
+from __future__ import annotations
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import date, timedelta
+from heapq import merge
+from typing import FrozenSet, Iterator, List, Optional, Sequence, Tuple
+
+@dataclass(frozen=True)
+class Era:
+    """Draws on fixed weekdays (0 = Monday) from `start` through `end` (None: still running)."""
+    start: date
+    end: Optional[date]
+    weekdays: Tuple[int, ...]
+
+# Powerball under the current 5/69 + 1/26 rules
+ERAS: Tuple[Era, ...] = (
+    Era(date(2015, 10, 7), date(2021, 8, 22), (2, 5)),  # Wed/Sat
+    Era(date(2021, 8, 23), None, (0, 2, 5)),            # Mon/Wed/Sat
+)
+FIRST_DRAW = ERAS[0].start
+
+# Irregular draws: dates drawn outside the weekday pattern, and pattern
+# dates with no draw. Draws postponed past midnight keep their scheduled
+# date, so neither case has occurred since 2015; add dates here if one does.
+EXTRA_DRAWS: FrozenSet[date] = frozenset()
+SKIPPED_DRAWS: FrozenSet[date] = frozenset()
+
+_ERA_STARTS = [e.start.toordinal() for e in ERAS]
+
+def _era_for(day: date) -> Optional[Era]:
+    i = bisect_right(_ERA_STARTS, day.toordinal()) - 1
+    if i < 0:
+        return None
+    era = ERAS[i]
+    return era if era.end is None or day <= era.end else None
+
+def _on_pattern(day: date) -> bool:
+    era = _era_for(day)
+    return era is not None and day.weekday() in era.weekdays
+
+def is_scheduled(day: date) -> bool:
+    """Whether a draw is scheduled on `day`."""
+    if day in EXTRA_DRAWS:
+        return True
+    return day not in SKIPPED_DRAWS and _on_pattern(day)
+
+def _bounds(era: Era, start: date, end: date) -> Tuple[date, date]:
+    return max(start, era.start), min(end, era.end) if era.end is not None else end
+
+def _pattern_dates(start: date, end: date) -> Iterator[date]:
+    """Weekday-pattern dates in [start, end], stepping a week at a time."""
+    for era in ERAS:
+        lo, hi = _bounds(era, start, end)
+        if lo > hi:
+            continue
+        week = lo - timedelta(days=lo.weekday())  # Monday of lo's week
+        while week <= hi:
+            for wd in era.weekdays:
+                d = week + timedelta(days=wd)
+                if lo <= d <= hi:
+                    yield d
+            week += timedelta(days=7)
+
+def scheduled_dates(start: date | None = None, end: date | None = None) -> Iterator[date]:
+    """Scheduled draw dates in [start, end] (default FIRST_DRAW..today), oldest first, lazily."""
+    start = max(start or FIRST_DRAW, FIRST_DRAW)
+    end = end or date.today()
+    extras = sorted(d for d in EXTRA_DRAWS if start <= d <= end and not _on_pattern(d))
+    for d in merge(_pattern_dates(start, end), extras):
+        if d in EXTRA_DRAWS or d not in SKIPPED_DRAWS:
+            yield d
+
+def count_scheduled(start: date | None = None, end: date | None = None) -> int:
+    """Number of scheduled draws in [start, end], computed without listing them."""
+    start = max(start or FIRST_DRAW, FIRST_DRAW)
+    end = end or date.today()
+    n = 0
+    for era in ERAS:
+        lo, hi = _bounds(era, start, end)
+        if lo > hi:
+            continue
+        for wd in era.weekdays:
+            first = lo + timedelta(days=(wd - lo.weekday()) % 7)
+            if first <= hi:
+                n += (hi - first).days // 7 + 1
+    n += sum(1 for d in EXTRA_DRAWS if start <= d <= end and not _on_pattern(d))
+    n -= sum(1 for d in SKIPPED_DRAWS if start <= d <= end and d not in EXTRA_DRAWS and _on_pattern(d))
+    return n
+
+def _scheduled_ordinals(have) -> Sequence[int]:
+    """Sorted distinct ordinals of the scheduled dates among `have`."""
+    ordinals = have.ordinals() if hasattr(have, "ordinals") else sorted({d.toordinal() for d in have})
+    out = array("l")
+    prev = 0
+    for o in ordinals:
+        if o != prev and is_scheduled(date.fromordinal(o)):
+            out.append(o)
+        prev = o
+    return out
+
+def missing_dates(have, start: date | None = None, end: date | None = None) -> List[date]:
+    """
+    Scheduled dates in [start, end] absent from `have` (a history DateIndex,
+    or any iterable of dates), oldest first.
+
+    A range is skipped as soon as count_scheduled() shows it has no gaps,
+    otherwise it is halved, so after one pass over `have` the search costs
+    O(missing * log(days)) rather than a walk over every day of the range.
+    """
+    start = max(start or FIRST_DRAW, FIRST_DRAW)
+    end = end or date.today()
+    got = _scheduled_ordinals(have)
+    out: List[date] = []
+
+    def search(lo: date, hi: date) -> None:
+        want = count_scheduled(lo, hi)
+        n = bisect_right(got, hi.toordinal()) - bisect_left(got, lo.toordinal())
+        if n >= want:
+            return
+        if n == 0 or (hi - lo).days < 14:
+            held = got[bisect_left(got, lo.toordinal()):bisect_right(got, hi.toordinal())]
+            out.extend(d for d in scheduled_dates(lo, hi) if d.toordinal() not in held)
+            return
+        mid = lo + (hi - lo) // 2
+        search(lo, mid)
+        search(mid + timedelta(days=1), hi)
+
+    if start <= end:
+        search(start, end)
+    return out
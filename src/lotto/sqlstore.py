@@ -0,0 +1,198 @@
+from __future__ import annotations
+import csv
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+from .rules import PowerballRules, PowerballDraw, Draw
+from .history import parse_row, looks_like_iso_date
+from .generate import rank_draw
+
+# One row per draw date. `rank` is rank_draw() of the draw (indexed for
+# "has this combination been drawn"); `seq` is the write generation that
+# last touched the row, so readers can fetch only what changed.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS draws (
+    date        TEXT PRIMARY KEY,
+    w1          INTEGER NOT NULL,
+    w2          INTEGER NOT NULL,
+    w3          INTEGER NOT NULL,
+    w4          INTEGER NOT NULL,
+    w5          INTEGER NOT NULL,
+    powerball   INTEGER NOT NULL,
+    power_play  TEXT NOT NULL DEFAULT '',
+    source_url  TEXT NOT NULL DEFAULT '',
+    rank        INTEGER NOT NULL,
+    seq         INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS draws_rank ON draws(rank);
+CREATE INDEX IF NOT EXISTS draws_seq ON draws(seq);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+"""
+
+DB_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+# (iso date, whites, red, power_play, source_url), as the scraper produces them
+DrawRow = Tuple[str, Sequence[int], int, str, str]
+
+class HistoryDB:
+    """
+    SQLite history: one row per draw date, WAL mode so readers never block
+    the writer.
+
+    Reads borrow a connection from a small pool; writes are serialized on
+    one connection. Every upsert() bumps a generation counter, which lets
+    HistoryStore pick up new rows with an indexed query instead of a
+    reload. The rules used for the rank column are stored in the file.
+    """
+
+    def __init__(self, path: str | Path, rules: PowerballRules = PowerballRules(), pool_size: int = 4):
+        self.path = Path(path)
+        self.rules = rules
+        self._pool: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._pool_size = pool_size
+        self._opened = 0
+        self._pool_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._writer = self._connect()
+        with self._writer:
+            self._writer.executescript(_SCHEMA)
+            for key, value in (("generation", 0), ("white_count", rules.white_count),
+                               ("white_pool", rules.white_pool), ("red_pool", rules.red_pool)):
+                self._writer.execute("INSERT OR IGNORE INTO meta VALUES (?, ?)", (key, value))
+        stored = dict(self._writer.execute("SELECT key, value FROM meta"))
+        if (stored["white_count"], stored["white_pool"], stored["red_pool"]) != (
+                rules.white_count, rules.white_pool, rules.red_pool):
+            raise ValueError(f"{path} was built for different rules")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def _reader(self) -> Iterator[sqlite3.Connection]:
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            with self._pool_lock:
+                grow = self._opened < self._pool_size
+                if grow:
+                    self._opened += 1
+            conn = self._connect() if grow else self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+        self._writer.close()
+
+    # --- writes ---
+    def upsert(self, rows: Iterable[DrawRow]) -> int:
+        """Insert or replace draws by date in one transaction; returns rows written."""
+        params = []
+        for iso, whites, red, pp, url in rows:
+            whites = tuple(sorted(int(w) for w in whites))
+            red = int(red)
+            self.rules.validate(whites, red)
+            params.append((date.fromisoformat(iso).isoformat(), *whites, red, str(pp or ""), str(url or ""),
+                           rank_draw((whites, red), self.rules)))
+        if not params:
+            return 0
+        with self._write_lock, self._writer:
+            conn = self._writer
+            conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'generation'")
+            (gen,) = conn.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()
+            conn.executemany(
+                "INSERT INTO draws VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(date) DO UPDATE SET w1=excluded.w1, w2=excluded.w2, w3=excluded.w3, "
+                "w4=excluded.w4, w5=excluded.w5, powerball=excluded.powerball, "
+                "power_play=excluded.power_play, source_url=excluded.source_url, "
+                "rank=excluded.rank, seq=excluded.seq",
+                [p + (gen,) for p in params],
+            )
+        return len(params)
+
+    def import_csv(self, csv_path: str | Path) -> int:
+        """Upsert every dated row of a history CSV; returns rows written."""
+        rows: List[DrawRow] = []
+        with Path(csv_path).open("r", encoding="utf-8", newline="") as f:
+            for row in csv.reader(f):
+                if not row or not looks_like_iso_date(row[0]):
+                    continue
+                draw = parse_row(row, self.rules)
+                if draw is None:
+                    continue
+                pp = row[7].strip() if len(row) > 7 else ""
+                url = row[8].strip() if len(row) > 8 else ""
+                rows.append((row[0].strip(), draw[0], draw[1], pp, url))
+        return self.upsert(rows)
+
+    # --- reads ---
+    def generation(self) -> int:
+        with self._reader() as conn:
+            return conn.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()[0]
+
+    def __len__(self) -> int:
+        with self._reader() as conn:
+            return conn.execute("SELECT COUNT(*) FROM draws").fetchone()[0]
+
+    def __contains__(self, draw: PowerballDraw) -> bool:
+        return self.contains(draw)
+
+    def contains(self, draw: PowerballDraw) -> bool:
+        """Whether this combination has been drawn (index lookup on rank)."""
+        with self._reader() as conn:
+            return conn.execute("SELECT 1 FROM draws WHERE rank = ? LIMIT 1",
+                                (rank_draw(draw, self.rules),)).fetchone() is not None
+
+    @staticmethod
+    def _draw(row) -> Tuple[date, PowerballDraw]:
+        return date.fromisoformat(row[0]), Draw(row[1:6], row[6])
+
+    def get(self, day: date) -> Optional[PowerballDraw]:
+        with self._reader() as conn:
+            row = conn.execute("SELECT date, w1, w2, w3, w4, w5, powerball FROM draws WHERE date = ?",
+                               (day.isoformat(),)).fetchone()
+        return self._draw(row)[1] if row else None
+
+    def latest(self) -> Optional[Tuple[date, PowerballDraw]]:
+        with self._reader() as conn:
+            row = conn.execute("SELECT date, w1, w2, w3, w4, w5, powerball FROM draws "
+                               "ORDER BY date DESC LIMIT 1").fetchone()
+        return self._draw(row) if row else None
+
+    def range(self, start: date | None = None, end: date | None = None) -> List[Tuple[date, PowerballDraw]]:
+        """(date, draw) rows with start <= date <= end, oldest first."""
+        lo = start.isoformat() if start else ""
+        hi = end.isoformat() if end else "9999-12-31"
+        with self._reader() as conn:
+            rows = conn.execute("SELECT date, w1, w2, w3, w4, w5, powerball FROM draws "
+                                "WHERE date BETWEEN ? AND ? ORDER BY date", (lo, hi)).fetchall()
+        return [self._draw(r) for r in rows]
+
+    def ranks_since(self, generation: int) -> Tuple[int, int, List[Tuple[int, int]]]:
+        """
+        (current generation, total rows, [(date ordinal, rank), ...] for rows
+        written after `generation`), read in one snapshot, in date order.
+        """
+        with self._reader() as conn, conn:
+            conn.execute("BEGIN")
+            gen = conn.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()[0]
+            total = conn.execute("SELECT COUNT(*) FROM draws").fetchone()[0]
+            rows = conn.execute("SELECT date, rank FROM draws WHERE seq > ? ORDER BY date",
+                                (generation,)).fetchall()
+        return gen, total, [(date.fromisoformat(d).toordinal(), r) for d, r in rows]
+
+def is_db_path(path: str | Path) -> bool:
+    return Path(path).suffix.lower() in DB_SUFFIXES
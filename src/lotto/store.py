@@ -0,0 +1,205 @@
+from __future__ import annotations
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_left, insort
+from datetime import date
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+from .rules import PowerballRules, PowerballDraw
+from .history import DateIndex, HistoryTail, parse_row, iso_ordinal
+from .generate import total_space, rank_draw, unrank_draw, _nth_free
+from .sqlstore import HistoryDB, is_db_path
+from .binhist import load_history_fast
+
+class HistorySnapshot:
+    """
+    Immutable, compact view of a history file at one point in time.
+
+    Rows are kept as parallel arrays (date ordinal, draw rank) in file order,
+    plus the distinct ranks in sorted order. Snapshots can be passed straight
+    to the generators as `history`: they answer membership by bisection and
+    the free-space skip through select_free(). `dates` is a DateIndex
+    over the rows for lookups by draw date.
+    """
+
+    def __init__(self, rules: PowerballRules, version: int, ordinals: array, ranks: array, sorted_ranks: array,
+                 dates: DateIndex | None = None):
+        self.rules = rules
+        self.version = version
+        self.ordinals = ordinals      # date.toordinal() per row, 0 when the row has no ISO date
+        self.ranks = ranks            # rank_draw per row
+        self.sorted_ranks = sorted_ranks
+        self.dates = dates if dates is not None else DateIndex(ordinals, ranks, self._draw)
+
+    def _draw(self, rank: int) -> PowerballDraw:
+        return unrank_draw(rank, self.rules)
+
+    @property
+    def rows(self) -> int:
+        return len(self.ranks)
+
+    def __len__(self) -> int:
+        return len(self.sorted_ranks)
+
+    def __contains__(self, draw: PowerballDraw) -> bool:
+        rank = rank_draw(draw, self.rules)
+        i = bisect_left(self.sorted_ranks, rank)
+        return i < len(self.sorted_ranks) and self.sorted_ranks[i] == rank
+
+    def __iter__(self) -> Iterator[PowerballDraw]:
+        for rank in self.sorted_ranks:
+            yield unrank_draw(rank, self.rules)
+
+    def free_count(self) -> int:
+        return total_space(self.rules) - len(self.sorted_ranks)
+
+    def select_free(self, u: int) -> int:
+        return _nth_free(u, self.sorted_ranks)
+
+    def latest(self) -> Optional[Tuple[date, PowerballDraw]]:
+        """(date, draw) of the most recent dated row, or None."""
+        return self.dates.latest()
+
+class HistoryStore:
+    """
+    Parse-once, in-process cache of a history CSV.
+
+    snapshot() returns the current HistorySnapshot without touching the
+    file (unless `check_interval` seconds have passed since the last
+    check). refresh() reads the file through a HistoryTail: an unchanged
+    file costs one stat, an appended file only has its new rows parsed,
+    and anything else is reloaded in full. New snapshots are swapped in
+    atomically and carry an increasing version.
+
+    The first load of a CSV comes from its binary twin (see
+    lotto.binhist.load_history_fast; rebuilt when stale) when `binary` is
+    set; only rows appended after the twin was built are parsed. If the
+    twin cannot be written next to the CSV, the CSV is parsed as before.
+
+    A path ending in .db/.sqlite is opened as a HistoryDB instead: refresh()
+    then costs one query on the write generation, new rows are fetched by
+    index, and contains()/range() are answered by SQLite directly.
+    """
+
+    def __init__(self, path: str | Path, rules: PowerballRules = PowerballRules(), check_interval: float | None = None,
+                 binary: bool = True):
+        self.path = Path(path)
+        self.rules = rules
+        self.check_interval = check_interval
+        self.binary = binary
+        self._lock = threading.Lock()
+        self._stat: Optional[Tuple[int, int]] = None
+        self._tail = HistoryTail(self.path)
+        self.db = HistoryDB(self.path, rules) if is_db_path(self.path) else None
+        self._generation = 0
+        self._checked = 0.0
+        self._snapshot = HistorySnapshot(rules, 0, array("l"), array("q"), array("q"))
+        self.refresh()
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    def snapshot(self) -> HistorySnapshot:
+        if self.check_interval is not None and time.monotonic() - self._checked >= self.check_interval:
+            self.refresh()
+        return self._snapshot
+
+    def refresh(self) -> bool:
+        """Reload if the file changed; return True if a new snapshot was installed."""
+        with self._lock:
+            self._checked = time.monotonic()
+            if self.db is not None:
+                return self._refresh_db()
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                st = None
+            stat_key = (st.st_mtime_ns, st.st_size) if st is not None else None
+            if stat_key == self._stat:
+                return False
+            self._stat = stat_key
+            # first load from the binary twin, then parse whatever was appended after it was built
+            installed = self.binary and st is not None and self._tail.offset == 0 and self._load_binary()
+            rows, reset = self._tail.read()
+            if not rows and not reset:
+                return installed
+            ordinals, ranks = self._parse(rows)
+            return self._install(ordinals, ranks, append=not reset and self._snapshot.rows > 0)
+
+    def _refresh_db(self) -> bool:
+        if self.db.generation() == self._generation:
+            return False
+        gen, total, rows = self.db.ranks_since(self._generation)
+        append = self._generation > 0 and total == self._snapshot.rows + len(rows)
+        if not append:
+            gen, total, rows = self.db.ranks_since(0)  # rows were replaced, not only added
+        self._generation = gen
+        ordinals, ranks = array("l", (o for o, _ in rows)), array("q", (r for _, r in rows))
+        return self._install(ordinals, ranks, append=append)
+
+    # --- queries (indexed SQL for a database, the snapshot otherwise) ---
+    def contains(self, draw: PowerballDraw) -> bool:
+        """Whether this combination has been drawn."""
+        if self.db is not None:
+            return self.db.contains(draw)
+        return draw in self.snapshot()
+
+    def range(self, start: date | None = None, end: date | None = None) -> List[Tuple[date, PowerballDraw]]:
+        """(date, draw) rows with start <= date <= end, oldest first."""
+        if self.db is not None:
+            return self.db.range(start, end)
+        return self.snapshot().dates.range(start, end)
+
+    def _load_binary(self) -> bool:
+        """Install the rows of the CSV's binary twin; False if there is no usable twin."""
+        try:
+            hist = load_history_fast(self.path, self.rules)
+        except Exception:  # unwritable, truncated or corrupt twin: the CSV is parsed instead
+            return False
+        try:
+            wc = self.rules.white_count
+            whites = hist.whites
+            ranks = array("q", (rank_draw((tuple(whites[i * wc:(i + 1) * wc]), red), self.rules)
+                                for i, red in enumerate(hist.reds)))
+            ordinals = array("l", hist.ordinals)
+            if len(ordinals) != len(ranks):
+                return False
+        except Exception:
+            return False
+        finally:
+            hist.close()
+        if not self._tail.skip(hist.src_size):
+            return False  # the file no longer starts with the rows the twin holds
+        self._install(ordinals, ranks, append=False)
+        return True
+
+    def _parse(self, rows: List[List[str]]) -> Tuple[array, array]:
+        ordinals, ranks = array("l"), array("q")
+        for row in rows:
+            draw = parse_row(row, self.rules)
+            if draw is None:
+                continue
+            ordinals.append(iso_ordinal(row[0]))
+            ranks.append(rank_draw(draw, self.rules))
+        return ordinals, ranks
+
+    def _install(self, ordinals: array, ranks: array, append: bool) -> bool:
+        old = self._snapshot
+        if append:
+            all_ordinals = old.ordinals + ordinals
+            all_ranks = old.ranks + ranks
+            sorted_ranks = array("q", old.sorted_ranks)
+            for rank in ranks:
+                i = bisect_left(sorted_ranks, rank)
+                if i == len(sorted_ranks) or sorted_ranks[i] != rank:
+                    insort(sorted_ranks, rank)
+            dates = old.dates.extended(ordinals, ranks)
+        else:
+            all_ordinals, all_ranks = ordinals, ranks
+            sorted_ranks = array("q", sorted(set(ranks)))
+            dates = None
+        self._snapshot = HistorySnapshot(self.rules, old.version + 1, all_ordinals, all_ranks, sorted_ranks, dates)
+        return True
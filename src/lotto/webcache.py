@@ -0,0 +1,185 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterator, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# One entry per GET url (query string included), named by its sha256:
+#   <key>.json   url, status, reason, headers, stored_at, incomplete (optional)
+#   <key>.body   the response body as received
+# Both are written through a tmp file and os.replace, body first, so a
+# reader never sees metadata without its body.
+DEFAULT_FRESH_FOR = 3600.0
+# the stored body is already decoded and complete
+_UNCACHED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+class HTTPCache:
+    """
+    On-disk store of successful GET responses, keyed by the full URL.
+
+    An entry younger than `fresh_for` seconds is served as is.
+    `immutable(url, stored_at)` says whether a response stored at that time
+    (epoch seconds) can no longer change, e.g. a past draw's page fetched
+    after its results were posted; those are served at any age, unless the
+    caller found the body lacking and called mark_incomplete(). Older entries are
+    revalidated with If-None-Match / If-Modified-Since when the server gave
+    an ETag or Last-Modified. With `offline=True` the network is never used:
+    hits are served at any age and misses answer 504, as an only-if-cached
+    request would.
+    """
+
+    def __init__(self, path: str | Path, fresh_for: float = DEFAULT_FRESH_FOR,
+                 immutable: Callable[[str, float], bool] | None = None, offline: bool = False):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.fresh_for = fresh_for
+        self.immutable = immutable or (lambda url, stored_at: False)
+        self.offline = offline
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _files(self, url: str) -> Tuple[Path, Path]:
+        k = self.key(url)
+        return self.path / f"{k}.json", self.path / f"{k}.body"
+
+    def get(self, url: str) -> Optional[Tuple[dict, bytes]]:
+        """(metadata, body) stored for url, or None."""
+        meta_path, body_path = self._files(url)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            body = body_path.read_bytes()
+        except (FileNotFoundError, ValueError):
+            return None
+        if meta.get("url") != url:  # hash collision or a foreign file
+            return None
+        return meta, body
+
+    def put(self, url: str, status: int, reason: str, headers: dict, body: bytes, **extra) -> None:
+        meta = {"url": url, "status": status, "reason": reason,
+                "headers": dict(headers), "stored_at": time.time(), **extra}
+        self._write(url, meta, body)
+
+    def _write(self, url: str, meta: dict, body: bytes | None) -> None:
+        meta_path, body_path = self._files(url)
+        files = [(meta_path, json.dumps(meta).encode("utf-8"))]
+        if body is not None:
+            files.insert(0, (body_path, body))
+        for path, data in files:
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+
+    def mark_incomplete(self, url: str) -> None:
+        """
+        Never treat this entry as immutable: its body lacks content it should
+        have (e.g. a draw page fetched before the results were posted), so it
+        is revalidated like any other once `fresh_for` has passed.
+        """
+        hit = self.get(url)
+        if hit is not None and not hit[0].get("incomplete"):
+            self._write(url, dict(hit[0], incomplete=True), None)
+
+    def touch(self, url: str, headers: dict) -> None:
+        """Record a successful revalidation: the entry is fresh again."""
+        hit = self.get(url)
+        if hit is None:
+            return
+        meta, body = hit
+        merged = dict(meta["headers"])
+        merged.update({k: v for k, v in headers.items() if k.lower() in ("etag", "last-modified", "date")})
+        # a 304 confirms the same body, so an incomplete mark still applies
+        extra = {"incomplete": True} if meta.get("incomplete") else {}
+        self.put(url, meta["status"], meta["reason"], merged, body, **extra)
+
+    def is_fresh(self, url: str, meta: dict) -> bool:
+        if self.offline or time.time() - meta["stored_at"] < self.fresh_for:
+            return True
+        return not meta.get("incomplete") and self.immutable(url, meta["stored_at"])
+
+    def entries(self) -> Iterator[Tuple[str, bytes]]:
+        """(url, body) of every cached response, e.g. to replay a scrape's pages."""
+        for meta_path in sorted(self.path.glob("*.json")):
+            try:
+                url = json.loads(meta_path.read_text(encoding="utf-8"))["url"]
+                body = meta_path.with_suffix(".body").read_bytes()
+            except (FileNotFoundError, ValueError, KeyError):
+                continue
+            yield url, body
+
+class CachingAdapter(HTTPAdapter):
+    """
+    Transport adapter that answers GETs from an HTTPCache and stores 200
+    responses in it; mount it on a Session (see install_cache). Other
+    methods pass straight through. Served responses carry `from_cache`.
+    """
+
+    def __init__(self, cache: HTTPCache, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache
+
+    def send(self, request, **kwargs):
+        if request.method != "GET":
+            return super().send(request, **kwargs)
+        url = request.url
+        hit = self.cache.get(url)
+        if hit is not None and self.cache.is_fresh(url, hit[0]):
+            return self._from_cache(request, *hit)
+        if self.cache.offline:
+            return self._response(request, 504, "Not cached (offline)", {}, b"")
+        if hit is not None:
+            headers = CaseInsensitiveDict(hit[0]["headers"])
+            if "ETag" in headers:
+                request.headers["If-None-Match"] = headers["ETag"]
+            if "Last-Modified" in headers:
+                request.headers["If-Modified-Since"] = headers["Last-Modified"]
+        resp = super().send(request, **kwargs)
+        if resp.status_code == 304 and hit is not None:
+            self.cache.touch(url, resp.headers)
+            resp.close()
+            return self._from_cache(request, *hit)
+        if resp.status_code == 200:
+            body = resp.content  # reads the stream; the response stays usable
+            headers = {k: v for k, v in resp.headers.items() if k.lower() not in _UNCACHED_HEADERS}
+            self.cache.put(url, resp.status_code, resp.reason or "", headers, body)
+        resp.from_cache = False
+        return resp
+
+    def _from_cache(self, request, meta: dict, body: bytes) -> requests.Response:
+        return self._response(request, meta["status"], meta["reason"], meta["headers"], body, from_cache=True)
+
+    @staticmethod
+    def _response(request, status: int, reason: str, headers: dict, body: bytes,
+                  from_cache: bool = False) -> requests.Response:
+        resp = requests.Response()
+        resp.status_code = status
+        resp.reason = reason
+        resp.headers = CaseInsensitiveDict(headers)
+        resp._content = body
+        resp._content_consumed = True  # there is no raw stream to read or close
+        resp.encoding = get_encoding_from_headers(resp.headers)
+        resp.url = request.url
+        resp.request = request
+        resp.from_cache = from_cache
+        return resp
+
+def cache_of(session: requests.Session, url: str) -> Optional[HTTPCache]:
+    """The HTTPCache serving `url` on this session, if one is installed."""
+    adapter = session.get_adapter(url) if isinstance(session, requests.Session) else None
+    return adapter.cache if isinstance(adapter, CachingAdapter) else None
+
+def install_cache(session: requests.Session, cache: HTTPCache, **adapter_kwargs) -> requests.Session:
+    """Route the session's http(s) traffic through `cache`; returns the session."""
+    adapter = CachingAdapter(cache, **adapter_kwargs)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
@@ -0,0 +1,176 @@
+from __future__ import annotations
+import random
+from array import array
+from itertools import combinations
+from math import comb
+from typing import Iterable, List, Optional, Sequence, Tuple
+from .rules import PowerballRules, WhiteCombo, PowerballDraw, Draw
+
+class Coverage:
+    """
+    Incremental coverage of the t-subsets of a target number set.
+
+    Each t-subset has a multiplicity counter (how many tickets contain it),
+    updated as tickets are added or removed. A ticket is scored through the
+    counters of its C(white_count, t) subset keys, so neither adding a
+    ticket nor evaluating a candidate rescans the ticket set.
+    """
+
+    def __init__(self, numbers: Sequence[int], t: int):
+        self.numbers = tuple(sorted(set(numbers)))
+        if not 1 <= t <= len(self.numbers):
+            raise ValueError("Coverage size t must be between 1 and the number of target numbers")
+        self.t = t
+        self.size = comb(len(self.numbers), t)
+        self._pos = {n: i for i, n in enumerate(self.numbers)}
+        self._binom = [[comb(n, k) for n in range(len(self.numbers) + 1)] for k in range(t + 1)]
+        # direct subset -> index lookup for the usual pair/triple/quad sizes
+        self._index = None
+        if self.size <= _INDEX_LIMIT:
+            nums, binom = self.numbers, self._binom
+            self._index = {
+                tuple(nums[p] for p in sub): self._rank(sub, binom)
+                for sub in combinations(range(len(nums)), t)
+            }
+        self._counts = array("I", bytes(4 * self.size))
+        self.covered_count = 0
+
+    @staticmethod
+    def _rank(sub: Tuple[int, ...], binom) -> int:
+        return sum(binom[i + 1][p] for i, p in enumerate(sub))
+
+    def keys(self, whites: Iterable[int]) -> List[int]:
+        """Indices of the target t-subsets contained in a ticket (whites sorted)."""
+        index = self._index
+        if index is not None:
+            return [index[sub] for sub in combinations([w for w in whites if w in self._pos], self.t)]
+        binom = self._binom
+        pos = [self._pos[w] for w in whites if w in self._pos]
+        return [self._rank(sub, binom) for sub in combinations(pos, self.t)]
+
+    def gain(self, keys: List[int]) -> int:
+        """Number of subsets in `keys` not yet covered."""
+        counts = self._counts
+        return sum(1 for i in keys if not counts[i])
+
+    def loss(self, keys: List[int]) -> int:
+        """Number of subsets in `keys` covered only once (lost if that ticket goes)."""
+        counts = self._counts
+        return sum(1 for i in keys if counts[i] == 1)
+
+    def add(self, keys: List[int]) -> None:
+        counts = self._counts
+        for i in keys:
+            if not counts[i]:
+                self.covered_count += 1
+            counts[i] += 1
+
+    def remove(self, keys: List[int]) -> None:
+        counts = self._counts
+        for i in keys:
+            counts[i] -= 1
+            if not counts[i]:
+                self.covered_count -= 1
+
+    def uncovered(self, rng: random.Random) -> Optional[Tuple[int, ...]]:
+        """An uncovered t-subset of numbers (the first at or after a random start), or None."""
+        if self.covered_count == self.size:
+            return None
+        counts = self._counts
+        i = rng.randrange(self.size)
+        while counts[i]:
+            i = i + 1 if i + 1 < self.size else 0
+        return self._unrank(i)
+
+    def _unrank(self, index: int) -> Tuple[int, ...]:
+        out: List[int] = []
+        hi = len(self.numbers)
+        for k in range(self.t, 0, -1):
+            n = hi - 1
+            while self._binom[k][n] > index:
+                n -= 1
+            out.append(self.numbers[n])
+            index -= self._binom[k][n]
+            hi = n
+        return tuple(reversed(out))
+
+    def fraction(self) -> float:
+        return self.covered_count / self.size
+
+_INDEX_LIMIT = 1_000_000
+
+def _candidate(rng: random.Random, numbers: Sequence[int], k: int, seed_subset: Tuple[int, ...] = ()) -> WhiteCombo:
+    if not seed_subset:
+        return tuple(sorted(rng.sample(numbers, k)))
+    rest = [n for n in numbers if n not in seed_subset]
+    return tuple(sorted(seed_subset + tuple(rng.sample(rest, k - len(seed_subset)))))
+
+def design_wheel(
+    count: int | None,
+    rules: PowerballRules = PowerballRules(),
+    t: int = 2,
+    numbers: Sequence[int] | None = None,
+    seed: int | None = None,
+    candidates: int = 8,
+    passes: int = 1,
+) -> List[PowerballDraw]:
+    """
+    Build a ticket set maximizing coverage of the t-subsets of `numbers`
+    (default: the whole white pool).
+
+    Tickets are added greedily: each step scores `candidates` random tickets
+    plus one built around a random uncovered subset and keeps the best.
+    Then `passes` rounds of local search try to swap each ticket for a
+    better candidate. With count=None tickets are added until every
+    t-subset is covered, i.e. whenever t of `numbers` are drawn some ticket
+    holds all t of them.
+
+    Reds are dealt round-robin over a shuffled red pool. Returns
+    (whites, red) draws, as generate_unique does.
+    """
+    rng = random.Random(seed)
+    numbers = tuple(sorted(set(numbers))) if numbers is not None else tuple(range(1, rules.white_pool + 1))
+    k = rules.white_count
+    if len(numbers) < k:
+        raise ValueError(f"Need at least {k} numbers to build tickets")
+    if not all(1 <= n <= rules.white_pool for n in numbers):
+        raise ValueError(f"White ball out of range (1-{rules.white_pool})")
+    if t > k:
+        raise ValueError(f"Coverage size t cannot exceed {k}")
+    cov = Coverage(numbers, t)
+
+    def best_candidate() -> Tuple[WhiteCombo, List[int], int]:
+        pool = [_candidate(rng, numbers, k) for _ in range(candidates)]
+        target = cov.uncovered(rng)
+        if target is not None:
+            pool.append(_candidate(rng, numbers, k, target))
+        best = None
+        for whites in pool:
+            keys = cov.keys(whites)
+            g = cov.gain(keys)
+            if best is None or g > best[2]:
+                best = (whites, keys, g)
+        return best
+
+    tickets: List[WhiteCombo] = []
+    ticket_keys: List[List[int]] = []
+    while (count is None and cov.covered_count < cov.size) or (count is not None and len(tickets) < count):
+        whites, keys, _ = best_candidate()
+        cov.add(keys)
+        tickets.append(whites)
+        ticket_keys.append(keys)
+
+    for _ in range(passes):
+        if cov.covered_count == cov.size:
+            break
+        for i in range(len(tickets)):
+            lost = cov.loss(ticket_keys[i])
+            cov.remove(ticket_keys[i])
+            whites, keys, g = best_candidate()
+            if g > lost:
+                tickets[i], ticket_keys[i] = whites, keys
+            cov.add(ticket_keys[i])
+
+    reds = list(range(1, rules.red_pool + 1))
+    rng.shuffle(reds)
+    return [Draw(whites, reds[i % len(reds)]) for i, whites in enumerate(tickets)]
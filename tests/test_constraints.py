@@ -0,0 +1,49 @@
+from itertools import combinations
+import pytest
+from lotto.rules import PowerballRules, Draw
+from lotto.constraints import DrawConstraints, ConstrainedSpace
+from lotto.generate import constrained_space, generate_constrained, total_space
+
+RULES = PowerballRules(white_count=3, white_pool=10, red_pool=3)
+
+def _brute(c: DrawConstraints):
+    low_max = c.low_max if c.low_max is not None else RULES.white_pool // 2
+    out = []
+    for whites in combinations(range(1, RULES.white_pool + 1), RULES.white_count):
+        s = sum(whites)
+        if c.min_sum is not None and s < c.min_sum: continue
+        if c.max_sum is not None and s > c.max_sum: continue
+        if c.odd_counts is not None and sum(w & 1 for w in whites) not in c.odd_counts: continue
+        if c.low_counts is not None and sum(w <= low_max for w in whites) not in c.low_counts: continue
+        if c.exclude & set(whites) or not c.include <= set(whites): continue
+        for red in sorted(c.reds or range(1, RULES.red_pool + 1)):
+            out.append(Draw(whites, red))
+    return out
+
+@pytest.mark.parametrize("c", [
+    DrawConstraints(),
+    DrawConstraints(min_sum=12, max_sum=18),
+    DrawConstraints(odd_counts={1}, low_counts={2}),
+    DrawConstraints(include={4}, exclude={7, 8}, reds={2}),
+    DrawConstraints(min_sum=25, include={9}, odd_counts={0, 3}),
+])
+def test_space_matches_brute_force(c):
+    expected = _brute(c)
+    space = ConstrainedSpace(RULES, c)
+    assert space.size == len(expected) == constrained_space(RULES, c)
+    listed = [space.unrank(i) for i in range(space.size)]
+    assert sorted(listed) == expected
+    assert all(space.rank(d) == i and d in space for i, d in enumerate(listed))
+
+def test_unconstrained_space_is_total_space():
+    rules = PowerballRules()
+    assert constrained_space(rules, DrawConstraints()) == total_space(rules)
+
+def test_generate_constrained_exhausts_tight_space():
+    c = DrawConstraints(min_sum=24, include={10})
+    expected = set(_brute(c))
+    history = set(list(expected)[:2])
+    picks = generate_constrained(history, RULES, c, count=len(expected) - 2, seed=1)
+    assert set(picks) == expected - history
+    with pytest.raises(RuntimeError):
+        generate_constrained(history, RULES, c, count=len(expected), seed=1)
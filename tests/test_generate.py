@@ -0,0 +1,190 @@
+from itertools import combinations
+from lotto.rules import PowerballRules, Draw
+from lotto.generate import (
+    generate_unique, rank_draw, unrank_draw, total_space,
+)
+
+SMALL = PowerballRules(white_count=3, white_pool=7, red_pool=2)
+
+def test_rank_unrank_roundtrip_small():
+    ranks = set()
+    for whites in combinations(range(1, SMALL.white_pool + 1), SMALL.white_count):
+        for red in range(1, SMALL.red_pool + 1):
+            r = rank_draw((whites, red), SMALL)
+            assert unrank_draw(r, SMALL) == Draw(whites, red)
+            ranks.add(r)
+    assert ranks == set(range(total_space(SMALL)))
+
+def test_rank_bounds_full_rules():
+    rules = PowerballRules()
+    assert rank_draw(((1, 2, 3, 4, 5), 1), rules) == 0
+    assert rank_draw(((65, 66, 67, 68, 69), 26), rules) == total_space(rules) - 1
+
+def test_generate_unique_exhausts_remaining_space():
+    universe = [unrank_draw(i, SMALL) for i in range(total_space(SMALL))]
+    history = set(universe[::3])
+    picks = generate_unique(history, SMALL, count=total_space(SMALL) - len(history), seed=7)
+    assert set(picks) == set(universe) - history
+    assert len(set(picks)) == len(picks)
+
+def test_generate_unique_rejects_while_coverage_is_low(monkeypatch):
+    from lotto import generate
+    from lotto.bitmap import DrawBitmap
+    from lotto.rules import DrawSet
+    universe = [unrank_draw(i, SMALL) for i in range(total_space(SMALL))]
+    history = DrawSet(universe[::5])
+    count = total_space(SMALL) // 2 - len(history)
+
+    def no_free_space(*args):
+        raise AssertionError("low coverage must not build the free-space select")
+    with monkeypatch.context() as m:
+        m.setattr(generate, "_free_space", no_free_space)
+        picks = generate_unique(history, SMALL, count=count, seed=4)
+        assert len(set(picks)) == count and not history & set(picks)
+        for same in ({(d.whites, d.red) for d in history}, frozenset(history), DrawBitmap.from_draws(history, SMALL)):
+            assert generate_unique(same, SMALL, count=count, seed=4) == picks
+
+    # one more pick crosses the threshold and goes through the free-space select
+    picks = generate_unique(history, SMALL, count=count + 1, seed=4)
+    assert len(set(picks)) == count + 1 and not history & set(picks)
+
+def test_generate_unique_accepts_bitmap(tmp_path):
+    from lotto.bitmap import DrawBitmap
+    universe = [unrank_draw(i, SMALL) for i in range(total_space(SMALL))]
+    history = set(universe[1::2])
+    bm = DrawBitmap.from_draws(history, SMALL)
+    assert len(bm) == len(history) and universe[1] in bm and universe[0] not in bm
+
+    path = tmp_path / "hist.bm"
+    bm.save(path)
+    loaded = DrawBitmap.load(path)
+    assert len(loaded) == len(history) and list(loaded) == sorted(history, key=lambda d: rank_draw(d, SMALL))
+
+    picks = generate_unique(loaded, SMALL, count=total_space(SMALL) - len(history), seed=3)
+    assert set(picks) == set(universe) - history
+
+def test_generate_unique_bulk_matches_rules(monkeypatch):
+    import pytest
+    np = pytest.importorskip("numpy")
+    from lotto import generate
+    from lotto.bitmap import DrawBitmap
+    from lotto.generate import generate_unique_bulk
+    universe = [unrank_draw(i, SMALL) for i in range(total_space(SMALL))]
+    history = set(universe[::2])
+    arr = generate_unique_bulk(history, SMALL, count=total_space(SMALL) - len(history), seed=5)
+    assert arr.shape == (len(universe) - len(history), SMALL.white_count + 1)
+    got = {Draw([int(x) for x in row[:-1]], int(row[-1])) for row in arr}
+    assert got == set(universe) - history
+    # a nearly full history: rounds stay capped and still finish
+    monkeypatch.setattr(generate, "_BULK_MAX_BATCH", 16)
+    bm = DrawBitmap.from_draws(universe[1:], SMALL)
+    arr = generate_unique_bulk(bm, SMALL, count=1, seed=5)
+    assert Draw([int(x) for x in arr[0][:-1]], int(arr[0][-1])) == universe[0]
+
+def test_draw_permutation_is_bijection():
+    from lotto.generate import DrawPermutation
+    for size in (1, 2, 5, 17, 1000):
+        perm = DrawPermutation(size, seed=42)
+        assert sorted(perm[k] for k in range(size)) == list(range(size))
+    assert [DrawPermutation(1000, 1)[k] for k in range(5)] != [DrawPermutation(1000, 2)[k] for k in range(5)]
+
+def test_pick_sequence_is_seekable_and_skips_history():
+    from lotto.generate import PickSequence
+    universe = [unrank_draw(i, SMALL) for i in range(total_space(SMALL))]
+    history = set(universe[::4])
+    seq = PickSequence(history, SMALL, seed=9)
+    picks = list(seq.iter_from())
+    assert set(picks) == set(universe) - history and len(picks) == len(seq)
+    assert PickSequence(history, SMALL, seed=9)[7] == picks[7]
+    assert list(seq.iter_from(3, 6)) == picks[3:6]
+
+def test_iter_unique_is_lazy_and_reproducible():
+    from itertools import islice
+    from lotto.generate import iter_unique
+    rules = PowerballRules()
+    # the picks this seed makes with no history, so skipping them is observable
+    history = set(islice(iter_unique(set(), rules, seed=11), 5))
+    first = list(islice(iter_unique(history, rules, seed=11), 50))
+    assert len(set(first)) == 50 and not history & set(first)
+    assert list(islice(iter_unique(history, rules, seed=11, start=10), 5)) == first[10:15]
+
+def test_generate_unique_parallel_independent_of_jobs():
+    from lotto.generate import generate_unique_parallel
+    rules = PowerballRules()
+    history = set(generate_unique(set(), rules, count=5, seed=3))
+    one = generate_unique_parallel(history, rules, count=40, seed=3, jobs=1)
+    two = generate_unique_parallel(history, rules, count=40, seed=3, jobs=2, chunk_size=7)
+    assert one == two and len(set(one)) == 40 and not history & set(one)
+
+def test_draw_generator_instances_are_independent():
+    import random
+    from lotto.generate import DrawGenerator
+    rules = PowerballRules()
+    a = DrawGenerator(rules, seed=5)
+    b = DrawGenerator(rules, seed=5)
+    random.seed(0)  # the global RNG must not influence instances
+    assert a.unique(set(), 10) == b.unique(set(), 10) == generate_unique(set(), rules, count=10, seed=5)
+
+def test_overlap_mode_avoids_shared_whites():
+    from lotto.overlap import OverlapIndex
+    rules = PowerballRules(white_count=3, white_pool=9, red_pool=2)
+    history = {Draw((1, 2, 3), 1), Draw((4, 5, 6), 2)}
+    picks = generate_unique(history, rules, count=5, seed=2, overlap_k=2)
+    for whites, _ in picks:
+        assert all(len(set(whites) & set(h)) < 2 for h, _ in history)
+    index = OverlapIndex(history, 2, ignore_red=False)
+    assert index.conflicts(((1, 2, 9), 1)) and not index.conflicts(((1, 2, 9), 2))
+
+def test_overlap_mode_fails_fast_when_unsatisfiable():
+    import pytest
+    from lotto.overlap import OverlapIndex
+    rules = PowerballRules(white_count=3, white_pool=9, red_pool=2)
+    # every white has been drawn, so k=1 admits nothing; k=2 still does
+    history = {Draw((1, 2, 3), 1), Draw((4, 5, 6), 2), Draw((7, 8, 9), 1)}
+    assert OverlapIndex(history, 1).admits(rules) is False
+    assert OverlapIndex(history, 2).admits(rules) is True
+    assert OverlapIndex(history, 1, ignore_red=False).admits(rules) is True
+    with pytest.raises(RuntimeError, match="No draw avoids"):
+        generate_unique(history, rules, count=1, seed=1, overlap_k=1, max_tries_per_pick=10**9)
+    with pytest.raises(ValueError):
+        generate_unique(history, rules, count=1, seed=1, overlap_k=4)
+
+def test_pick_ledger_excludes_and_persists(tmp_path):
+    from lotto.ledger import PickLedger
+    r = PowerballRules(white_count=2, white_pool=6, red_pool=2)  # 30 draws
+    history = {Draw((1, 2), 1), Draw((3, 4), 2)}
+    ledger = PickLedger(tmp_path / "picks", r, compact_at=3)
+    seen = set()
+    for i in range(6):
+        picks = generate_unique(history, r, count=4, seed=i, exclude=ledger)
+        assert not seen & set(picks) and not history & set(picks)
+        assert ledger.add(picks) == 4
+        seen |= set(picks)
+    assert len(ledger) == 24
+
+    reopened = PickLedger(tmp_path / "picks", r)
+    assert len(reopened) == 24 and all(d in reopened for d in seen)
+    assert set(generate_unique(history, r, count=4, seed=0, exclude=reopened)) == \
+        {unrank_draw(x, r) for x in range(30)} - seen - history
+
+def test_draw_packs_unpacks_and_orders_like_tuples():
+    import pickle
+    d = Draw((23, 4, 16, 8, 15), 26)
+    whites, red = d
+    assert (whites, red) == ((4, 8, 15, 16, 23), 26) and d[0] == whites and d.red == 26
+    assert hash(d) == hash(d.code) and Draw.from_code(d.code) == d
+    # documented break: a Draw never equals its tuple form, so tuple lookups miss
+    assert d != ((4, 8, 15, 16, 23), 26) and ((4, 8, 15, 16, 23), 26) not in {d}
+    assert Draw(*((4, 8, 15, 16, 23), 26)) in {d}
+    assert pickle.loads(pickle.dumps(d)) == d and type(pickle.loads(pickle.dumps(d))) is Draw
+    universe = [unrank_draw(i, SMALL) for i in range(total_space(SMALL))]
+    assert sorted(universe) == sorted(universe, key=tuple)
+
+def test_draw_array_codec_matches_scalar():
+    import pytest
+    np = pytest.importorskip("numpy")
+    from lotto.rules import pack_draws_array, unpack_draws_array
+    rows = np.array([[1, 2, 3, 4, 5, 1], [65, 66, 67, 68, 69, 26]], dtype=np.uint8)
+    codes = pack_draws_array(rows)
+    assert codes.tolist() == [Draw((1, 2, 3, 4, 5), 1), Draw((65, 66, 67, 68, 69), 26)]
+    assert (unpack_draws_array(codes) == rows).all()
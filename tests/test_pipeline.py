@@ -1,8 +1,16 @@
 from pathlib import Path
-from lotto.rules import PowerballRules
+from lotto.rules import PowerballRules, Draw
 from lotto.history import load_history_csv
 from lotto.generate import generate_unique
 
+def _load_script(name: str):
+    """Import scripts/<name>.py as a module."""
+    import importlib.util
+    spec = importlib.util.spec_from_file_location(name, Path(__file__).resolve().parents[1] / "scripts" / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
 def test_end_to_end_smoke(tmp_path: Path):
     # minimal fake sample that matches scraper format
     p = tmp_path / "mini.csv"
@@ -20,4 +28,310 @@ def test_end_to_end_smoke(tmp_path: Path):
     for whites, red in picks:
         assert len(whites) == 5
         assert all(1 <= w <= 69 for w in whites)
-        assert 1 <= red <= 26
\ No newline at end of file
+        assert 1 <= red <= 26
+
+def test_strict_loader_matches_heuristic(tmp_path: Path):
+    p = tmp_path / "hist.csv"
+    p.write_text(
+        "date,w1,w2,w3,w4,w5,powerball,power_play,source_url\n"
+        "1992-04-22,23,8,15,16,4,26,,https://example\n"
+        "\n"
+        "1992-04-25,5,7,19,22,44,12,2,https://example\n"
+        "1992-04-29,5,7,19,22,99,12,,https://example\n",  # out of range: dropped
+        encoding="utf-8"
+    )
+    rules = PowerballRules()
+    fast = load_history_csv(p, rules, strict=True)
+    assert fast == load_history_csv(p, rules, strict=False)
+    assert fast == {Draw((4, 8, 15, 16, 23), 26), Draw((5, 7, 19, 22, 44), 12)}
+
+    q = tmp_path / "plain.txt"
+    q.write_text("4 8 15 16 23 26\n", encoding="utf-8")
+    assert load_history_csv(q, rules) == {Draw((4, 8, 15, 16, 23), 26)}
+    try:
+        load_history_csv(q, rules, strict=True)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("strict=True should require the scraper header")
+
+
+def test_sorted_view_merges_new_rows_at_head(tmp_path: Path):
+    from lotto.history import update_sorted_view
+    src = tmp_path / "full.csv"
+    out = tmp_path / "full_sorted.csv"
+    header = "date,w1,w2,w3,w4,w5,powerball,power_play,source_url\n"
+    src.write_text(header + "2024-01-01,1,2,3,4,5,6,,u\n2024-01-03,7,8,9,10,11,12,,u\n", encoding="utf-8")
+    assert update_sorted_view(src, out) == 2
+    built = out.stat().st_mtime_ns
+    assert update_sorted_view(src, out) == 0 and out.stat().st_mtime_ns == built  # unchanged: not rewritten
+
+    with src.open("a", encoding="utf-8") as f:
+        f.write("2024-01-06,1,2,3,4,6,7,,u\n2024-01-08,1,2,3,4,7,8,,u\n")
+    assert update_sorted_view(src, out) == 2
+    dates = [line.split(",")[0] for line in out.read_text(encoding="utf-8").splitlines()[1:]]
+    assert dates == ["2024-01-08", "2024-01-06", "2024-01-03", "2024-01-01"]
+
+    # a back-filled older row cannot be merged at the head: full rebuild
+    with src.open("a", encoding="utf-8") as f:
+        f.write("2024-01-02,1,2,3,4,8,9,,u\n")
+    assert update_sorted_view(src, out) == 5
+    dates = [line.split(",")[0] for line in out.read_text(encoding="utf-8").splitlines()[1:]]
+    assert dates == sorted(dates, reverse=True) and len(dates) == 5
+
+    # a view without its sidecar state (or a rewritten source) is rebuilt, not trusted
+    (tmp_path / "full_sorted.csv.state").unlink()
+    assert update_sorted_view(src, out) == 5
+    src.write_text(header + "2024-02-01,1,2,3,4,5,6,,u\n", encoding="utf-8")
+    assert update_sorted_view(src, out) == 1
+    assert out.read_text(encoding="utf-8").splitlines()[1:] == ["2024-02-01,1,2,3,4,5,6,,u"]
+
+
+def test_run_batch_keeps_order_and_reports_bad_specs():
+    import io
+    import json
+    pb_unique = _load_script("pb_unique")
+    rules = PowerballRules()
+    history = {Draw((1, 2, 3, 4, 5), 1)}
+    specs = [
+        {"id": "a", "seed": 1, "count": 3},
+        '{"id": "huge", "count": 1e400}',                    # OverflowError, not a crash
+        {"id": "red", "count": 2, "max_overlap": 3, "overlap_with_red": "false"},
+        "not json",
+        {"id": "b", "seed": 2, "count": 2, "max_overlap": 3, "overlap_with_red": False},
+        {"id": "k", "count": 1, "max_overlap": 9},
+        {"id": "c", "seed": 3, "count": 1},
+    ]
+    lines = "\n".join(s if isinstance(s, str) else json.dumps(s) for s in specs)
+    out = io.StringIO()
+    failed = pb_unique.run_batch(io.StringIO(lines), out, history, rules, threads=3)
+    recs = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [r["line"] for r in recs] == list(range(1, 8)) and failed == 4
+    assert [r["id"] for r in recs] == ["a", "huge", "red", None, "b", "k", "c"]
+    assert [("error" in r) for r in recs] == [False, True, True, True, False, True, False]
+    assert "overlap_with_red" in recs[2]["error"] and "max_overlap" in recs[5]["error"]
+    assert [len(r.get("picks", [])) for r in recs] == [3, 0, 0, 0, 2, 0, 1]
+    serial = io.StringIO()
+    assert pb_unique.run_batch(io.StringIO(lines), serial, history, rules, threads=1) == 4
+    assert serial.getvalue() == out.getvalue()
+
+def test_http_cache_revalidates_and_replays_offline(tmp_path: Path, monkeypatch):
+    import requests
+    from requests.adapters import HTTPAdapter
+    from lotto.webcache import HTTPCache, install_cache
+
+    sent = []
+
+    def fake_send(self, request, **kwargs):
+        sent.append(dict(request.headers))
+        resp = requests.Response()
+        resp.url, resp.request = request.url, request
+        resp._content_consumed = True
+        if request.headers.get("If-None-Match") == '"v1"':
+            resp.status_code = 304
+            resp._content = b""
+        else:
+            resp.status_code = 200
+            resp.headers["ETag"] = '"v1"'
+            resp._content = b"<html>cards</html>"
+        return resp
+
+    monkeypatch.setattr(HTTPAdapter, "send", fake_send)
+    url = "https://example.test/previous-results"
+    cache = HTTPCache(tmp_path / "cache", fresh_for=0)
+    s = install_cache(requests.Session(), cache)
+    first = s.get(url, params={"sd": "2020-01-01"})
+    assert first.text == "<html>cards</html>" and not first.from_cache
+    # stale (fresh_for=0): revalidated with the ETag, body comes from disk
+    again = s.get(url, params={"sd": "2020-01-01"})
+    assert again.from_cache and again.text == "<html>cards</html>"
+    assert sent[-1]["If-None-Match"] == '"v1"' and len(sent) == 2
+
+    # immutable pages are served without asking the server
+    cache.immutable = lambda u, stored_at: True
+    assert s.get(url, params={"sd": "2020-01-01"}).from_cache and len(sent) == 2
+
+    offline = install_cache(requests.Session(), HTTPCache(tmp_path / "cache", offline=True))
+    assert offline.get(url, params={"sd": "2020-01-01"}).text == "<html>cards</html>"
+    assert offline.get(url, params={"sd": "1999-01-01"}).status_code == 504
+    assert len(sent) == 2
+    assert [u for u, _ in cache.entries()] == [url + "?sd=2020-01-01"]
+
+
+def test_settled_pages_pin_only_when_fetched_late_and_complete(tmp_path: Path, monkeypatch):
+    import time
+    from datetime import date, datetime, timedelta
+    import requests
+    from requests.adapters import HTTPAdapter
+    from lotto.webcache import install_cache
+
+    scraper = _load_script("scrape_powerball_official")
+
+    ed = date(2025, 8, 27)
+    url = f"{scraper.PREV_RESULTS_URL}?gc=powerball&sd=2025-08-20&ed={ed.isoformat()}"
+    day = lambda d: datetime(d.year, d.month, d.day, 12).timestamp()
+    # judged by when the page was stored, not by how old its draws are today
+    assert not scraper.is_settled_page(url, day(ed))
+    assert scraper.is_settled_page(url, day(ed + timedelta(days=scraper.SETTLED_DAYS)))
+
+    sent = []
+
+    def fake_send(self, request, **kwargs):
+        sent.append(request.url)
+        resp = requests.Response()
+        resp.url, resp.request = request.url, request
+        resp._content_consumed = True
+        resp.status_code = 200
+        resp._content = b"<html><p>No results yet</p></html>"
+        return resp
+
+    monkeypatch.setattr(HTTPAdapter, "send", fake_send)
+    cache = scraper.open_cache(tmp_path / "cache", offline=False, fresh_for=0)
+    s = install_cache(requests.Session(), cache)
+    assert scraper.fetch_previous_results_range(date(2025, 8, 20), ed, s) == {}
+    meta, _ = cache.get(sent[0])
+    assert meta["incomplete"]
+    # even when stored long after ed, a page without the draws it should list is refetched
+    meta["stored_at"] = time.time() - 30 * 86400
+    assert not cache.is_fresh(sent[0], meta)
+    scraper.fetch_previous_results_range(date(2025, 8, 20), ed, s)
+    assert len(sent) == 2
+
+
+def test_fetch_window_pages_ranges_and_fetches_only_gaps_per_date(monkeypatch):
+    from datetime import date
+    from lotto.schedule import scheduled_dates
+    scraper = _load_script("scrape_powerball_official")
+    draws = list(scheduled_dates(date(2024, 1, 1), date(2024, 12, 31)))
+    gap, today = draws[50], draws[-1]
+    requests_made = []
+
+    def fake_range(sd, ed, session=None):
+        # like the site: newest cards first, 10 per page; `gap` is absent from
+        # listings but shown on its own page; today's draw is not posted yet
+        requests_made.append((sd, ed))
+        cards = [d for d in reversed(draws) if sd <= d <= ed and d != today and (d != gap or sd == ed)]
+        return {d: (d.isoformat(), [1, 2, 3, 4, 5], 6, "", "u") for d in cards[:10]}
+
+    per_date = []
+
+    def fake_one(d, session=None):
+        per_date.append(d)
+        return fake_range(d, d).get(d)
+
+    class Bucket:
+        taken = 0
+        def acquire(self):
+            Bucket.taken += 1
+
+    monkeypatch.setattr(scraper, "fetch_previous_results_range", fake_range)
+    monkeypatch.setattr(scraper, "fetch_from_previous_results", fake_one)
+
+    def run(dates):
+        requests_made.clear()
+        per_date.clear()
+        Bucket.taken = 0
+        windows = scraper.date_windows(dates)
+        got = sum((scraper.fetch_window(w, None, Bucket()) for w in windows), [])
+        # every request but each window's first takes its own token
+        assert [d for d, _ in got] == dates and Bucket.taken == len(requests_made) - len(windows)
+        return dict(got), len(requests_made), len(per_date)
+
+    windows = scraper.date_windows(draws)
+    assert all((w[-1] - w[0]).days < scraper.WINDOW_DAYS for w in windows) and sum(windows, []) == draws
+    pages = sum(-(-len(w) // 10) for w in scraper.date_windows(draws[:-1]))
+
+    clean = [d for d in draws[:-1] if d != gap]
+    got, n, single = run(clean)
+    assert all(got.values()) and n == pages and single == 0
+    # an interior gap costs one request for its own date, not a per-date walk of the window
+    got, n, single = run(draws[:-1])
+    assert all(got.values()) and n <= pages + 1 and single <= 1
+    # today's unposted draw at the top of a page: asked once, then given up on
+    got, n, single = run(draws)
+    assert got[today] is None and all(v for d, v in got.items() if d != today)
+    assert n <= pages + 2 and single <= 2
+
+def test_fetch_in_order_keeps_order_and_bounds_work_in_flight():
+    import random
+    import threading
+    import time
+    scraper = _load_script("scrape_powerball_official")
+    workers, items = 3, list(range(40))
+    rng = random.Random(7)
+    delays = {i: rng.uniform(0, 0.01) for i in items}
+    lock = threading.Lock()
+    state = {"started": 0, "running": 0, "max_running": 0, "yielded": 0, "max_ahead": 0}
+
+    def fetch(i):
+        with lock:
+            state["started"] += 1
+            state["running"] += 1
+            state["max_running"] = max(state["max_running"], state["running"])
+            state["max_ahead"] = max(state["max_ahead"], state["started"] - state["yielded"])
+        time.sleep(delays[i])
+        with lock:
+            state["running"] -= 1
+        return i * i
+
+    out = []
+    for item, result in scraper.fetch_in_order(items, fetch, workers=workers, rate=1e6):
+        out.append((item, result))
+        with lock:
+            state["yielded"] += 1
+    assert out == [(i, i * i) for i in items]
+    assert state["max_running"] <= workers
+    # started but not yet handed out: requests in flight plus the reorder buffer
+    assert state["max_ahead"] <= 2 * workers
+
+def test_token_bucket_holds_rate_across_threads():
+    import threading
+    import time
+    scraper = _load_script("scrape_powerball_official")
+    rate, burst, per_thread = 200.0, 4, 10
+    bucket = scraper.TokenBucket(rate, burst=burst)
+    stamps = []
+    lock = threading.Lock()
+
+    def take():
+        for _ in range(per_thread):
+            bucket.acquire()
+            with lock:
+                stamps.append(time.monotonic())
+
+    t0 = time.monotonic()
+    threads = [threading.Thread(target=take) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    n = 4 * per_thread
+    # after the initial burst, tokens arrive at `rate`: no window of time sees more
+    stamps.sort()
+    assert stamps[-1] - t0 >= (n - burst) / rate * 0.95
+    for i in range(burst, n):
+        assert stamps[i] - t0 >= (i + 1 - burst) / rate * 0.95
+    assert stamps[-1] - t0 < (n - burst) / rate * 3 + 0.5
+
+
+def test_parse_results_page_cards_and_text_fallback():
+    from datetime import date
+    from lotto.parse import parse_results_page, parse_draw_page
+    card = (
+        "<a class='card'><h5 class='card-title'>Wed, Aug 27, 2025</h5>"
+        + "".join(f"<div class='col white-balls item-powerball'>{w}</div>" for w in (62, 3, 16, 21, 50))
+        + "<div class='col powerball item-powerball'>8</div><span class='multiplier'>2x</span></a>"
+    )
+    page = f"<html><head><script>Mon, Jan 1, 2024 1 2 3 4 5 6</script></head><body>{card}</body></html>"
+    expected = [(date(2025, 8, 27), [3, 16, 21, 50, 62], 8, "2")]
+    assert parse_results_page(page) == expected
+    assert parse_results_page(page.encode("utf-8")) == expected
+    # unknown markup: the regex over the visible text still finds the draw (scripts are skipped)
+    plain = "<html><script>Mon, Jan 1, 2024 1 2 3 4 5 6</script><p>Wed, Aug 27, 2025</p><p>62 3 16 21 50 8 Power Play 2x</p></html>"
+    assert parse_results_page(plain) == expected
+    assert parse_results_page("") == []
+    for blank in (b"<!-- x -->", "<!-- x -->", b"<!DOCTYPE html>"):
+        assert parse_results_page(blank) == [] and parse_draw_page(blank, date(2025, 8, 27)) is None
+    assert parse_draw_page(page, date(2025, 8, 27)) == ([3, 16, 21, 50, 62], 8)
+    assert parse_draw_page(plain, date(2025, 8, 27)) == ([3, 16, 21, 50, 62], 8)
+    assert parse_draw_page(page, date(2025, 8, 25)) is None
@@ -0,0 +1,228 @@
+from datetime import date
+from pathlib import Path
+from lotto.rules import PowerballRules, Draw
+from lotto.history import load_history_csv, HistoryTail, DateIndex
+from lotto.store import HistoryStore
+from lotto.generate import generate_unique
+
+HEADER = "date,w1,w2,w3,w4,w5,powerball,power_play,source_url\n"
+
+def test_store_appends_incrementally_and_versions(tmp_path: Path):
+    p = tmp_path / "hist.csv"
+    p.write_text(HEADER + "2024-01-01,1,2,3,4,5,6,,u\n", encoding="utf-8")
+    rules = PowerballRules()
+    store = HistoryStore(p, rules)
+    snap = store.snapshot()
+    assert snap.version == 1 and snap.rows == 1 and ((1, 2, 3, 4, 5), 6) in snap
+
+    assert not store.refresh()  # unchanged file
+    with p.open("a", encoding="utf-8") as f:
+        f.write("2024-01-03,7,8,9,10,11,12,2,u\n")
+    assert store.refresh()
+    new = store.snapshot()
+    assert new.version == 2 and new.rows == 2
+    assert new.latest() == (date(2024, 1, 3), Draw((7, 8, 9, 10, 11), 12))
+    assert snap.rows == 1  # old snapshot is untouched
+    assert set(new) == load_history_csv(p, rules)
+
+    p.write_text(HEADER + "2024-02-01,20,21,22,23,24,1,,u\n", encoding="utf-8")
+    assert store.refresh()
+    assert store.snapshot().rows == 1 and store.version == 3
+
+def test_tail_reads_only_appended_rows(tmp_path: Path):
+    p = tmp_path / "hist.csv"
+    p.write_text(HEADER + "2024-01-01,1,2,3,4,5,6,,u\n", encoding="utf-8")
+    tail = HistoryTail(p)
+    rows, reset = tail.read()
+    assert len(rows) == 2 and not reset
+    assert tail.rows == 1 and tail.dates == {"2024-01-01"}
+
+    with p.open("a", encoding="utf-8") as f:
+        f.write("2024-01-03,7,8,9,10,11,12,,u\n2024-01-06,1,2")  # last line unfinished
+    rows, reset = tail.read()
+    assert [r[0] for r in rows] == ["2024-01-03"] and not reset
+    with p.open("a", encoding="utf-8") as f:
+        f.write(",3,4,5,7,,u\n")
+    rows, reset = tail.read()
+    assert rows == [["2024-01-06", "1", "2", "3", "4", "5", "7", "", "u"]]
+    assert tail.rows == 3 and tail.last_date == "2024-01-06"
+    assert tail.read() == ([], False)
+
+    p.write_text(HEADER + "2023-05-05,1,2,3,4,5,6,,u\n2023-05-06,1,2,3,4,5,8,,u\n", encoding="utf-8")
+    rows, reset = tail.read()
+    assert reset and len(rows) == 3
+    assert tail.dates == {"2023-05-05", "2023-05-06"} and tail.rows == 2
+
+def test_date_index_lookups(tmp_path: Path):
+    p = tmp_path / "hist.csv"
+    p.write_text(HEADER + "2024-01-06,1,2,3,4,5,6,,u\n2024-01-01,7,8,9,10,11,12,,u\nbad,1,2,3,4,5,9\n", encoding="utf-8")
+    store = HistoryStore(p, PowerballRules())
+    idx = store.snapshot().dates
+    assert len(idx) == 2
+    assert idx.latest() == (date(2024, 1, 6), Draw((1, 2, 3, 4, 5), 6))
+    assert idx.get(date(2024, 1, 1)) == Draw((7, 8, 9, 10, 11), 12)
+    assert idx.get(date(2024, 1, 2)) is None
+    assert [d for d, _ in idx.range(date(2024, 1, 1), date(2024, 1, 5))] == [date(2024, 1, 1)]
+
+    with p.open("a", encoding="utf-8") as f:
+        f.write("2024-01-03,20,21,22,23,24,1,,u\n2024-01-08,30,31,32,33,34,2,,u\n")
+    store.refresh()
+    idx = store.snapshot().dates
+    assert list(idx.dates()) == [date(2024, 1, d) for d in (1, 3, 6, 8)]
+    assert idx.latest()[0] == date(2024, 1, 8)
+    assert DateIndex().latest() is None
+
+def test_schedule_missing_dates_against_date_index(tmp_path: Path, monkeypatch):
+    from datetime import timedelta
+    from lotto import schedule
+    # Wed/Sat, then Mon/Wed/Sat from 2021-08-23
+    assert list(schedule.scheduled_dates(date(2021, 8, 18), date(2021, 8, 25))) == [
+        date(2021, 8, 18), date(2021, 8, 21), date(2021, 8, 23), date(2021, 8, 25)]
+    days = [date(2015, 10, 1) + timedelta(i) for i in range(4000)]
+    walked = [d for d in days if schedule.is_scheduled(d)]
+    assert walked[0] == schedule.FIRST_DRAW
+    assert list(schedule.scheduled_dates(days[0], days[-1])) == walked
+    assert schedule.count_scheduled(days[0], days[-1]) == len(walked)
+
+    p = tmp_path / "hist.csv"
+    rows = [d for d in walked[:40] if d not in (walked[3], walked[30], walked[31])]
+    p.write_text(HEADER + "".join(f"{d.isoformat()},1,2,3,4,5,6,,u\n" for d in rows), encoding="utf-8")
+    idx = HistoryStore(p, PowerballRules()).snapshot().dates
+    assert schedule.missing_dates(idx, None, walked[39]) == [walked[3], walked[30], walked[31]]
+    assert schedule.missing_dates(idx, walked[4], walked[29]) == []
+
+    # irregular draws override the weekday pattern
+    monkeypatch.setattr(schedule, "SKIPPED_DRAWS", frozenset({walked[5]}))
+    monkeypatch.setattr(schedule, "EXTRA_DRAWS", frozenset({walked[5] + timedelta(days=1)}))
+    got = list(schedule.scheduled_dates(walked[4], walked[6]))
+    assert got == [walked[4], walked[5] + timedelta(days=1), walked[6]]
+    assert schedule.count_scheduled(walked[4], walked[6]) == 3
+    assert schedule.missing_dates(idx, walked[4], walked[6]) == [walked[5] + timedelta(days=1)]
+
+def test_snapshot_works_as_generator_history(tmp_path: Path):
+    p = tmp_path / "hist.csv"
+    p.write_text(HEADER + "2024-01-01,1,2,3,4,5,6,,u\n", encoding="utf-8")
+    rules = PowerballRules()
+    snap = HistoryStore(p, rules).snapshot()
+    assert generate_unique(snap, rules, count=5, seed=1) == generate_unique(set(snap), rules, count=5, seed=1)
+
+def test_binary_history_roundtrip_and_rebuild(tmp_path: Path):
+    import os
+    from lotto.binhist import load_history_fast
+    p = tmp_path / "hist.csv"
+    p.write_text(HEADER + "2024-01-01,5,4,3,2,1,6,2,http://a\n2024-01-03,7,8,9,10,11,12,,\n", encoding="utf-8")
+    rules = PowerballRules()
+    hist = load_history_fast(p, rules)
+    assert len(hist) == 2 and hist.draws() == load_history_csv(p, rules)
+    assert hist.date(0) == date(2024, 1, 1) and hist.power_plays[0] == 2 and hist.url(0) == "http://a"
+    assert hist.url(1) == "" and hist.draw(1) == Draw((7, 8, 9, 10, 11), 12)
+    hist.close()
+
+    with p.open("a", encoding="utf-8") as f:
+        f.write("2024-01-06,20,21,22,23,24,1,,\n")
+    os.utime(p, ns=(1, 1))  # force a different mtime even on coarse clocks
+    hist = load_history_fast(p, rules)
+    assert len(hist) == 3 and hist.ordinals[2] == date(2024, 1, 6).toordinal()
+    hist.close()
+
+def test_loaded_history_finds_tuple_keys(tmp_path: Path):
+    from lotto.binhist import load_history_fast
+    p = tmp_path / "hist.csv"
+    p.write_text(HEADER + "2024-01-01,5,4,3,2,1,6,,u\n", encoding="utf-8")
+    rules = PowerballRules()
+    hist = load_history_fast(p, rules)
+    for draws in (load_history_csv(p, rules), hist.draws()):
+        assert ((1, 2, 3, 4, 5), 6) in draws and Draw((1, 2, 3, 4, 5), 6) in draws
+        assert ((1, 2, 3, 4, 5), 7) not in draws and ((1, 2), 6) not in draws
+    hist.close()
+
+def test_store_reads_final_row_without_newline(tmp_path: Path):
+    p = tmp_path / "hist.csv"
+    p.write_text(HEADER + "2024-01-01,5,4,3,2,1,6,2,u\n2024-01-03,7,8,9,10,11,12,,u", encoding="utf-8")
+    rules = PowerballRules()
+    for binary in (True, False):
+        store = HistoryStore(p, rules, binary=binary)
+        snap = store.snapshot()
+        assert snap.rows == 2 and set(snap) == load_history_csv(p, rules)
+        assert snap.latest() == (date(2024, 1, 3), Draw((7, 8, 9, 10, 11), 12))
+    # the newline arrives with the next row: the final row is not counted twice
+    with p.open("a", encoding="utf-8") as f:
+        f.write("\n2024-01-06,20,21,22,23,24,1,,u\n")
+    assert store.refresh() and store.snapshot().rows == 3 and store.version == 2
+
+    tail = HistoryTail(p)
+    tail.read()
+    assert tail.rows == 3 and tail.read() == ([], False)
+    with p.open("a", encoding="utf-8") as f:
+        f.write("2024-01-08,30,31,32,33,34,2,,u")
+    rows, reset = tail.read()
+    assert [r[0] for r in rows] == ["2024-01-08"] and not reset and tail.last_date == "2024-01-08"
+    assert tail.read() == ([], False)
+    # the unterminated row was cut short after all: start over rather than keep a wrong draw
+    with p.open("a", encoding="utf-8") as f:
+        f.write("x\n")
+    rows, reset = tail.read()
+    assert reset and len(rows) == 5 and tail.rows == 4
+
+def test_store_loads_from_binary_twin_then_appends(tmp_path: Path):
+    from lotto.binhist import bin_path_for, load_history_fast
+    p = tmp_path / "hist.csv"
+    p.write_text(HEADER + "2024-01-01,5,4,3,2,1,6,2,u\n2024-01-03,7,8,9,10,11,12,,u\n", encoding="utf-8")
+    rules = PowerballRules()
+    load_history_fast(p, rules).close()
+    with p.open("a", encoding="utf-8") as f:  # rows the twin has not seen yet
+        f.write("2024-01-06,20,21,22,23,24,1,,u\n")
+    store = HistoryStore(p, rules)
+    assert bin_path_for(p).exists()
+    snap = store.snapshot()
+    plain = HistoryStore(p, rules, binary=False).snapshot()
+    assert list(snap.ranks) == list(plain.ranks) and list(snap.ordinals) == list(plain.ordinals)
+    assert set(snap) == load_history_csv(p, rules) and snap.rows == 3
+    with p.open("a", encoding="utf-8") as f:
+        f.write("2024-01-08,30,31,32,33,34,2,,u\n")
+    assert store.refresh() and store.snapshot().rows == 4
+    assert store.range(date(2024, 1, 8))[0][1] == Draw((30, 31, 32, 33, 34), 2)
+
+def test_sqlite_store_incremental_and_queries(tmp_path: Path):
+    from lotto.sqlstore import HistoryDB
+    csv_path = tmp_path / "hist.csv"
+    csv_path.write_text(HEADER + "2024-01-01,5,4,3,2,1,6,2,u\n2024-01-03,7,8,9,10,11,12,,u\n", encoding="utf-8")
+    db_path = tmp_path / "hist.db"
+    rules = PowerballRules()
+    db = HistoryDB(db_path, rules)
+    assert db.import_csv(csv_path) == 2
+
+    store = HistoryStore(db_path, rules)
+    snap = store.snapshot()
+    assert set(snap) == load_history_csv(csv_path, rules)
+    assert store.contains(((1, 2, 3, 4, 5), 6)) and not store.contains(((1, 2, 3, 4, 5), 7))
+
+    db.upsert([("2024-01-06", (20, 21, 22, 23, 24), 1, "", "u")])
+    assert store.refresh() and store.snapshot().rows == 3 and store.version == 2
+    assert [d for d, _ in store.range(date(2024, 1, 2), None)] == [date(2024, 1, 3), date(2024, 1, 6)]
+    assert store.snapshot().latest() == db.latest() == (date(2024, 1, 6), Draw((20, 21, 22, 23, 24), 1))
+
+    db.upsert([("2024-01-06", (20, 21, 22, 23, 25), 1, "", "u")])  # correction: same date, new draw
+    assert store.refresh() and store.snapshot().rows == 3
+    assert db.get(date(2024, 1, 6)) == Draw((20, 21, 22, 23, 25), 1)
+    assert ((20, 21, 22, 23, 24), 1) not in store.snapshot()
+    assert not store.refresh()
+    db.close()
+    store.db.close()
+
+def test_store_falls_back_when_binary_twin_is_corrupt(tmp_path: Path):
+    from lotto.binhist import bin_path_for, load_history_fast
+    p = tmp_path / "hist.csv"
+    p.write_text(HEADER + "2024-01-01,5,4,3,2,1,6,2,u\n2024-01-03,7,8,9,10,11,12,,u\n", encoding="utf-8")
+    rules = PowerballRules()
+    twin = bin_path_for(p)
+    load_history_fast(p, rules).close()
+    whole = twin.read_bytes()
+    for bad in (whole[:10], whole[:len(whole) // 2], b"", b"PBHB" + bytes(60)):
+        twin.write_bytes(bad)
+        assert HistoryStore(p, rules).snapshot().rows == 2
+    # the stale or broken twin is rebuilt on the next load
+    twin.write_bytes(whole[:len(whole) // 2])
+    hist = load_history_fast(p, rules)
+    assert len(hist) == 2
+    hist.close()
@@ -0,0 +1,19 @@
+from itertools import combinations
+from lotto.rules import PowerballRules
+from lotto.wheel import design_wheel
+
+def test_full_wheel_covers_every_subset():
+    numbers = range(1, 11)
+    tickets = design_wheel(None, t=3, numbers=numbers, seed=4)
+    covered = {sub for whites, _ in tickets for sub in combinations(whites, 3)}
+    assert covered >= set(combinations(numbers, 3))
+    for whites, red in tickets:
+        assert len(whites) == 5 and list(whites) == sorted(whites)
+        assert set(whites) <= set(numbers) and 1 <= red <= 26
+
+def test_fixed_count_is_reproducible():
+    rules = PowerballRules()
+    a = design_wheel(30, rules, t=2, seed=1)
+    assert a == design_wheel(30, rules, t=2, seed=1) and len(a) == 30
+    pairs = {sub for whites, _ in a for sub in combinations(whites, 2)}
+    assert len(pairs) > 250  # 30 tickets x 10 pairs, nearly all distinct